@@ -0,0 +1,221 @@
+import os
+import sys
+import csv
+import json
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+from pose_cache import ensure_cache
+from feature_cache import cache_key, default_cache
+from parallel_features import EXTRACTOR_VERSION
+from js_features import build_feature_tensor
+from dataset_catalog import DATA_ROOT, FOLDER_PREFIX, parse_filename
+from model_registry import MODEL_ROOT
+from tfjs_runtime import MODEL_FILE, TfjsModel
+
+# ------------------- 参数设置 -------------------
+OUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "batch_scores")
+
+_models = {}    # 子进程中已加载的模型（每个进程每个模型只加载一次）
+
+
+def load_file_windows(filename, kind, window, hop=None):
+    """
+    读取（或计算并缓存）一个文件的浏览器端特征窗口，返回 (features, index)：
+      - features: (windows, window, 33) float32，与 build_feature_tensor 相同；
+      - index:    {"labels", "samples", "starts"} 三个数组。
+    缓存键包含源文件哈希、特征类型与窗口参数，同一特征被多个模型使用时只计算一次。
+    """
+    meta = ensure_cache(filename)
+    key = cache_key(meta["source_sha1"], kind="windows", feature=kind, window=window, hop=hop,
+                    version=EXTRACTOR_VERSION)
+
+    def compute():
+        features, index = build_feature_tensor([filename], kind, window=window, hop=hop)
+        return {"features": features,
+                "labels": np.array(["" if item["label"] is None else str(item["label"])
+                                    for item in index], dtype=str),
+                "samples": np.array([item["sample"] for item in index], dtype=np.int64),
+                "starts": np.array([item["start"] for item in index], dtype=np.int64)}
+
+    arrays = default_cache().get_or_compute(key, compute)
+    return arrays["features"], {k: arrays[k] for k in ("labels", "samples", "starts")}
+
+
+def _model(model_dir):
+    if model_dir not in _models:
+        _models[model_dir] = TfjsModel.load(model_dir)
+    return _models[model_dir]
+
+
+def _score_file(filename, model_dirs, hop):
+    """子进程：用每个模型对一个文件的所有窗口做预测，只返回预测结果（不返回特征）。"""
+    results = []
+    for model_dir in model_dirs:
+        model = _model(model_dir)
+        features, index = load_file_windows(filename, model.feature_kind, model.window, hop)
+        probs = model.predict_proba(features) if len(features) else np.empty((0, len(model.labels)))
+        results.append({"predicted": probs.argmax(axis=1), "confidence": probs.max(axis=1, initial=0),
+                        **index})
+    return results
+
+
+def _confusion(labels, truth, predicted):
+    """
+    混淆矩阵：行为真实标签，列为模型的类别（标签比较不区分大小写）。
+    数据中出现、但模型没有的标签追加在行的末尾（这些行的预测必然错误）。
+    """
+    rows = list(labels)
+    lowered = {l.lower(): i for i, l in enumerate(labels)}
+    for t in truth:
+        if t.lower() not in lowered:
+            lowered[t.lower()] = len(rows)
+            rows.append(t)
+    matrix = np.zeros((len(rows), len(labels)), dtype=np.int64)
+    np.add.at(matrix, ([lowered[t.lower()] for t in truth], predicted), 1)
+    return rows, matrix
+
+
+def score(model_dirs, folders, hop=None, max_workers=None):
+    """
+    用 model_dirs 中的每个模型对 folders 中的每个数据文件夹做预测，
+    返回 {(模型名, 文件夹名): 结果}，结果包含逐窗口的预测、逐文件与逐舞者的准确率以及混淆矩阵。
+    文件按进程池并行处理，每个文件的特征按 (特征类型, 窗口) 缓存，多个模型共用。
+    """
+    names = [os.path.basename(os.path.normpath(d)) for d in model_dirs]
+    models = [TfjsModel.load(d) for d in model_dirs]
+    jobs = []
+    for folder in folders:
+        for name in sorted(os.listdir(folder)):
+            if name.lower().endswith(".json") and not name.endswith("index.json"):
+                jobs.append((folder, os.path.join(folder, name)))
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(_score_file, fname, model_dirs, hop) for _, fname in jobs]
+        for (folder, fname), future in zip(jobs, futures):
+            folder_name = os.path.basename(os.path.normpath(folder))
+            dancer = parse_filename(fname)["dancer"] or ""
+            for name, model, part in zip(names, models, future.result()):
+                entry = results.setdefault((name, folder_name), {"model": model, "windows": []})
+                for label, sample, start, p, c in zip(part["labels"], part["samples"], part["starts"],
+                                                      part["predicted"], part["confidence"]):
+                    entry["windows"].append({
+                        "file": os.path.basename(fname), "dancer": dancer, "sample": int(sample),
+                        "start": int(start), "label": str(label), "predicted": model.labels[p],
+                        "confidence": float(c), "correct": model.labels[p].lower() == str(label).lower()})
+
+    for entry in results.values():
+        model, windows = entry["model"], entry["windows"]
+        truth = [w["label"] for w in windows]
+        predicted = [model.labels.index(w["predicted"]) for w in windows]
+        entry["rows"], entry["confusion"] = _confusion(model.labels, truth, predicted)
+        entry["accuracy"] = float(np.mean([w["correct"] for w in windows])) if windows else 0.0
+        entry["files"] = _group(windows, "file")
+        entry["dancers"] = _group(windows, "dancer")
+    return results
+
+
+def _group(windows, field):
+    """按 file / dancer 分组统计窗口数、正确数、准确率与出现最多的预测。"""
+    groups = {}
+    for w in windows:
+        g = groups.setdefault(w[field], {"label": w["label"], "dancer": w["dancer"],
+                                         "windows": 0, "correct": 0, "predictions": {}})
+        g["windows"] += 1
+        g["correct"] += w["correct"]
+        g["predictions"][w["predicted"]] = g["predictions"].get(w["predicted"], 0) + 1
+    for g in groups.values():
+        g["accuracy"] = g["correct"] / g["windows"]
+        g["majority"] = max(g["predictions"], key=g["predictions"].get)
+    return groups
+
+
+def write_results(results, out_dir=OUT_DIR):
+    """
+    写出结果：
+      - summary.json:    每个 (模型, 文件夹) 的准确率、混淆矩阵、逐文件与逐舞者的准确率；
+      - predictions.csv: 每个窗口一行；
+      - files.csv / dancers.csv: 逐文件 / 逐舞者的准确率；
+      - confusion.csv:   长表格式的混淆矩阵（模型, 文件夹, 真实标签, 预测标签, 数量）。
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    summary = {}
+    with open(os.path.join(out_dir, "predictions.csv"), "w", newline="", encoding="utf-8") as f_pred, \
+            open(os.path.join(out_dir, "files.csv"), "w", newline="", encoding="utf-8") as f_files, \
+            open(os.path.join(out_dir, "dancers.csv"), "w", newline="", encoding="utf-8") as f_dancers, \
+            open(os.path.join(out_dir, "confusion.csv"), "w", newline="", encoding="utf-8") as f_conf:
+        pred_writer, files_writer = csv.writer(f_pred), csv.writer(f_files)
+        dancers_writer, conf_writer = csv.writer(f_dancers), csv.writer(f_conf)
+        pred_writer.writerow(["model", "folder", "file", "dancer", "sample", "start", "label",
+                              "predicted", "confidence", "correct"])
+        files_writer.writerow(["model", "folder", "file", "dancer", "label", "windows", "correct",
+                               "accuracy", "majority"])
+        dancers_writer.writerow(["model", "folder", "dancer", "windows", "correct", "accuracy"])
+        conf_writer.writerow(["model", "folder", "label", "predicted", "count"])
+
+        for (name, folder), entry in sorted(results.items()):
+            for w in entry["windows"]:
+                pred_writer.writerow([name, folder, w["file"], w["dancer"], w["sample"], w["start"],
+                                      w["label"], w["predicted"], f"{w['confidence']:.4f}", int(w["correct"])])
+            for fname, g in entry["files"].items():
+                files_writer.writerow([name, folder, fname, g["dancer"], g["label"], g["windows"],
+                                       g["correct"], f"{g['accuracy']:.4f}", g["majority"]])
+            for dancer, g in entry["dancers"].items():
+                dancers_writer.writerow([name, folder, dancer, g["windows"], g["correct"],
+                                         f"{g['accuracy']:.4f}"])
+            for label, row in zip(entry["rows"], entry["confusion"]):
+                for predicted, count in zip(entry["model"].labels, row):
+                    conf_writer.writerow([name, folder, label, predicted, int(count)])
+            summary.setdefault(name, {})[folder] = {
+                "windows": len(entry["windows"]),
+                "accuracy": entry["accuracy"],
+                "labels": entry["model"].labels,
+                "confusion": {"rows": entry["rows"], "matrix": entry["confusion"].tolist()},
+                "files": {f: {k: g[k] for k in ("label", "windows", "accuracy", "majority")}
+                          for f, g in entry["files"].items()},
+                "dancers": {d: {k: g[k] for k in ("windows", "accuracy")}
+                            for d, g in entry["dancers"].items()},
+            }
+    with open(os.path.join(out_dir, "summary.json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    return summary
+
+
+def _model_dirs(root=MODEL_ROOT):
+    return [entry.path for entry in sorted(os.scandir(root), key=lambda e: e.name)
+            if entry.is_dir() and os.path.exists(os.path.join(entry.path, MODEL_FILE))]
+
+
+def _data_folders(root=DATA_ROOT):
+    return [entry.path for entry in sorted(os.scandir(root), key=lambda e: e.name)
+            if entry.is_dir() and entry.name.startswith(FOLDER_PREFIX)]
+
+
+if __name__ == "__main__":
+    # 用法：python batch_score.py [模型文件夹 ...] [数据文件夹 ...] [--out 输出文件夹] [--hop 帧数]
+    #   不指定模型时使用 model/ 下的所有模型，不指定数据文件夹时使用 data/data_test* 下的所有文件夹，
+    #   每个模型都对每个文件夹评分（标签不同的组合准确率为 0，可从混淆矩阵看出）
+    #   --hop 指定时每个样本取多个滑动窗口，否则与训练时相同只取第一个窗口
+    args = sys.argv[1:]
+    out_dir, hop = OUT_DIR, None
+    if "--out" in args:
+        i = args.index("--out")
+        out_dir = args[i + 1]
+        del args[i:i + 2]
+    if "--hop" in args:
+        i = args.index("--hop")
+        hop = int(args[i + 1])
+        del args[i:i + 2]
+    model_dirs = [a for a in args if os.path.exists(os.path.join(a, MODEL_FILE))] or _model_dirs()
+    folders = [a for a in args if a not in model_dirs] or _data_folders()
+
+    start = time.perf_counter()
+    results = score(model_dirs, folders, hop)
+    summary = write_results(results, out_dir)
+    elapsed = time.perf_counter() - start
+    for name, by_folder in summary.items():
+        for folder, item in by_folder.items():
+            print(f"{name:<28} {folder:<26} {item['windows']:>6} 个窗口  准确率 {item['accuracy']:.3f}")
+    print(f"{len(model_dirs)} 个模型 × {len(folders)} 个文件夹，用时 {elapsed:.1f} 秒，结果已写入 {out_dir}")
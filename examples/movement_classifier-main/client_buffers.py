@@ -0,0 +1,122 @@
+import threading
+
+# ------------------- 参数设置 -------------------
+CAPACITY = 256                # 每个客户端最多保留的数据条数（超出时覆盖最旧的数据）
+
+
+class RingBuffer:
+    """
+    固定容量的环形缓冲区：槽位在创建时一次分配，append 只写入一个槽位（满了覆盖最旧的一条），
+    snapshot / drain 按从旧到新的顺序取出数据。所有操作都在缓冲区自己的锁内完成。
+    """
+
+    def __init__(self, capacity=CAPACITY):
+        self.capacity = capacity
+        self._slots = [None] * capacity
+        self._start = 0
+        self._count = 0
+        self.dropped = 0      # 因缓冲区已满而被覆盖的条数
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return self._count
+
+    def append(self, item):
+        """加入一条数据，返回加入后的条数。"""
+        with self._lock:
+            end = (self._start + self._count) % self.capacity
+            self._slots[end] = item
+            if self._count == self.capacity:
+                self._start = (self._start + 1) % self.capacity
+                self.dropped += 1
+            else:
+                self._count += 1
+            return self._count
+
+    def _items(self):
+        end = self._start + self._count
+        if end <= self.capacity:
+            return self._slots[self._start:end]
+        return self._slots[self._start:] + self._slots[:end - self.capacity]
+
+    def snapshot(self):
+        """按从旧到新的顺序返回当前的数据（拷贝，不清空）。"""
+        with self._lock:
+            return self._items()
+
+    def drain(self, min_items=1):
+        """
+        取出并清空所有数据；不足 min_items 条时不取出，返回 None。
+        检查与清空在同一次加锁中完成，多个线程同时调用时只有一个会取到这批数据。
+        """
+        with self._lock:
+            if self._count < min_items:
+                return None
+            items = self._items()
+            for i in range(self._count):
+                self._slots[(self._start + i) % self.capacity] = None
+            self._start = 0
+            self._count = 0
+            return items
+
+
+class ClientBuffers:
+    """
+    按客户端（Socket.IO 的 sid）分开的环形缓冲区：每个 sid 的数据单独累计与处理，
+    不同客户端的置信度不会混在一起。断开连接时用 remove(sid) 释放该客户端的缓冲区。
+    """
+
+    def __init__(self, capacity=CAPACITY):
+        self.capacity = capacity
+        self._buffers = {}
+        self._lock = threading.Lock()
+
+    def buffer(self, sid, create=True):
+        """取得 sid 的缓冲区；不存在时 create=True 则创建，否则返回 None。"""
+        with self._lock:
+            buf = self._buffers.get(sid)
+            if buf is None and create:
+                buf = self._buffers[sid] = RingBuffer(self.capacity)
+            return buf
+
+    def append(self, sid, item, create=True):
+        """
+        为 sid 加入一条数据，返回该客户端当前累计的条数。
+        create=False 时只写入已有的缓冲区，不存在（例如客户端已断开、remove 过）时丢弃数据并返回 0；
+        查找与创建在同一次加锁中完成，不会在断开之后重新创建缓冲区。
+        """
+        buf = self.buffer(sid, create)
+        return buf.append(item) if buf is not None else 0
+
+    def snapshot(self, sid):
+        with self._lock:
+            buf = self._buffers.get(sid)
+        return buf.snapshot() if buf is not None else []
+
+    def drain(self, sid, min_items=1):
+        """取出并清空 sid 的数据（不足 min_items 条或缓冲区不存在时返回 None，不会创建缓冲区）。"""
+        with self._lock:
+            buf = self._buffers.get(sid)
+        return buf.drain(min_items) if buf is not None else None
+
+    def drain_all(self, min_items=1):
+        """取出所有客户端的数据，返回 {sid: 数据列表}（跳过不足 min_items 条的客户端）。"""
+        with self._lock:
+            buffers = list(self._buffers.items())
+        drained = {}
+        for sid, buf in buffers:
+            items = buf.drain(min_items)
+            if items is not None:
+                drained[sid] = items
+        return drained
+
+    def remove(self, sid):
+        """删除 sid 的缓冲区（客户端断开连接时调用），返回其中尚未处理的数据。"""
+        with self._lock:
+            buf = self._buffers.pop(sid, None)
+        return (buf.drain() or []) if buf is not None else []
+
+    def sids(self):
+        with self._lock:
+            return list(self._buffers)
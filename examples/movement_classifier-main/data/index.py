@@ -1,14 +1,20 @@
 import os
+import sys
 import json
 
-# 指定要扫描的文件夹路径（请根据实际情况修改）
-folder_path = "/Users/qianzhang/Desktop/ml5_method2/examples/movement_classifier-main/data/data_test9_velocity"
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from dataset_catalog import DATA_ROOT, build_catalog, select
 
-# 获取文件夹内所有以 .json 结尾的文件名
-files = [f for f in os.listdir(folder_path) if f.lower().endswith(".json")]
+# 指定要生成索引的文件夹（相对于 data/ 目录，请根据实际情况修改）
+folder_name = "data_test9_velocity"
+folder_path = os.path.join(DATA_ROOT, folder_name)
+
+# 增量更新 data/catalog.json（只重新扫描 mtime 变化的文件），再按文件夹筛选
+catalog = build_catalog()
+files = [os.path.basename(p) for p in select(catalog, folder=folder_name)]
 
 # 构造索引字典
-index =files
+index = files
 
 # 指定 index.json 输出路径（可以放在同一文件夹或其他位置）
 output_path = os.path.join(folder_path, "velocity_index.json")
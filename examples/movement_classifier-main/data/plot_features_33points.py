@@ -1,8 +1,12 @@
-import json
+import os
+import sys
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.widgets import Slider, CheckButtons, Button
-import math
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import pose_kinematics as kinematics
+from pose_stream import read_first_sample
 
 # ------------------- 参数设置 -------------------
 fps = 30                      # 帧率
@@ -13,7 +17,8 @@ window_size = 20              # 默认显示时间窗口（秒）
 # ------------------- 数据处理函数 -------------------
 def load_sample(filename):
     """
-    从指定 JSON 文件中加载一个样本数据（取前 expected_frames 帧）
+    从指定 JSON 文件中加载一个样本数据（取前 expected_frames 帧），
+    返回 (frames, 33, 2) 数组，缺失关键点为 NaN。
     文件格式示例：
     {
       "data": [
@@ -25,68 +30,41 @@ def load_sample(filename):
       ]
     }
     """
-    with open(filename, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    # 此处仅取第一个样本
-    sample = data.get("data", [])[0]
-    frames = sample.get("xs", [])[:expected_frames]
+    # 此处仅取第一个样本；流式读取，读到所需帧数后不再解析剩余内容
+    frames, _ = read_first_sample(filename, expected_frames)
     return frames
 
 def compute_keypoint_trajectories(frames):
     """
     计算33个关键点的轨迹，每个关键点保存一个 (x, y) 序列
-    返回字典： { 0: [(x0,y0), (x1,y1), ...], 1: [...], ..., 32: [...] }
+    返回字典： { 0: [(x0,y0), (x1,y1), ...], 1: [...], ..., 32: [...] }（每项为 (frames, 2) 数组）
     """
-    trajectories = {i: [] for i in range(33)}
-    for frame in frames:
-        for i in range(33):
-            key_x = f"x{i}"
-            key_y = f"y{i}"
-            if key_x in frame and key_y in frame:
-                trajectories[i].append( (frame[key_x], frame[key_y]) )
-            else:
-                trajectories[i].append( (np.nan, np.nan) )
-    return trajectories
+    return kinematics.compute_keypoint_trajectories(frames)
 
 def compute_velocity(trajectory):
     """
-    给定一个关键点的轨迹（列表，每项为 (x, y)），
-    计算连续帧之间的速度（单位：位置/秒）
+    计算连续帧之间的速度（单位：位置/秒），
+    trajectory 为一个关键点的 (frames, 2)，或 keypoint_array 的 (frames, 33, 2)（一次返回所有关键点的 (frames-1, 33)）
     """
-    velocities = []
-    for i in range(len(trajectory) - 1):
-        x1, y1 = trajectory[i]
-        x2, y2 = trajectory[i+1]
-        v = math.sqrt((x2 - x1)**2 + (y2 - y1)**2) / dt
-        velocities.append(v)
-    return np.array(velocities)
+    return kinematics.compute_velocity(trajectory, dt)
 
 def compute_acceleration(velocities):
     """
-    给定速度序列，计算连续帧之间的加速度（单位：速度变化/秒²），
-    并取绝对值以避免负值。
+    给定速度序列，计算连续帧之间的加速度（单位：速度变化/秒²），并取绝对值
     """
-    accelerations = []
-    for i in range(len(velocities) - 1):
-        a = abs((velocities[i+1] - velocities[i]) / dt)
-        accelerations.append(a)
-    return np.array(accelerations)
+    return kinematics.compute_acceleration(velocities, dt)
 
 # ------------------- 数据加载与计算 -------------------
 # 修改为实际的 JSON 文件路径
 filename = 'test4_A600frame_glideComR_10set4.json'
 frames = load_sample(filename)
-trajectories = compute_keypoint_trajectories(frames)
+points = kinematics.keypoint_array(frames)    # (expected_frames, 33, 2)
 
-# 针对每个关键点分别计算速度和加速度
-velocities = {}    # 每个关键点的速度序列，长度为 expected_frames - 1
-accelerations = {} # 每个关键点的加速度序列，长度为 expected_frames - 2
-for i in range(33):
-    traj = trajectories[i]
-    vel = compute_velocity(traj)
-    acc = compute_acceleration(vel) if len(vel) > 1 else np.array([])
-    velocities[i] = vel
-    accelerations[i] = acc
+# 一次计算所有关键点的速度和加速度
+vel_all = compute_velocity(points)            # (expected_frames - 1, 33)
+acc_all = compute_acceleration(vel_all)       # (expected_frames - 2, 33)
+velocities = {i: vel_all[:, i] for i in range(33)}    # 每个关键点的速度序列，长度为 expected_frames - 1
+accelerations = {i: acc_all[:, i] for i in range(33)} # 每个关键点的加速度序列，长度为 expected_frames - 2
 
 # ------------------- 子采样，每秒取1个数据点 -------------------
 step = int(1 / dt)  # 对于30fps, step = 30
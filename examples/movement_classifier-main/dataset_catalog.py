@@ -0,0 +1,178 @@
+import os
+import re
+import sys
+import json
+
+from pose_cache import file_sha1
+from pose_stream import iter_samples
+
+# ------------------- 参数设置 -------------------
+DATA_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+CATALOG_NAME = "catalog.json"  # 目录文件（写在 DATA_ROOT 下）
+FOLDER_PREFIX = "data_test"    # 只扫描 data/data_test* 文件夹
+CATALOG_VERSION = 1
+
+_TEST_RE = re.compile(r"^test(\d*)$", re.IGNORECASE)
+_FRAME_RE = re.compile(r"^([A-Za-z]*)(\d+)frame([A-Za-z]*)$", re.IGNORECASE)
+_SET_RE = re.compile(r"^(\d+)set(\d*)$", re.IGNORECASE)
+_CHUNK_RE = re.compile(r"^chunk(\d+)$", re.IGNORECASE)
+
+
+def parse_filename(name):
+    """
+    从文件名中解析元数据，例如：
+      test9_75frame_fast_dancer05_10set_chunk7.json
+        -> {"test": 9, "frames": 75, "label": "fast", "dancer": "dancer05", "sets": 10, "chunk": 7}
+      test4_A600frame_glideComR_10set5.json
+        -> {"test": 4, "frames": 600, "label": "A", "dancer": "glideComR", "sets": 10, "part": 5}
+    无法识别的字段为 None。
+    """
+    stem = os.path.splitext(os.path.basename(name))[0]
+    info = {"test": None, "frames": None, "label": None, "dancer": None,
+            "sets": None, "part": None, "chunk": None}
+    rest = []
+    for token in stem.split("_"):
+        m = _TEST_RE.match(token)
+        if m and info["test"] is None and not rest:
+            info["test"] = int(m.group(1)) if m.group(1) else None
+            continue
+        m = _FRAME_RE.match(token)
+        if m and info["frames"] is None:
+            info["frames"] = int(m.group(2))
+            info["label"] = m.group(1) or m.group(3) or None
+            continue
+        m = _SET_RE.match(token)
+        if m and info["sets"] is None:
+            info["sets"] = int(m.group(1))
+            info["part"] = int(m.group(2)) if m.group(2) else None
+            continue
+        m = _CHUNK_RE.match(token)
+        if m:
+            info["chunk"] = int(m.group(1))
+            continue
+        rest.append(token)
+    # 剩余部分：第一个词是标签（若帧数字段中没有），其余是舞者/身体部位名称
+    if info["label"] is None and rest:
+        info["label"] = rest.pop(0)
+    if rest:
+        info["dancer"] = "_".join(rest)
+    return info
+
+
+def scan_file(path):
+    """
+    读取文件内容统计样本数、帧数与标签，并计算内容哈希。
+    帧对象只被跳过而不解析，因此扫描很快。
+    """
+    frame_counts = []
+    labels = set()
+    for _, label, total in iter_samples(path, expected_frames=0):
+        frame_counts.append(total)
+        if label is not None:
+            labels.add(label)
+    return {
+        "samples": len(frame_counts),
+        "frames_min": min(frame_counts) if frame_counts else 0,
+        "frames_max": max(frame_counts) if frame_counts else 0,
+        "labels": sorted(labels),
+        "sha1": file_sha1(path),
+    }
+
+
+def load_catalog(root=DATA_ROOT):
+    path = os.path.join(root, CATALOG_NAME)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            catalog = json.load(f)
+    except (OSError, ValueError):
+        return {"version": CATALOG_VERSION, "files": {}}
+    if catalog.get("version") != CATALOG_VERSION:
+        return {"version": CATALOG_VERSION, "files": {}}
+    return catalog
+
+
+def build_catalog(root=DATA_ROOT, save=True, verbose=False):
+    """
+    遍历 root 下所有 data_test* 文件夹，增量更新目录：
+    只有 mtime 或大小变化（或新增）的文件才会重新扫描，已删除的文件会被移除。
+    返回目录字典 {"version": ..., "files": {相对路径: 条目}}。
+    """
+    old_files = load_catalog(root)["files"]
+    files = {}
+    rescanned = 0
+    for folder in sorted(os.scandir(root), key=lambda e: e.name):
+        if not folder.is_dir() or not folder.name.startswith(FOLDER_PREFIX):
+            continue
+        for entry in os.scandir(folder.path):
+            name = entry.name
+            if not name.lower().endswith(".json") or name.endswith("index.json"):
+                continue
+            rel = f"{folder.name}/{name}"
+            stat = entry.stat()
+            old = old_files.get(rel)
+            if old is not None and old["mtime"] == stat.st_mtime and old["size"] == stat.st_size:
+                files[rel] = old
+                continue
+            item = {"folder": folder.name, "name": name}
+            item.update(parse_filename(name))
+            item.update(scan_file(entry.path))
+            item["mtime"] = stat.st_mtime
+            item["size"] = stat.st_size
+            files[rel] = item
+            rescanned += 1
+            if verbose:
+                print(f"扫描 {rel}: {item['samples']} 个样本")
+
+    catalog = {"version": CATALOG_VERSION, "files": dict(sorted(files.items()))}
+    if save and (rescanned or len(files) != len(old_files)):
+        path = os.path.join(root, CATALOG_NAME)
+        tmp = path + f".tmp{os.getpid()}"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(catalog, f, indent=2, ensure_ascii=False)
+        os.replace(tmp, path)
+    return catalog
+
+
+def _matches(value, wanted):
+    if callable(wanted):
+        return wanted(value)
+    if isinstance(wanted, (list, tuple, set)):
+        return any(_matches(value, w) for w in wanted)
+    if isinstance(wanted, str) and isinstance(value, str):
+        return value.lower() == wanted.lower()
+    return value == wanted
+
+
+def select(catalog, root=DATA_ROOT, **criteria):
+    """
+    按元数据筛选文件，返回绝对路径列表，例如：
+      select(catalog, test=9, label="fast")
+      select(catalog, label=["sudden", "sustained"], frames=60)
+      select(catalog, samples=lambda n: n >= 10)
+    字符串比较不区分大小写。
+    """
+    paths = []
+    for rel, item in catalog["files"].items():
+        if all(_matches(item.get(k), v) for k, v in criteria.items()):
+            paths.append(os.path.join(root, rel))
+    return paths
+
+
+def _parse_query(args):
+    criteria = {}
+    for arg in args:
+        key, _, value = arg.partition("=")
+        values = [int(v) if v.isdigit() else v for v in value.split(",")]
+        criteria[key] = values if len(values) > 1 else values[0]
+    return criteria
+
+
+if __name__ == "__main__":
+    # 用法：python dataset_catalog.py [label=fast test=9 ...]
+    catalog = build_catalog(verbose=True)
+    criteria = _parse_query(sys.argv[1:])
+    if criteria:
+        for path in select(catalog, **criteria):
+            print(path)
+    else:
+        print(f"目录共 {len(catalog['files'])} 个文件，已写入 {os.path.join(DATA_ROOT, CATALOG_NAME)}")
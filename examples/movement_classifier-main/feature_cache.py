@@ -0,0 +1,137 @@
+import os
+import sys
+import json
+import zipfile
+import hashlib
+import numpy as np
+
+# ------------------- 参数设置 -------------------
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".feature_cache")
+MAX_BYTES = 1 << 30           # 缓存总大小上限（1 GB），超出时按最近使用时间淘汰
+ENTRY_SUFFIX = ".npz"
+
+
+def cache_key(source_sha1, **params):
+    """
+    由源文件内容哈希与提取参数（fps、expected_frames、特征类型、提取器版本等）计算缓存键。
+    参数按名称排序后参与哈希，因此调用顺序无关；任一参数变化都会得到新的键。
+    """
+    text = json.dumps({"source": source_sha1, "params": params}, sort_keys=True)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class FeatureCache:
+    """
+    以内容寻址的特征缓存：每个条目是 <root>/<key[:2]>/<key>.npz，保存一组命名数组。
+
+      - 写入时先写临时文件再 os.replace，读者永远看不到写了一半的文件，
+        多个进程同时计算同一条目时后写入者覆盖，内容相同；
+      - 读取时更新文件的 mtime，淘汰时删除 mtime 最旧的条目（LRU）；
+      - 条目在读取前被其他进程淘汰时视为未命中，重新计算即可。
+    """
+
+    def __init__(self, root=CACHE_DIR, max_bytes=MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+
+    def path(self, key):
+        return os.path.join(self.root, key[:2], key + ENTRY_SUFFIX)
+
+    def get(self, key):
+        """
+        读取条目，返回 {名称: 数组}；不存在（或已被淘汰）时返回 None。
+        条目损坏（截断、内容不是 npz 等）时删除该文件并视为未命中，下次重新计算。
+        """
+        path = self.path(key)
+        try:
+            with np.load(path, allow_pickle=False) as z:
+                arrays = {name: z[name] for name in z.files}
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, EOFError, zipfile.BadZipFile) as e:
+            print(f"特征缓存条目 {path} 已损坏，删除后重新计算：{e}")
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return arrays
+
+    def put(self, key, arrays):
+        """原子地写入条目（zip 压缩的 npz），随后检查总大小并淘汰最久未使用的条目。"""
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp{os.getpid()}"
+        with open(tmp, "wb") as f:
+            np.savez_compressed(f, **arrays)
+        os.replace(tmp, path)
+        self.evict(keep=path)
+
+    def get_or_compute(self, key, compute):
+        """命中时直接返回缓存内容，否则调用 compute() 得到 {名称: 数组} 并写入缓存。"""
+        arrays = self.get(key)
+        if arrays is None:
+            arrays = compute()
+            self.put(key, arrays)
+        return arrays
+
+    def entries(self):
+        """列出所有条目 [(mtime, 大小, 路径)]，并发删除的文件会被忽略。"""
+        result = []
+        if not os.path.isdir(self.root):
+            return result
+        for sub in os.scandir(self.root):
+            if not sub.is_dir():
+                continue
+            for entry in os.scandir(sub.path):
+                if not entry.name.endswith(ENTRY_SUFFIX):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                result.append((stat.st_mtime, stat.st_size, entry.path))
+        return result
+
+    def evict(self, keep=None):
+        """总大小超过 max_bytes 时，从最久未使用的条目开始删除（不删除 keep）。"""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        for _, _, path in self.entries():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+_default_cache = None
+
+
+def default_cache():
+    """进程内共享的默认缓存（位于脚本目录下的 .feature_cache/）。"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = FeatureCache()
+    return _default_cache
+
+
+if __name__ == "__main__":
+    # 用法：python feature_cache.py [clear]
+    cache = default_cache()
+    if len(sys.argv) > 1 and sys.argv[1] == "clear":
+        cache.clear()
+    entries = cache.entries()
+    print(f"{cache.root}: {len(entries)} 个条目，共 {sum(s for _, s, _ in entries) / 1e6:.1f} MB")
@@ -0,0 +1,145 @@
+import numpy as np
+
+
+class RunningStats:
+    """
+    逐元素的流式统计（Welford 算法）：对每个帧序号（以及每个关键点）维护
+    样本数、均值、M2（离差平方和）、最小值和最大值，内存与样本数无关。
+
+      - 帧维度按需增长，短样本只更新它覆盖到的帧；
+      - NaN（缺失关键点）不计入统计；
+      - 两个累加器可以用 merge() 合并（Chan 等人的并行公式），
+        因此多个进程可以各自累加后再汇总。
+    """
+
+    def __init__(self, item_shape=(), frames=0):
+        self.item_shape = tuple(item_shape)
+        self.count = np.zeros((frames,) + self.item_shape, dtype=np.int64)
+        self._mean = np.zeros((frames,) + self.item_shape)
+        self._m2 = np.zeros((frames,) + self.item_shape)
+        self._min = np.full((frames,) + self.item_shape, np.inf)
+        self._max = np.full((frames,) + self.item_shape, -np.inf)
+
+    @property
+    def frames(self):
+        return len(self.count)
+
+    def _reserve(self, frames):
+        """帧维度不足时扩展（新增部分为空统计）。"""
+        extra = frames - self.frames
+        if extra <= 0:
+            return
+        pad = (extra,) + self.item_shape
+        self.count = np.concatenate([self.count, np.zeros(pad, dtype=np.int64)])
+        self._mean = np.concatenate([self._mean, np.zeros(pad)])
+        self._m2 = np.concatenate([self._m2, np.zeros(pad)])
+        self._min = np.concatenate([self._min, np.full(pad, np.inf)])
+        self._max = np.concatenate([self._max, np.full(pad, -np.inf)])
+
+    def _combine(self, k, n_b, mean_b, m2_b, min_b, max_b):
+        """把一组统计量（前 k 帧）合并进来。"""
+        n_a = self.count[:k]
+        n = n_a + n_b
+        with np.errstate(invalid="ignore", divide="ignore"):
+            frac = np.where(n > 0, n_b / n, 0.0)
+        delta = mean_b - self._mean[:k]
+        self._mean[:k] += delta * frac
+        self._m2[:k] += m2_b + delta * delta * n_a * frac
+        np.minimum(self._min[:k], min_b, out=self._min[:k])
+        np.maximum(self._max[:k], max_b, out=self._max[:k])
+        self.count[:k] = n
+
+    def add(self, sample):
+        """加入一个样本 (frames, *item_shape)，帧数可以与其他样本不同。"""
+        self.add_batch(np.asarray(sample)[None])
+
+    def add_batch(self, samples):
+        """加入一批等长样本 (n, frames, *item_shape)：先求这批样本的统计量，再一次合并。"""
+        samples = np.asarray(samples, dtype=np.float64)
+        k = samples.shape[1]
+        if len(samples) == 0 or k == 0:
+            return
+        self._reserve(k)
+        valid = ~np.isnan(samples)
+        n_b = valid.sum(axis=0)
+        filled = np.where(valid, samples, 0.0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_b = np.where(n_b > 0, filled.sum(axis=0) / n_b, 0.0)
+        m2_b = np.where(valid, (samples - mean_b) ** 2, 0.0).sum(axis=0)
+        min_b = np.where(valid, samples, np.inf).min(axis=0)
+        max_b = np.where(valid, samples, -np.inf).max(axis=0)
+        self._combine(k, n_b, mean_b, m2_b, min_b, max_b)
+
+    def merge(self, other):
+        """合并另一个累加器（例如子进程返回的部分结果），返回 self。"""
+        if other.item_shape != self.item_shape:
+            raise ValueError(f"形状不一致：{self.item_shape} / {other.item_shape}")
+        k = other.frames
+        self._reserve(k)
+        self._combine(k, other.count, other._mean, other._m2, other._min, other._max)
+        return self
+
+    def _masked(self, values, min_count=1):
+        return np.where(self.count >= min_count, values, np.nan)
+
+    @property
+    def mean(self):
+        """每帧（每个关键点）的均值，没有样本的位置为 NaN。"""
+        return self._masked(self._mean)
+
+    def variance(self, ddof=1):
+        """方差（默认为样本方差 ddof=1），样本数不足的位置为 NaN。"""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self._masked(self._m2 / (self.count - ddof), min_count=ddof + 1)
+
+    def std(self, ddof=1):
+        return np.sqrt(self.variance(ddof))
+
+    @property
+    def min(self):
+        return self._masked(self._min)
+
+    @property
+    def max(self):
+        return self._masked(self._max)
+
+
+class LabelStats:
+    """按标签分组的 RunningStats：{标签: RunningStats}，同样可以合并。"""
+
+    def __init__(self, item_shape=()):
+        self.item_shape = tuple(item_shape)
+        self.stats = {}
+
+    def __getitem__(self, label):
+        return self.stats[label]
+
+    def __contains__(self, label):
+        return label in self.stats
+
+    def labels(self):
+        return list(self.stats)
+
+    def get(self, label):
+        """取得某个标签的累加器，不存在时新建。"""
+        if label not in self.stats:
+            self.stats[label] = RunningStats(self.item_shape)
+        return self.stats[label]
+
+    def add(self, label, sample):
+        self.get(label).add(sample)
+
+    def add_batch(self, label, samples):
+        self.get(label).add_batch(samples)
+
+    def merge(self, other):
+        for label, stats in other.stats.items():
+            self.get(label).merge(stats)
+        return self
+
+    def total(self):
+        """所有标签合并后的统计。"""
+        result = RunningStats(self.item_shape)
+        for stats in self.stats.values():
+            result.merge(stats)
+        return result
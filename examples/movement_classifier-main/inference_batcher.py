@@ -0,0 +1,138 @@
+import time
+import logging
+import threading
+from collections import deque
+
+import numpy as np
+
+# ------------------- 参数设置 -------------------
+MAX_BATCH_SIZE = 64           # 一个批次最多包含的窗口数
+MAX_WAIT = 0.005              # 最早的请求最多等待多久（秒）就必须开始推理
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceBatcher:
+    """
+    微批处理推理队列：各个客户端（sid）提交的窗口先进入同一个队列，
+    后台线程在凑满 max_batch_size 个窗口、或最早的窗口已经等待了 max_wait 秒时，
+    把队列中的窗口堆叠成一个批次交给模型一次计算，再把每个窗口的结果通过回调送回对应的 sid。
+
+    model 需要提供 classify(windows)（例如 tfjs_runtime.TfjsModel），
+    回调的形式为 callback(key, result, context)，在后台线程中调用。
+    submit() 可以为单个请求指定另一个模型（例如按会话选择的模型），
+    同一批次中使用同一个模型的窗口会一起计算。
+
+    模型推理出错时，这一组中每个请求都会收到 error_callback(key, error, context)（例如通知客户端），
+    不会有请求既没有结果也没有错误；错误通过 logging 记录。
+    """
+
+    def __init__(self, model, max_batch_size=MAX_BATCH_SIZE, max_wait=MAX_WAIT, callback=None,
+                 error_callback=None):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.callback = callback
+        self.error_callback = error_callback
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+        # 统计信息
+        self.batches = 0
+        self.windows = 0
+        self.errors = 0
+        self.max_latency = 0.0
+
+    def start(self):
+        if self._thread is not None:
+            return self
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="inference-batcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=1.0):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def submit(self, key, window, callback=None, context=None, model=None):
+        """
+        提交一个窗口 (frames, 33)。key 通常为客户端的 sid，context 会原样传给回调，
+        model 默认为构造时的模型。窗口会被拷贝，调用方之后可以继续修改自己的缓冲区。
+        """
+        request = (key, np.array(window, dtype=np.float32), callback or self.callback, context,
+                   time.perf_counter(), model or self.model)
+        with self._cond:
+            self._queue.append(request)
+            if len(self._queue) >= self.max_batch_size or len(self._queue) == 1:
+                self._cond.notify()
+
+    def pending(self):
+        with self._cond:
+            return len(self._queue)
+
+    def _next_batch(self):
+        """等待并取出下一个批次；停止时返回 None。"""
+        with self._cond:
+            while self._running and not self._queue:
+                self._cond.wait()
+            if not self._running:
+                return None
+            # 从最早的请求开始计时，直到凑满一个批次或超时
+            deadline = self._queue[0][4] + self.max_wait
+            while self._running and len(self._queue) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            count = min(len(self._queue), self.max_batch_size)
+            return [self._queue.popleft() for _ in range(count)]
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            self._process(batch)
+
+    def _process(self, batch):
+        groups = {}
+        for request in batch:
+            groups.setdefault(id(request[5]), []).append(request)
+        for group in groups.values():
+            self._process_group(group)
+
+    def _process_group(self, batch):
+        try:
+            results = batch[0][5].classify(np.stack([request[1] for request in batch]))
+        except Exception as e:
+            self.errors += len(batch)
+            logger.exception("批量推理失败（%d 个窗口）", len(batch))
+            self._fail(batch, e)
+            return
+        done = time.perf_counter()
+        self.batches += 1
+        self.windows += len(batch)
+        self.max_latency = max(self.max_latency, done - batch[0][4])
+        for (key, _, callback, context, _, _), result in zip(batch, results):
+            if callback is None:
+                continue
+            try:
+                callback(key, result, context)
+            except Exception:
+                logger.exception("推理结果回调出错（%s）", key)
+
+    def _fail(self, batch, error):
+        """把推理错误逐个通知给这一组中的请求。"""
+        if self.error_callback is None:
+            return
+        for key, _, _, context, _, _ in batch:
+            try:
+                self.error_callback(key, error, context)
+            except Exception:
+                logger.exception("推理错误回调出错（%s）", key)
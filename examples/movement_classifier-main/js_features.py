@@ -0,0 +1,182 @@
+import os
+import sys
+import json
+import numpy as np
+
+from pose_stream import NUM_JOINTS, JOINT_KEYS, iter_samples
+
+# ------------------- 参数设置 -------------------
+FPS = 30
+CAPTURE_FRAMES = 2 * FPS      # 与浏览器端一致：2 秒的滑动窗口
+dt = 1 / FPS
+
+# 特征名与浏览器端保持一致："V0".."V32" / "Acc0".."Acc32"
+FEATURE_PREFIX = {"velocity": "V", "acceleration": "Acc"}
+
+
+def velocity_features(points, dt=dt):
+    """
+    与 computeJointVelocityFeatures 相同的速度特征：
+      - 速度 = 相邻两帧的欧氏距离 / dt（按 Math.sqrt(dx * dx + dy * dy) 的顺序计算）；
+      - 任一帧缺少该关键点（NaN）时速度为 0；
+      - 复制最后一帧速度，使输出帧数与输入相同。
+    points 形状为 (..., frames, 33, 2)，返回 (..., frames, 33) 的 float64 数组。
+    """
+    points = np.asarray(points, dtype=np.float64)
+    n = points.shape[-3]
+    if n < 2:
+        return np.zeros(points.shape[:-3] + (0, NUM_JOINTS))
+    out = np.empty(points.shape[:-3] + (n, NUM_JOINTS))
+    dx = points[..., 1:, :, 0] - points[..., :-1, :, 0]
+    dy = points[..., 1:, :, 1] - points[..., :-1, :, 1]
+    with np.errstate(invalid="ignore"):
+        v = np.sqrt(dx * dx + dy * dy) / dt
+    out[..., :-1, :] = np.where(np.isnan(v), 0.0, v)
+    out[..., -1, :] = out[..., -2, :]
+    return out
+
+
+def acceleration_features(points, dt=dt):
+    """
+    与 computeJointAccelerationFeatures 相同的加速度特征：
+    先按 velocity_features 计算速度，再取 |后帧速度 - 当前帧速度| / dt，并复制最后一帧。
+    """
+    vel = velocity_features(points, dt)
+    out = np.empty_like(vel)
+    if vel.shape[-2] < 2:
+        return out
+    out[..., :-1, :] = np.abs(vel[..., 1:, :] - vel[..., :-1, :]) / dt
+    out[..., -1, :] = out[..., -2, :]
+    return out
+
+
+FEATURE_FUNCS = {"velocity": velocity_features, "acceleration": acceleration_features}
+
+
+def pad_to_window(points, window=CAPTURE_FRAMES):
+    """帧数不足时用最后一帧补齐（与实时预测时 "filling up with last frame" 的做法相同）。"""
+    n = len(points)
+    if n == 0 or n >= window:
+        return points
+    pad = np.repeat(points[-1:], window - n, axis=0)
+    return np.concatenate([points, pad], axis=0)
+
+
+def features_to_frames(features, kind):
+    """把 (frames, 33) 特征数组转换回浏览器端的帧字典列表，例如 [{"V0":..., ..., "V32":...}, ...]。"""
+    prefix = FEATURE_PREFIX[kind]
+    keys = [f"{prefix}{j}" for j in range(NUM_JOINTS)]
+    return [dict(zip(keys, row)) for row in np.asarray(features).tolist()]
+
+
+def frames_to_features(frames, kind):
+    """把浏览器端输出的帧字典列表转换为 (frames, 33) 数组。"""
+    prefix = FEATURE_PREFIX[kind]
+    return np.array([[frame[f"{prefix}{j}"] for j in range(NUM_JOINTS)] for frame in frames],
+                    dtype=np.float64)
+
+
+def sample_windows(points, window=CAPTURE_FRAMES, hop=None):
+    """
+    按浏览器端的两种用法生成特征窗口的原始帧：
+      - hop=None（训练 sketch_train_*.js）：整段样本计算特征后取前 window 帧，
+        因此返回整段样本，由调用方截取；帧数不足的样本被跳过；
+      - hop=整数（实时预测）：每 hop 帧取一个 window 帧的窗口，每个窗口单独计算特征，
+        不足一个窗口的样本用最后一帧补齐。
+    """
+    n = len(points)
+    if hop is None:
+        return [points] if n >= window else []
+    if n < window:
+        return [pad_to_window(points, window)]
+    return [points[s:s + window] for s in range(0, n - window + 1, hop)]
+
+
+def build_feature_tensor(file_list, kind, window=CAPTURE_FRAMES, hop=None, dtype=np.float32):
+    """
+    对一组 JSON 数据文件批量计算浏览器端特征，返回 (tensor, index)：
+      - tensor: (windows, window, 33) 的稠密数组；
+      - index:  每个窗口对应的 {"file", "sample", "start", "label"}。
+    """
+    func = FEATURE_FUNCS[kind]
+    chunks = []
+    index = []
+    for fname in file_list:
+        for s, (points, label, _) in enumerate(iter_samples(fname, dtype=np.float64)):
+            wins = sample_windows(points, window, hop)
+            if not wins:
+                print(f"Warning: In file {fname}, sample {s} has less than {window} frames.")
+                continue
+            for w, frames in enumerate(wins):
+                chunks.append(func(frames)[:window].astype(dtype))
+                index.append({"file": os.path.basename(fname), "sample": s,
+                              "start": 0 if hop is None else w * hop, "label": label})
+    if not chunks:
+        return np.empty((0, window, NUM_JOINTS), dtype=dtype), index
+    return np.stack(chunks), index
+
+
+def write_feature_tensor(folder, kind, out_path=None, window=CAPTURE_FRAMES, hop=None):
+    """
+    为整个数据文件夹生成特征张量，写入 out_path（.npy）以及同名的 .json 索引文件。
+    默认写到 <folder>/.pose_cache/features_<kind>_<window>.npy。
+    """
+    names = sorted(n for n in os.listdir(folder)
+                   if n.lower().endswith(".json") and not n.endswith("index.json"))
+    tensor, index = build_feature_tensor([os.path.join(folder, n) for n in names],
+                                         kind, window=window, hop=hop)
+    if out_path is None:
+        out_path = os.path.join(folder, ".pose_cache", f"features_{kind}_{window}.npy")
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    np.save(out_path, tensor)
+    with open(os.path.splitext(out_path)[0] + ".json", "w", encoding="utf-8") as f:
+        json.dump({"kind": kind, "window": window, "hop": hop,
+                   "inputs": [f"{FEATURE_PREFIX[kind]}{j}" for j in range(NUM_JOINTS)],
+                   "windows": index}, f, ensure_ascii=False)
+    return out_path, tensor.shape
+
+
+def check_parity(raw_frames, js_frames, kind, rtol=1e-9, atol=1e-6):
+    """
+    比较 Python 实现与浏览器端记录的特征输出：
+      - raw_frames: 浏览器端输入的原始帧字典列表（"x0".."y32"）；
+      - js_frames:  浏览器端 computeJoint*Features 的输出（"V0".. 或 "Acc0"..）。
+    返回最大绝对误差；超出容差时抛出 AssertionError。
+    """
+    points = np.full((len(raw_frames), NUM_JOINTS, 2), np.nan)
+    for f, frame in enumerate(raw_frames):
+        for j, (key_x, key_y) in enumerate(JOINT_KEYS):
+            if key_x in frame and key_y in frame:
+                points[f, j] = (frame[key_x], frame[key_y])
+    ours = FEATURE_FUNCS[kind](points)
+    theirs = frames_to_features(js_frames, kind)
+    if ours.shape != theirs.shape:
+        raise AssertionError(f"帧数不一致：Python {ours.shape} / JS {theirs.shape}")
+    if not np.allclose(ours, theirs, rtol=rtol, atol=atol):
+        raise AssertionError(f"特征不一致，最大误差 {np.max(np.abs(ours - theirs))}")
+    return float(np.max(np.abs(ours - theirs))) if ours.size else 0.0
+
+
+if __name__ == "__main__":
+    # 用法：
+    #   python js_features.py build data/data_test9_velocity velocity [输出.npy]
+    #   python js_features.py check 原始帧.json JS输出.json velocity
+    #     （JS输出.json 为浏览器端 saveJSON(computeJointVelocityFeatures(frames)) 的结果，
+    #       原始帧.json 可以是帧列表，也可以是 {"data":[{"xs":[...]}]} 数据文件中的第一个样本）
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+    if command == "build":
+        out_path, shape = write_feature_tensor(sys.argv[2], sys.argv[3],
+                                               sys.argv[4] if len(sys.argv) > 4 else None)
+        print(f"{out_path}: {shape}")
+    elif command == "check":
+        with open(sys.argv[2], "r", encoding="utf-8") as f:
+            raw = json.load(f)
+        if isinstance(raw, dict):
+            raw = raw["data"][0]["xs"]
+        with open(sys.argv[3], "r", encoding="utf-8") as f:
+            js = json.load(f)
+        err = check_parity(raw, js, sys.argv[4])
+        print(f"一致，最大误差 {err}")
+    else:
+        print("用法：python js_features.py build <文件夹> <velocity|acceleration> [输出.npy]")
+        print("      python js_features.py check <原始帧.json> <JS输出.json> <velocity|acceleration>")
@@ -0,0 +1,137 @@
+import os
+import sys
+import json
+import numpy as np
+
+from pose_stream import NUM_JOINTS, JOINT_KEYS
+from pose_cache import load_pose_array
+from pose_kinematics import to_pose_array
+
+# ------------------- 参数设置 -------------------
+R_DEFAULT = 0.05              # 过程噪声（与 sketch_collectdata_uploadVIDEO_kalfman.js 相同）
+Q_DEFAULT = 0.8               # 测量噪声
+
+
+class KalmanFilter:
+    """
+    kalman.js 中一维 KalmanFilter 的向量化版本：对形状为 shape（默认 33 个关节 × 2 个坐标）
+    的每个元素各自运行一个相同参数的滤波器。R/Q/A/B/C 的含义与 JS 版相同：
+      - R 过程噪声，Q 测量噪声，A 状态转移系数，B 控制输入系数，C 测量系数；
+      - 第一个有效测量值直接初始化 x = z / C，cov = Q / C²；
+      - 测量值缺失（NaN）的元素只做预测，相当于 JS 端低置信度关键点调用 predict()；
+        尚未初始化的元素保持 NaN（JS 的 predict() 此时返回 0）。
+    用于实时流：每到一帧调用一次 filter()。
+    """
+
+    def __init__(self, R=R_DEFAULT, Q=Q_DEFAULT, A=1.0, B=0.0, C=1.0, shape=(NUM_JOINTS, 2)):
+        self.R, self.Q, self.A, self.B, self.C = R, Q, A, B, C
+        self.shape = tuple(shape)
+        self.reset()
+
+    def reset(self):
+        self.x = np.full(self.shape, np.nan)
+        self.cov = np.full(self.shape, np.nan)
+
+    def filter(self, z, u=0.0):
+        """输入一帧测量值 z（形状为 shape，缺失为 NaN），返回滤波后的估计值（拷贝）。"""
+        self.x, self.cov = _step(self.x, self.cov, np.asarray(z, dtype=np.float64), u,
+                                 self.R, self.Q, self.A, self.B, self.C)
+        return self.x.copy()
+
+    def predict(self, u=0.0):
+        """没有新的测量值时只预测下一步状态。"""
+        return self.filter(np.full(self.shape, np.nan), u)
+
+
+def _step(x, cov, z, u, R, Q, A, B, C):
+    """一步滤波（逐元素），返回新的 (x, cov)。"""
+    measured = ~np.isnan(z)
+    initialized = ~np.isnan(x)
+    pred_x = A * x + B * u
+    pred_cov = A * cov * A + R
+    K = (pred_cov * C) / (C * pred_cov * C + Q)
+    upd_x = pred_x + K * (z - C * pred_x)
+    upd_cov = pred_cov - K * C * pred_cov
+    first = measured & ~initialized
+    new_x = np.where(measured, upd_x, pred_x)
+    new_cov = np.where(measured, upd_cov, pred_cov)
+    new_x = np.where(first, z / C, new_x)
+    new_cov = np.where(first, Q / (C * C), new_cov)
+    return new_x, new_cov
+
+
+def kalman_filter(points, R=R_DEFAULT, Q=Q_DEFAULT, A=1.0, B=0.0, C=1.0, u=0.0, rts=False,
+                  missing_zero=False):
+    """
+    离线批量滤波：points 形状为 (..., frames, 33, 2)，例如 pose_cache 的 (samples, frames, 33, 2)。
+    沿帧维度循环，每一步同时处理所有样本、关节与坐标。
+      - rts=False：前向滤波，结果与逐帧调用 KalmanFilter.filter() 相同；
+      - rts=True： 在前向滤波后再做一次 Rauch-Tung-Striebel 反向平滑（离线可用，延迟为整段）。
+    missing_zero=True 时 (0, 0) 占位关键点视为缺失。返回与 points 同形状的 float64 数组。
+    """
+    points = np.asarray(to_pose_array(points, missing_zero=missing_zero), dtype=np.float64)
+    z = np.moveaxis(points, -3, 0)                  # (frames, ..., 33, 2)
+    n = len(z)
+    filtered = np.empty_like(z)
+    filtered_cov = np.empty_like(z)
+    x = np.full(z.shape[1:], np.nan)
+    cov = np.full(z.shape[1:], np.nan)
+    for t in range(n):
+        x, cov = _step(x, cov, z[t], u, R, Q, A, B, C)
+        filtered[t] = x
+        filtered_cov[t] = cov
+
+    if rts and n > 1:
+        smoothed = filtered.copy()
+        for t in range(n - 2, -1, -1):
+            pred_x = A * filtered[t] + B * u
+            pred_cov = A * filtered_cov[t] * A + R
+            gain = filtered_cov[t] * A / pred_cov
+            step = np.where(np.isnan(smoothed[t + 1]), 0.0, smoothed[t + 1] - pred_x)
+            smoothed[t] = filtered[t] + gain * step
+        filtered = smoothed
+    return np.moveaxis(filtered, 0, -3)
+
+
+def smooth_file(filename, R=R_DEFAULT, Q=Q_DEFAULT, rts=True, missing_zero=False):
+    """
+    对一个数据文件的所有样本做批量平滑，返回 (smoothed, meta)：
+    smoothed 形状为 (samples, frames, 33, 2)，超出样本帧数的部分为 NaN。
+    """
+    array, meta = load_pose_array(filename)
+    smoothed = kalman_filter(array, R, Q, rts=rts, missing_zero=missing_zero)
+    # 帧数不足的样本，补齐部分的预测值没有意义，恢复为 NaN
+    for s, count in enumerate(meta["frame_counts"]):
+        smoothed[s, count:] = np.nan
+    return smoothed, meta
+
+
+def write_smoothed_json(filename, out_path, R=R_DEFAULT, Q=Q_DEFAULT, rts=True, missing_zero=False):
+    """把平滑后的数据按原格式（{"data":[{"xs":[...],"ys":{"label":...}}]}）写入 out_path。"""
+    smoothed, meta = smooth_file(filename, R, Q, rts=rts, missing_zero=missing_zero)
+    data = []
+    for s, (count, label) in enumerate(zip(meta["frame_counts"], meta["labels"])):
+        frames = []
+        for row in smoothed[s, :count].tolist():
+            frame = {}
+            for (key_x, key_y), (x, y) in zip(JOINT_KEYS, row):
+                if not (np.isnan(x) or np.isnan(y)):
+                    frame[key_x] = x
+                    frame[key_y] = y
+            frames.append(frame)
+        data.append({"xs": frames, "ys": {"label": label}})
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump({"data": data}, f)
+
+
+if __name__ == "__main__":
+    # 用法：python kalman.py 输入.json 输出.json [R] [Q] [--forward]
+    #   默认使用 RTS 前后向平滑；--forward 只做前向滤波（与浏览器端逐帧滤波的结果相同）
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if len(args) < 2:
+        print("用法：python kalman.py <输入.json> <输出.json> [R] [Q] [--forward]")
+        sys.exit(1)
+    R = float(args[2]) if len(args) > 2 else R_DEFAULT
+    Q = float(args[3]) if len(args) > 3 else Q_DEFAULT
+    write_smoothed_json(args[0], args[1], R, Q, rts="--forward" not in sys.argv)
+    print(f"已写入 {os.path.abspath(args[1])}")
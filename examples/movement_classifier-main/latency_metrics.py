@@ -0,0 +1,196 @@
+import time
+import threading
+
+# ------------------- 参数设置 -------------------
+SUB_BUCKETS = 256             # 每个 2 的幂区间的线性分桶数（相对误差约 1/128 ≈ 0.8%）
+MAX_LATENCY = 60.0            # 记录的最大延迟（秒），更大的值按最大值计
+REPORT_INTERVAL = 30.0        # 定期输出统计信息的间隔（秒）
+
+# 各阶段的时间戳（毫秒，Unix 时间）：浏览器端 capture / predict / emit，服务器端 receive / aggregate / midi
+STAGES = (
+    ("capture_to_predict", "capture", "predict"),     # 浏览器：最新一帧采集 -> 开始预测（特征计算）
+    ("predict_to_emit", "predict", "emit"),           # 浏览器：模型推理与回调
+    ("emit_to_receive", "emit", "receive"),           # 网络与 Socket.IO（跨设备时包含时钟偏差）
+    ("receive_to_aggregate", "receive", "aggregate"), # 服务器：在缓冲区中等待凑满一批
+    ("aggregate_to_midi", "aggregate", "midi"),       # 服务器：MIDI 输出线程的排队、合并与限速
+    ("capture_to_midi", "capture", "midi"),           # 端到端：最新一帧采集 -> CC 发出
+)
+
+
+def now_ms():
+    return time.time() * 1000
+
+
+class LatencyHistogram:
+    """
+    HDR 风格的延迟直方图：以微秒为单位，每个 2 的幂区间 [2^k, 2^(k+1)) 再分成 SUB_BUCKETS / 2 个线性桶，
+    小于 SUB_BUCKETS 微秒的值每微秒一个桶。记录为 O(1)，内存固定，任意分位数的相对误差不超过约 1%。
+    """
+
+    def __init__(self, max_value=MAX_LATENCY, sub_buckets=SUB_BUCKETS):
+        self.sub_buckets = sub_buckets
+        self._half = sub_buckets // 2
+        self._shift = sub_buckets.bit_length() - 1
+        self.max_micros = int(max_value * 1e6)
+        self._counts = [0] * (self._index(self.max_micros) + 1)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def _index(self, micros):
+        bucket = max(micros.bit_length() - self._shift, 0)
+        return (bucket * self._half) + (micros >> bucket)
+
+    def _value(self, index):
+        """桶的中间值（微秒）。"""
+        if index < self.sub_buckets:
+            return index
+        bucket = index // self._half - 1
+        low = (index - bucket * self._half) << bucket
+        return low + ((1 << bucket) >> 1)
+
+    def record(self, seconds):
+        """记录一次延迟（秒）；负值（跨设备的时钟偏差）按 0 计。"""
+        micros = min(max(int(seconds * 1e6), 0), self.max_micros)
+        with self._lock:
+            self._counts[self._index(micros)] += 1
+            self.count += 1
+            self.total += micros
+            self.min = micros if self.min is None else min(self.min, micros)
+            self.max = max(self.max, micros)
+
+    def percentile(self, p):
+        """第 p 百分位的延迟（秒）。"""
+        with self._lock:
+            if self.count == 0:
+                return 0.0
+            rank = max(1, int(round(p / 100 * self.count)))
+            seen = 0
+            for index, c in enumerate(self._counts):
+                seen += c
+                if seen >= rank:
+                    return min(self._value(index), self.max) / 1e6
+        return self.max / 1e6
+
+    def merge(self, other):
+        with self._lock, other._lock:
+            for i, c in enumerate(other._counts):
+                self._counts[i] += c
+            self.count += other.count
+            self.total += other.total
+            if other.min is not None:
+                self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = max(self.max, other.max)
+
+    def reset(self):
+        with self._lock:
+            self._counts = [0] * len(self._counts)
+            self.count = self.total = self.max = 0
+            self.min = None
+
+    def summary(self):
+        """毫秒为单位的统计：count / mean / min / p50 / p90 / p99 / p99.9 / max。"""
+        result = {"count": self.count,
+                  "mean_ms": self.total / self.count / 1000 if self.count else 0.0,
+                  "min_ms": (self.min or 0) / 1000}
+        for p in (50, 90, 99, 99.9):
+            result[f"p{p:g}_ms"] = self.percentile(p) * 1000
+        result["max_ms"] = self.max / 1000
+        return result
+
+
+class LatencyMetrics:
+    """
+    按阶段统计延迟：midiData 负载中的 "timestamps" 字典记录各阶段的时间（毫秒），
+    浏览器端写入 capture / predict / emit，服务器在接收、凑批处理与 MIDI 发出时写入 receive / aggregate / midi。
+    MIDI 发出时间通过 MidiScheduler 的 on_send 回调得到：调度器自己的时钟（time.monotonic）只用于计算
+    aggregate_to_midi 的时间差，与浏览器端比较用的 midi 时间在回调中用 time.time() 读取。
+    """
+
+    def __init__(self):
+        self.histograms = {name: LatencyHistogram() for name, _, _ in STAGES}
+        self._pending = {}        # (channel, control) -> 该次更新所用数据中最新一帧的采集时间（毫秒）
+        self._lock = threading.Lock()
+        self.started = time.time()
+
+    def record(self, stage, start_ms, end_ms):
+        if start_ms is not None and end_ms is not None:
+            self.histograms[stage].record((end_ms - start_ms) / 1000)
+
+    @staticmethod
+    def timestamps(data):
+        if not isinstance(data, dict):
+            return {}
+        stamps = data.get("timestamps")
+        if not isinstance(stamps, dict):
+            stamps = data["timestamps"] = {}
+        return stamps
+
+    def on_receive(self, data):
+        """收到一条 midiData 时调用：写入 receive 时间，并统计浏览器端各阶段。"""
+        stamps = self.timestamps(data)
+        stamps["receive"] = now_ms()
+        for stage, start, end in STAGES[:3]:
+            self.record(stage, stamps.get(start), stamps.get(end))
+
+    def on_aggregate(self, data_list, channel=0, control=None):
+        """
+        一批数据被处理（计算 tempo）时调用：写入 aggregate 时间并统计每条数据的等待时间；
+        control 不为 None 时表示这批数据产生了一条 CC 更新，记下其中最新一帧的采集时间以统计端到端延迟。
+        """
+        aggregate = now_ms()
+        captures = []
+        for data in data_list:
+            stamps = self.timestamps(data)
+            stamps["aggregate"] = aggregate
+            self.record("receive_to_aggregate", stamps.get("receive"), aggregate)
+            if stamps.get("capture") is not None:
+                captures.append(stamps["capture"])
+        if control is not None and captures:
+            with self._lock:
+                self._pending[(channel, control)] = max(captures)
+
+    def on_midi_send(self, channel, control, value, submitted, sent):
+        """
+        MidiScheduler 的 on_send 回调：submitted / sent 为调度器时钟（time.monotonic）的读数（秒），只用来求时间差；
+        端到端延迟的结束时间在这里用 time.time() 读取（消息刚发出，与 sent 相差可以忽略）。
+        """
+        midi = now_ms()
+        self.histograms["aggregate_to_midi"].record(sent - submitted)
+        with self._lock:
+            capture = self._pending.pop((channel, control), None)
+        self.record("capture_to_midi", capture, midi)
+
+    def summary(self):
+        return {"uptime_s": time.time() - self.started,
+                "stages": {name: hist.summary() for name, hist in self.histograms.items()}}
+
+    def format_summary(self):
+        lines = ["延迟统计（毫秒）：  阶段                     次数    p50     p90     p99     max"]
+        for name, hist in self.histograms.items():
+            s = hist.summary()
+            if s["count"]:
+                lines.append(f"  {name:<24} {s['count']:>6} {s['p50_ms']:>7.1f} {s['p90_ms']:>7.1f} "
+                             f"{s['p99_ms']:>7.1f} {s['max_ms']:>7.1f}")
+        return "\n".join(lines)
+
+    def start_reporter(self, interval=REPORT_INTERVAL):
+        """后台线程：每 interval 秒输出一次统计信息（有数据时）。"""
+        def report():
+            while True:
+                time.sleep(interval)
+                if any(h.count for h in self.histograms.values()):
+                    print(self.format_summary())
+        threading.Thread(target=report, name="latency-report", daemon=True).start()
+        return self
+
+    def register(self, app, path="/metrics"):
+        """在 Flask app 上注册返回 JSON 统计信息的路由。"""
+        app.add_url_rule(path, "latency_metrics", lambda: self.summary())
+        return self
+
+
+# 进程内共用的统计对象（tempo_control.py、send_midi.py 与 server.py 等都写入这里）
+metrics = LatencyMetrics()
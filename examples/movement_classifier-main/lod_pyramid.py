@@ -0,0 +1,115 @@
+import numpy as np
+
+# ------------------- 参数设置 -------------------
+FACTOR = 4                    # 每一级的桶大小是上一级的 FACTOR 倍
+MAX_POINTS = 600              # 可见窗口内最多绘制的点数（与录制长度无关）
+
+
+class LODPyramid:
+    """
+    曲线的多分辨率（level-of-detail）金字塔：第 l 级把每 FACTOR**l 帧合为一个桶，
+    保存桶内的最小值、最大值与均值（忽略 NaN）。values 形状为 (frames, ...)，
+    例如单条曲线 (frames,) 或 33 个关键点 (frames, 33)，每一列独立统计。
+
+    与 [::step] 子采样不同，最小/最大值包络保留了两个采样点之间的尖峰；
+    绘图时按可见窗口的长度选择级别，使绘制的点数不超过 max_points。
+    """
+
+    def __init__(self, values, factor=FACTOR):
+        values = np.asarray(values, dtype=np.float64)
+        self.factor = factor
+        self.length = len(values)
+        valid = ~np.isnan(values)
+        level = {"min": values, "max": values,
+                 "sum": np.where(valid, values, 0.0), "count": valid.astype(np.int64)}
+        self.levels = [level]
+        while len(level["min"]) > 1:
+            level = self._reduce(level)
+            self.levels.append(level)
+
+    def _reduce(self, level):
+        n = len(level["min"])
+        pad = -n % self.factor
+
+        def buckets(a, fill):
+            if pad:
+                a = np.concatenate([a, np.full((pad,) + a.shape[1:], fill, dtype=a.dtype)])
+            return a.reshape((-1, self.factor) + a.shape[1:])
+
+        # fmin/fmax 忽略 NaN，整桶都是 NaN 时结果才为 NaN
+        return {"min": np.fmin.reduce(buckets(level["min"], np.nan), axis=1),
+                "max": np.fmax.reduce(buckets(level["max"], np.nan), axis=1),
+                "sum": buckets(level["sum"], 0.0).sum(axis=1),
+                "count": buckets(level["count"], 0).sum(axis=1)}
+
+    def extent(self):
+        """整条曲线（所有列）的 (最小值, 最大值)，用于固定 y 轴范围。"""
+        top = self.levels[-1]
+        return float(np.nanmin(top["min"])), float(np.nanmax(top["max"]))
+
+    def bucket(self, level):
+        """第 level 级每个桶包含的帧数。"""
+        return self.factor ** level
+
+    def level_for(self, span, max_points=MAX_POINTS):
+        """跨度为 span 帧的窗口在不超过 max_points 个点时可用的最精细级别。"""
+        for l in range(len(self.levels)):
+            if -(-span // self.bucket(l)) <= max_points:
+                return l
+        return len(self.levels) - 1
+
+    def _stats(self, level, i0, i1):
+        lv = self.levels[level]
+        b = self.bucket(level)
+        idx = np.arange(i0, i1)
+        # 桶覆盖 [i*b, min((i+1)*b, length))，x 取桶的中心帧
+        x = (idx * b + np.minimum((idx + 1) * b, self.length) - 1) / 2
+        count = lv["count"][i0:i1]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(count > 0, lv["sum"][i0:i1] / count, np.nan)
+        return x, lv["min"][i0:i1], lv["max"][i0:i1], mean
+
+    def window(self, start, stop, max_points=MAX_POINTS):
+        """
+        返回帧区间 [start, stop) 内的 (x, min, max, mean)，x 为桶中心的帧序号，
+        点数不超过 max_points（区间端点所在的桶完整包含在内）。
+        """
+        start = max(0, int(start))
+        stop = min(self.length, int(np.ceil(stop)))
+        if stop <= start:
+            empty = np.empty((0,) + self.levels[0]["min"].shape[1:])
+            return np.empty(0), empty, empty, empty
+        level = self.level_for(stop - start, max_points)
+        b = self.bucket(level)
+        return self._stats(level, start // b, -(-stop // b))
+
+    def overview(self, max_points=MAX_POINTS):
+        """整条曲线在不超过 max_points 个点时的 (x, min, max, mean)。"""
+        return self.window(0, self.length, max_points)
+
+
+def plot_window(ax, pyramid, start, stop, dt, column=None, max_points=MAX_POINTS,
+                envelope=True, band=None, **line_kw):
+    """
+    在 ax 上绘制 pyramid 在时间区间 [start, stop)（秒）内的曲线：
+      - 折线为每个桶的均值；
+      - envelope=True 时用 fill_between 绘制桶内最小/最大值包络（保留尖峰）；
+      - band=(下界金字塔, 上界金字塔) 时额外绘制置信带（例如均值 ± 标准差）。
+    column 用于从 (frames, 33) 金字塔中选择一个关键点。返回新建的图元列表，便于之后移除。
+    """
+    def pick(a):
+        return a if column is None else a[:, column]
+
+    first, last = start / dt, stop / dt
+    x, lo, hi, mean = pyramid.window(first, last, max_points)
+    t = x * dt
+    color = line_kw.get("color")
+    artists = ax.plot(t, pick(mean), **line_kw)
+    if envelope:
+        artists.append(ax.fill_between(t, pick(lo), pick(hi), color=color, alpha=0.3, linewidth=0))
+    if band is not None:
+        _, band_lo, _, _ = band[0].window(first, last, max_points)
+        _, _, band_hi, _ = band[1].window(first, last, max_points)
+        artists.append(ax.fill_between(t, pick(band_lo), pick(band_hi), color=color, alpha=0.12,
+                                       linewidth=0))
+    return artists
@@ -0,0 +1,122 @@
+import os
+import time
+import threading
+
+# ------------------- 参数设置 -------------------
+# 启动时按环境变量选择 MIDI 输出：
+#   MIDI_BACKEND=mido（默认）/ null / recording / virtual
+#   MIDI_PORT=端口名称（mido 为要打开的端口，virtual 为新建的虚拟端口名称）
+#   MIDI_FALLBACK=null 等：端口打不开时改用的输出（默认不设置，打不开时直接报错退出）
+DEFAULT_BACKEND = "mido"
+DEFAULT_PORT = "IAC Driver Bus 1"
+VIRTUAL_PORT = "movement_classifier"
+
+
+class MidiBackend:
+    """MIDI 输出接口：control_change(channel, control, value) 发送一条 CC 消息，close() 释放端口。"""
+
+    name = "base"
+
+    def control_change(self, channel, control, value):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class MidoBackend(MidiBackend):
+    """通过 mido 打开已有的 MIDI 输出端口（例如 macOS 的 IAC Driver）。"""
+
+    name = "mido"
+
+    def __init__(self, port_name=DEFAULT_PORT):
+        import mido
+        self._mido = mido
+        self.port_name = port_name
+        self.outport = mido.open_output(port_name)
+
+    def control_change(self, channel, control, value):
+        self.outport.send(self._mido.Message('control_change', channel=channel, control=control, value=value))
+
+    def close(self):
+        self.outport.close()
+
+
+class VirtualPortBackend(MidiBackend):
+    """用 python-rtmidi 新建一个虚拟输出端口（Linux 的 ALSA / macOS 的 CoreMIDI），其他程序可以连接到它。"""
+
+    name = "virtual"
+
+    def __init__(self, port_name=VIRTUAL_PORT):
+        import rtmidi
+        self.port_name = port_name
+        self.midiout = rtmidi.MidiOut()
+        self.midiout.open_virtual_port(port_name)
+
+    def control_change(self, channel, control, value):
+        self.midiout.send_message([0xB0 | (channel & 0x0F), control & 0x7F, value & 0x7F])
+
+    def close(self):
+        self.midiout.close_port()
+        del self.midiout
+
+
+class NullBackend(MidiBackend):
+    """丢弃所有消息，只计数（没有 MIDI 设备的机器、压力测试等）。"""
+
+    name = "null"
+
+    def __init__(self, *args):
+        self.count = 0
+
+    def control_change(self, channel, control, value):
+        self.count += 1
+
+
+class RecordingBackend(MidiBackend):
+    """在内存中记录每条消息及其发送时间 (时间, channel, control, value)，用于测试与测量延迟。"""
+
+    name = "recording"
+
+    def __init__(self, *args, clock=time.monotonic):
+        self.clock = clock
+        self._messages = []
+        self._lock = threading.Lock()
+
+    def control_change(self, channel, control, value):
+        with self._lock:
+            self._messages.append((self.clock(), channel, control, value))
+
+    def messages(self):
+        with self._lock:
+            return list(self._messages)
+
+    def clear(self):
+        with self._lock:
+            self._messages.clear()
+
+
+BACKENDS = {cls.name: cls for cls in (MidoBackend, VirtualPortBackend, NullBackend, RecordingBackend)}
+
+
+def open_backend(name=None, port_name=None, fallback=None):
+    """
+    按名称（默认读取环境变量 MIDI_BACKEND）打开 MIDI 输出。
+    端口打不开或缺少依赖（mido / python-rtmidi）时默认直接抛出异常，避免在没有察觉的情况下不发送任何消息；
+    只有指定了 fallback（默认读取环境变量 MIDI_FALLBACK，例如 null）时才给出警告并改用它。
+    """
+    name = (name or os.environ.get("MIDI_BACKEND") or DEFAULT_BACKEND).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"不支持的 MIDI 输出：{name}（可选 {', '.join(BACKENDS)}）")
+    fallback = (fallback or os.environ.get("MIDI_FALLBACK") or "").lower() or None
+    if fallback is not None and fallback not in BACKENDS:
+        raise ValueError(f"不支持的 MIDI 输出：{fallback}（可选 {', '.join(BACKENDS)}）")
+    port_name = port_name or os.environ.get("MIDI_PORT")
+    cls = BACKENDS[name]
+    try:
+        return cls(port_name) if port_name else cls()
+    except (IOError, OSError, ImportError) as e:
+        if fallback is None:
+            raise
+        print(f"无法打开 MIDI 输出 {name}（{port_name or '默认端口'}）：{e}，改用 {fallback}，不会发送任何 MIDI 消息。")
+        return BACKENDS[fallback]()
@@ -0,0 +1,136 @@
+import time
+import threading
+from collections import deque
+
+# ------------------- 参数设置 -------------------
+MIN_INTERVAL = 0.02           # 同一个控制器（channel, CC）两次发送的最小间隔（秒），即每个控制器最多 50 条/秒
+
+
+class MidiScheduler:
+    """
+    MIDI 输出线程：调用方（Socket.IO 处理函数等）只把 (channel, CC, value) 放进队列后立即返回，
+    由单独的线程调用 send(channel, control, value) 发送，处理函数的延迟与 MIDI 驱动无关。
+
+      - 队列为 collections.deque，append / popleft 在 CPython 中是原子操作，提交时不需要加锁；
+      - 合并：同一个 (channel, CC) 尚未发出的更新只保留最新的值；
+      - 去重：与该控制器上一次发出的值相同时不再发送；
+      - 限速：同一个控制器两次发送至少间隔 min_interval 秒，期间到来的更新合并为一条；
+      - 定时：submit(..., at=t) 表示不早于时钟 clock() 到达 t 时发送（clock 默认为 time.monotonic）。
+
+    on_send(channel, control, value, submitted, sent) 在每条消息发出后调用（时间均为 clock() 的读数），
+    可用于统计延迟。
+    """
+
+    def __init__(self, send, min_interval=MIN_INTERVAL, suppress_duplicates=True,
+                 clock=time.monotonic, on_send=None):
+        self.send = send
+        self.min_interval = min_interval
+        self.suppress_duplicates = suppress_duplicates
+        self.clock = clock
+        self.on_send = on_send
+        self._queue = deque()
+        self._wake = threading.Event()
+        self._pending = {}        # (channel, control) -> (value, 最早发送时间, 提交时间)
+        self._last_value = {}     # (channel, control) -> 上一次发出的值
+        self._last_time = {}      # (channel, control) -> 上一次发出的时间
+        self._thread = None
+        self._running = False
+        # 统计信息
+        self.submitted = 0
+        self.sent = 0
+        self.coalesced = 0
+        self.suppressed = 0
+        self.errors = 0
+        self.max_delay = 0.0
+
+    def start(self):
+        if self._thread is not None:
+            return self
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="midi-scheduler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, flush=True, timeout=1.0):
+        """停止输出线程；flush=True 时先发出所有已到时间的更新。"""
+        self._running = False
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if flush:
+            self._drain_queue()
+            self._send_due(float("inf"))
+
+    def submit(self, control, value, channel=0, at=None):
+        """提交一条 control change（value 限制在 0～127），立即返回。"""
+        value = max(0, min(127, int(value)))
+        now = self.clock()
+        self._queue.append((channel, control, value, now if at is None else at, now))
+        self.submitted += 1
+        self._wake.set()
+
+    def pending(self):
+        return len(self._queue) + len(self._pending)
+
+    def _drain_queue(self):
+        while True:
+            try:
+                channel, control, value, due, submitted = self._queue.popleft()
+            except IndexError:
+                return
+            key = (channel, control)
+            if key in self._pending:
+                self.coalesced += 1
+                submitted = self._pending[key][2]   # 延迟从最早的未发出更新开始计算
+            self._pending[key] = (value, due, submitted)
+
+    def _send_due(self, now):
+        """发出所有已到时间且不受限速影响的更新，返回下一次需要醒来的时间（没有则为 None）。"""
+        wake_at = None
+        for key, (value, due, submitted) in list(self._pending.items()):
+            if self.suppress_duplicates and self._last_value.get(key) == value:
+                del self._pending[key]
+                self.suppressed += 1
+                continue
+            ready = max(due, self._last_time.get(key, -float("inf")) + self.min_interval)
+            if ready > now:
+                wake_at = ready if wake_at is None else min(wake_at, ready)
+                continue
+            del self._pending[key]
+            try:
+                self.send(key[0], key[1], value)
+            except Exception as e:
+                self.errors += 1
+                print(f"MIDI 发送失败（CC {key[1]} = {value}）：{e}")
+                continue
+            sent = self.clock()
+            self._last_value[key] = value
+            self._last_time[key] = sent
+            self.sent += 1
+            self.max_delay = max(self.max_delay, sent - submitted)
+            if self.on_send is not None:
+                self.on_send(key[0], key[1], value, submitted, sent)
+        return wake_at
+
+    def poll(self, now=None):
+        """
+        输出线程的一步：取出队列中的更新并发出所有已到时间的消息，返回下一次需要醒来的时间（没有则为 None）。
+        未调用 start() 时可以直接调用（例如测试中配合自定义的 clock 逐步推进）。
+        """
+        self._drain_queue()
+        return self._send_due(self.clock() if now is None else now)
+
+    def _run(self):
+        while self._running:
+            self._wake.clear()
+            wake_at = self.poll()
+            if self._queue:
+                continue
+            timeout = None if wake_at is None else max(wake_at - self.clock(), 0)
+            self._wake.wait(timeout)
+
+    def stats(self):
+        return {"submitted": self.submitted, "sent": self.sent, "coalesced": self.coalesced,
+                "suppressed": self.suppressed, "errors": self.errors, "pending": self.pending(),
+                "max_delay_ms": self.max_delay * 1000}
@@ -0,0 +1,144 @@
+import os
+import sys
+import time
+import threading
+from collections import OrderedDict
+
+from tfjs_runtime import MODEL_FILE, META_FILE, TfjsModel
+
+# ------------------- 参数设置 -------------------
+MODEL_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "model")
+CAPACITY = 4                  # 同时保留在内存中的模型数量（LRU）
+CHECK_INTERVAL = 1.0          # 同一个模型两次检查文件是否变化的最小间隔（秒）
+
+
+def _signature(model_dir):
+    """模型文件（model.json、model_meta.json 与所有 .bin 权重文件）的 (名称, mtime, 大小) 列表。"""
+    signature = []
+    for name in sorted(os.listdir(model_dir)):
+        if name in (MODEL_FILE, META_FILE) or name.endswith(".bin"):
+            stat = os.stat(os.path.join(model_dir, name))
+            signature.append((name, stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+
+class ModelRegistry:
+    """
+    模型注册表：
+      - discover() 查找 root 下所有包含 model.json 的文件夹，名称为文件夹名；
+      - get(name) 在第一次使用时才加载模型，之后保存在 LRU 中，超过 capacity 时淘汰最久未用的模型；
+      - 每次 get() 时（最多每 check_interval 秒一次）检查文件的 mtime/大小，
+        变化后加载新模型并替换，正在使用旧模型对象的请求不受影响；
+        新文件加载失败（例如还没写完）时继续使用旧模型，下次再试。
+      - 权重拷贝到内存中（TfjsModel.load(copy=True)），不使用内存映射：
+        模型文件被原地改写或截断时，已加载的模型（包括加载失败时继续使用的旧模型）不受影响。
+    """
+
+    def __init__(self, root=MODEL_ROOT, capacity=CAPACITY, check_interval=CHECK_INTERVAL):
+        self.root = root
+        self.capacity = capacity
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._loading = {}            # 名称 -> 该模型的加载锁，避免同一个模型被并发加载多次
+        self._models = OrderedDict()  # 名称 -> [模型, 文件签名, 上次检查时间]
+        self._paths = {}
+        self.discover()
+
+    def discover(self):
+        """重新扫描模型文件夹，返回 {名称: 路径}。"""
+        paths = {}
+        if os.path.isdir(self.root):
+            for entry in sorted(os.scandir(self.root), key=lambda e: e.name):
+                if entry.is_dir() and os.path.exists(os.path.join(entry.path, MODEL_FILE)):
+                    paths[entry.name] = entry.path
+        with self._lock:
+            self._paths = paths
+            for name in list(self._models):
+                if name not in paths:
+                    del self._models[name]
+        return dict(paths)
+
+    def names(self):
+        with self._lock:
+            return list(self._paths)
+
+    def loaded(self):
+        """当前在内存中的模型名称（从最久未用到最近使用）。"""
+        with self._lock:
+            return list(self._models)
+
+    def resolve(self, name):
+        """按名称查找模型（不区分大小写，例如 model_velocity_test8 / Model_velocity_test8）。"""
+        with self._lock:
+            if name in self._paths:
+                return name
+            lowered = {n.lower(): n for n in self._paths}
+        if name.lower() in lowered:
+            return lowered[name.lower()]
+        if name not in self.discover():
+            raise KeyError(f"找不到模型：{name}")
+        return name
+
+    def get(self, name):
+        """取得模型（必要时加载或重新加载），返回 TfjsModel。"""
+        name = self.resolve(name)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._models.get(name)
+            if entry is not None:
+                self._models.move_to_end(name)
+                if now - entry[2] < self.check_interval:
+                    return entry[0]
+            path = self._paths[name]
+            load_lock = self._loading.setdefault(name, threading.Lock())
+
+        # 文件检查与加载在全局锁之外进行，其他模型的请求不会被阻塞
+        with load_lock:
+            with self._lock:
+                entry = self._models.get(name)
+            try:
+                signature = _signature(path)
+            except OSError:
+                signature = None
+            if entry is not None and (signature is None or signature == entry[1]):
+                entry[2] = now
+                return entry[0]
+            try:
+                model = TfjsModel.load(path, copy=True)
+            except Exception as e:
+                if entry is None:
+                    raise
+                print(f"重新加载模型 {name} 失败，继续使用旧版本：{e}")
+                entry[2] = now
+                return entry[0]
+            if entry is not None:
+                print(f"模型 {name} 的文件已变化，已重新加载")
+            with self._lock:
+                self._models[name] = [model, signature, now]
+                self._models.move_to_end(name)
+                while len(self._models) > self.capacity:
+                    self._models.popitem(last=False)
+            return model
+
+    def preload(self, names, background=True):
+        """提前加载模型，避免第一次请求时的冷启动延迟；background=True 时在后台线程中加载。"""
+        def load_all():
+            for name in names:
+                try:
+                    self.get(name)
+                except Exception as e:
+                    print(f"预加载模型 {name} 失败：{e}")
+        if background:
+            threading.Thread(target=load_all, name="model-preload", daemon=True).start()
+        else:
+            load_all()
+
+
+if __name__ == "__main__":
+    # 用法：python model_registry.py [模型名 ...]  列出模型并加载指定模型
+    registry = ModelRegistry()
+    for name in registry.names():
+        print(name)
+    for name in sys.argv[1:]:
+        model = registry.get(name)
+        print(f"{model.name}: 输入 {model.input_shape}，特征 {model.feature_kind}，类别 {model.labels}")
@@ -0,0 +1,205 @@
+import os
+import sys
+import json
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+from pose_stream import NUM_JOINTS
+from js_features import CAPTURE_FRAMES, FEATURE_PREFIX, build_feature_tensor
+
+# ------------------- 参数设置 -------------------
+RELATIVE_ACCURACY = 0.01      # 分位数草图的相对误差（1%）
+MIN_VALUE = 1e-6              # 草图能区分的最小绝对值，更小的值计入 0 桶
+MAX_VALUE = 1e12              # 草图能区分的最大绝对值，更大的值计入最后一个桶
+
+
+class QuantileSketch:
+    """
+    对数分桶的分位数草图（与 DDSketch 相同的思路），对每个输入（列）分别统计：
+    值 x > 0 落入第 ceil(log_gamma(x)) 个桶，gamma = (1 + a) / (1 - a)，
+    因此任意分位数的相对误差不超过 a。负值使用镜像的桶，绝对值很小的值计入 0 桶。
+    桶数固定（与数据量无关），两个草图直接把桶计数相加即可合并。
+    """
+
+    def __init__(self, columns, alpha=RELATIVE_ACCURACY, min_value=MIN_VALUE, max_value=MAX_VALUE):
+        self.columns = columns
+        self.alpha = alpha
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self.log_gamma = np.log(self.gamma)
+        self.offset = int(np.ceil(np.log(min_value) / self.log_gamma))
+        self.buckets = int(np.ceil(np.log(max_value) / self.log_gamma)) - self.offset + 1
+        self.positive = np.zeros((columns, self.buckets), dtype=np.int64)
+        self.negative = np.zeros((columns, self.buckets), dtype=np.int64)
+        self.zeros = np.zeros(columns, dtype=np.int64)
+        self.min_value = min_value
+
+    def _bucket_counts(self, values):
+        """values: (n, columns) 的正数（NaN 表示不计入），返回 (columns, buckets) 的计数。"""
+        rows, cols = np.nonzero(~np.isnan(values))
+        keys = np.ceil(np.log(values[rows, cols]) / self.log_gamma).astype(np.int64) - self.offset
+        keys = np.clip(keys, 0, self.buckets - 1)
+        flat = np.bincount(cols * self.buckets + keys, minlength=self.columns * self.buckets)
+        return flat.reshape(self.columns, self.buckets)
+
+    def add(self, values):
+        """加入一批数据 (n, columns)，NaN 忽略。"""
+        values = np.asarray(values, dtype=np.float64).reshape(-1, self.columns)
+        small = np.abs(values) < self.min_value
+        self.zeros += small.sum(axis=0)
+        with np.errstate(invalid="ignore"):
+            self.positive += self._bucket_counts(np.where((values > 0) & ~small, values, np.nan))
+            self.negative += self._bucket_counts(np.where((values < 0) & ~small, -values, np.nan))
+
+    def merge(self, other):
+        self.positive += other.positive
+        self.negative += other.negative
+        self.zeros += other.zeros
+        return self
+
+    def _value(self, key):
+        # 桶 (gamma^(k-1), gamma^k] 的代表值，使相对误差不超过 alpha
+        return 2 * self.gamma ** (key + self.offset) / (self.gamma + 1)
+
+    def quantile(self, q):
+        """每一列的 q 分位数（0 <= q <= 1），没有数据的列为 NaN。"""
+        result = np.full(self.columns, np.nan)
+        for c in range(self.columns):
+            # 从最小值到最大值排列的桶计数：负数桶（逆序）、0 桶、正数桶
+            counts = np.concatenate([self.negative[c, ::-1], [self.zeros[c]], self.positive[c]])
+            total = counts.sum()
+            if total == 0:
+                continue
+            i = int(np.searchsorted(np.cumsum(counts), q * (total - 1), side="right"))
+            if i < self.buckets:
+                result[c] = -self._value(self.buckets - 1 - i)
+            elif i == self.buckets:
+                result[c] = 0.0
+            else:
+                result[c] = self._value(i - self.buckets - 1)
+        return result
+
+
+class NormalizationStats:
+    """每个输入的样本数、精确最小/最大值与分位数草图，可合并。"""
+
+    def __init__(self, columns=NUM_JOINTS):
+        self.columns = columns
+        self.count = np.zeros(columns, dtype=np.int64)
+        self.min = np.full(columns, np.inf)
+        self.max = np.full(columns, -np.inf)
+        self.sketch = QuantileSketch(columns)
+
+    def add(self, features):
+        """加入一批特征 (..., columns)，例如 (windows, frames, 33)。"""
+        values = np.asarray(features, dtype=np.float64).reshape(-1, self.columns)
+        if len(values) == 0:
+            return
+        self.count += (~np.isnan(values)).sum(axis=0)
+        self.min = np.fmin(self.min, np.nanmin(values, axis=0))
+        self.max = np.fmax(self.max, np.nanmax(values, axis=0))
+        self.sketch.add(values)
+
+    def merge(self, other):
+        self.count += other.count
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+        self.sketch.merge(other.sketch)
+        return self
+
+    def bounds(self, lower=None, upper=None):
+        """
+        归一化范围 (min, max)：默认为精确的最小/最大值（与 ml5 normalizeData() 相同）；
+        给出 lower / upper（百分数，例如 0.5 与 99.5）时改用分位数截断，对异常尖峰更稳健。
+        """
+        lo = self.min if lower is None else np.maximum(self.sketch.quantile(lower / 100), self.min)
+        hi = self.max if upper is None else np.minimum(self.sketch.quantile(upper / 100), self.max)
+        return lo, hi
+
+
+def _file_stats(filename, kind, window, hop):
+    """子进程：计算一个文件所有窗口的特征并累加统计，只返回统计量。"""
+    stats = NormalizationStats()
+    tensor, _ = build_feature_tensor([filename], kind, window=window, hop=hop, dtype=np.float64)
+    stats.add(tensor)
+    return stats
+
+
+def dataset_stats(file_list, kind, window=CAPTURE_FRAMES, hop=None, max_workers=None):
+    """
+    用进程池对一组数据文件计算特征并一次性统计归一化参数（每个进程一次只处理一个文件）。
+    特征与浏览器端训练时相同（见 js_features.build_feature_tensor）。
+    """
+    stats = NormalizationStats()
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        for part in pool.map(_file_stats, file_list, [kind] * len(file_list),
+                             [window] * len(file_list), [hop] * len(file_list)):
+            stats.merge(part)
+    return stats
+
+
+def inputs_block(stats, kind, lower=None, upper=None):
+    """生成与 model_meta.json 中 "inputs" 相同格式的字典：{"Acc0": {"dtype": "number", "min":..., "max":...}}。"""
+    lo, hi = stats.bounds(lower, upper)
+    prefix = FEATURE_PREFIX[kind]
+    return {f"{prefix}{j}": {"dtype": "number", "min": float(lo[j]), "max": float(hi[j])}
+            for j in range(stats.columns)}
+
+
+def meta_feature(meta):
+    """由 model_meta.json 推断特征类型与窗口长度：("acceleration" | "velocity", seriesShape[0])。"""
+    first = next(iter(meta["inputs"]))
+    kind = next(k for k, prefix in sorted(FEATURE_PREFIX.items(), key=lambda kv: -len(kv[1]))
+                if first.startswith(prefix))
+    return kind, meta["seriesShape"][0]
+
+
+def check_meta(meta, stats, kind, rtol=1e-9):
+    """
+    比较 model_meta.json 的 inputs 与数据统计，返回不一致的输入列表
+    [(名称, meta 的 (min, max), 数据的 (min, max))]；列表为空表示一致。
+    """
+    mismatches = []
+    block = inputs_block(stats, kind)
+    for name, expected in meta["inputs"].items():
+        actual = block.get(name)
+        if actual is None:
+            mismatches.append((name, (expected["min"], expected["max"]), None))
+            continue
+        if not (np.isclose(expected["min"], actual["min"], rtol=rtol)
+                and np.isclose(expected["max"], actual["max"], rtol=rtol)):
+            mismatches.append((name, (expected["min"], expected["max"]), (actual["min"], actual["max"])))
+    return mismatches
+
+
+def _data_files(folder):
+    names = sorted(n for n in os.listdir(folder)
+                   if n.lower().endswith(".json") and not n.endswith("index.json"))
+    return [os.path.join(folder, n) for n in names]
+
+
+if __name__ == "__main__":
+    # 用法：
+    #   python normalization_stats.py build data/data_test9_acceleration acceleration [60] [0.5 99.5]
+    #     输出 inputs 块（可选窗口长度与分位数截断范围）
+    #   python normalization_stats.py check model/Model_Acceleration_test9 data/data_test9_acceleration
+    #     用数据重新计算 min/max 并与 model_meta.json 比较
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+    if command == "build":
+        folder, kind = sys.argv[2], sys.argv[3]
+        window = int(sys.argv[4]) if len(sys.argv) > 4 else CAPTURE_FRAMES
+        lower, upper = (float(sys.argv[5]), float(sys.argv[6])) if len(sys.argv) > 6 else (None, None)
+        stats = dataset_stats(_data_files(folder), kind, window)
+        print(json.dumps({"inputs": inputs_block(stats, kind, lower, upper)}, indent=2))
+    elif command == "check":
+        with open(os.path.join(sys.argv[2], "model_meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        kind, window = meta_feature(meta)
+        stats = dataset_stats(_data_files(sys.argv[3]), kind, window)
+        mismatches = check_meta(meta, stats, kind)
+        if not mismatches:
+            print(f"一致：{len(meta['inputs'])} 个输入的 min/max 与数据相同（{kind}，{window} 帧）")
+        for name, expected, actual in mismatches:
+            print(f"{name}: model_meta {expected} / 数据 {actual}")
+    else:
+        print("用法：python normalization_stats.py build <文件夹> <velocity|acceleration> [窗口] [下分位 上分位]")
+        print("      python normalization_stats.py check <模型文件夹> <数据文件夹>")
@@ -0,0 +1,210 @@
+import os
+import tempfile
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+from pose_cache import ensure_cache, load_pose_array
+from pose_kinematics import joint_kinematics, representative_points
+from feature_stats import LabelStats
+from feature_cache import cache_key, default_cache
+
+# ------------------- 参数设置 -------------------
+fps = 30                      # 默认帧率
+EXTRACTOR_VERSION = 1         # 特征计算方式变化时递增，使旧的缓存条目失效
+
+
+def _file_info(filename):
+    """子进程：确保缓存存在（首次运行时并行完成 JSON 转换），返回每个样本的帧数。"""
+    return ensure_cache(filename)["frame_counts"]
+
+
+def _kinematics(points, kind, dt):
+    """对 (n, F, 33, 2) 的样本批量计算所选类型的速度与加速度（见 _extract_file）。"""
+    if kind == "joints":
+        return joint_kinematics(points, dt)
+    step = np.diff(representative_points(points), axis=1)
+    vel = np.hypot(step[..., 0], step[..., 1]) / dt
+    return vel, np.diff(vel, axis=1) / dt
+
+
+def load_file_features(filename, kind="joints", max_frames=None, fps=fps):
+    """
+    读取（或计算并缓存）一个文件中所有样本的速度与加速度，返回 (vel, acc, meta)：
+      - vel: (samples, F-1, ...)，acc: (samples, F-2, ...)，F 为 min(文件最大帧数, max_frames)；
+      - 超出样本真实帧数的部分为 NaN，float32 存储。
+    缓存键包含源文件哈希、kind、fps、max_frames 与提取器版本，源文件变化后自动重新计算。
+    """
+    meta = ensure_cache(filename)
+    key = cache_key(meta["source_sha1"], kind=kind, fps=fps, expected_frames=max_frames,
+                    version=EXTRACTOR_VERSION)
+
+    def compute():
+        array, _ = load_pose_array(filename)
+        points = np.asarray(array[:, :max_frames], dtype=np.float64)
+        vel, acc = _kinematics(points, kind, 1 / fps)
+        return {"velocity": vel.astype(np.float32), "acceleration": acc.astype(np.float32)}
+
+    arrays = default_cache().get_or_compute(key, compute)
+    return arrays["velocity"], arrays["acceleration"], meta
+
+
+def load_representative_points(filename, max_frames=None):
+    """
+    读取（或计算并缓存）一个文件中每个样本的代表点，返回 [(有效帧数, 2) 数组, ...]：
+    没有有效关节的帧被去掉后再截取前 max_frames 帧。
+    """
+    meta = ensure_cache(filename)
+    key = cache_key(meta["source_sha1"], kind="representative_points",
+                    expected_frames=max_frames, version=EXTRACTOR_VERSION)
+
+    def compute():
+        array, _ = load_pose_array(filename)
+        samples = []
+        for sample, n in zip(array, meta["frame_counts"]):
+            rep_points = representative_points(sample[:n])
+            samples.append(rep_points[~np.isnan(rep_points).any(axis=1)][:max_frames])
+        return {"points": np.concatenate(samples) if samples else np.empty((0, 2)),
+                "lengths": np.array([len(p) for p in samples], dtype=np.int64)}
+
+    arrays = default_cache().get_or_compute(key, compute)
+    if len(arrays["lengths"]) == 0:
+        return []
+    return np.split(arrays["points"], np.cumsum(arrays["lengths"])[:-1])
+
+
+def _extract_file(filename, kind, expected_frames, fps, sample_ids, out_paths, offset):
+    """
+    子进程：读取一个文件的缓存，计算所选样本的速度与加速度，
+    直接写入共享的输出 memmap（从 offset 行开始），不通过 pickle 传回数据。
+      - kind="joints":   每个关键点的速度 (n, F-1, 33) 与绝对加速度 (n, F-2, 33)；
+      - kind="centroid": 代表点（有效关节平均，忽略 (0, 0) 占位）的速度 (n, F-1) 与加速度 (n, F-2)。
+    """
+    vel, acc, _ = load_file_features(filename, kind, expected_frames, fps)
+    vel = vel[sample_ids]
+    acc = acc[sample_ids]
+
+    vel_out = np.lib.format.open_memmap(out_paths[0], mode="r+")
+    acc_out = np.lib.format.open_memmap(out_paths[1], mode="r+")
+    vel_out[offset:offset + len(vel)] = vel
+    acc_out[offset:offset + len(acc)] = acc
+    vel_out.flush()
+    acc_out.flush()
+    del vel_out, acc_out
+    return len(vel)
+
+
+def _open_result(path):
+    """以只读方式映射结果文件，随后删除文件名（POSIX 下映射在关闭前仍然有效）。"""
+    result = np.lib.format.open_memmap(path, mode="r")
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+    return result
+
+
+def extract_features_parallel(file_list, kind="joints", expected_frames=600, fps=fps,
+                              first_sample_only=False, max_workers=None):
+    """
+    使用进程池并行处理多个文件，返回 (velocities, accelerations)：
+    两者都是只读 memmap，第一维为样本（按文件顺序排列）。
+    帧数不足 expected_frames 的样本会给出警告并被跳过（结果为定长数组；
+    原来的 process_files 会保留截短的样本，需要保留短样本时请使用 accumulate_features_parallel）。
+    first_sample_only=True 时每个文件只取第一个样本（与 load_sample 的行为一致）。
+    """
+    joint_shape = (33,) if kind == "joints" else ()
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        frame_counts = list(pool.map(_file_info, file_list))
+
+        jobs = []
+        total = 0
+        for fname, counts in zip(file_list, frame_counts):
+            if first_sample_only:
+                counts = counts[:1]
+            sample_ids = []
+            for s, n in enumerate(counts):
+                if n < expected_frames:
+                    print(f"Warning: In file {fname}, one sample has less than {expected_frames} frames.")
+                else:
+                    sample_ids.append(s)
+            if sample_ids:
+                jobs.append((fname, sample_ids, total))
+                total += len(sample_ids)
+
+        out_dir = tempfile.mkdtemp(prefix="features_")
+        out_paths = (os.path.join(out_dir, "velocity.npy"), os.path.join(out_dir, "acceleration.npy"))
+        np.lib.format.open_memmap(out_paths[0], mode="w+", dtype=np.float64,
+                                  shape=(total, expected_frames - 1) + joint_shape)
+        np.lib.format.open_memmap(out_paths[1], mode="w+", dtype=np.float64,
+                                  shape=(total, expected_frames - 2) + joint_shape)
+
+        futures = [pool.submit(_extract_file, fname, kind, expected_frames, fps, sample_ids, out_paths, offset)
+                   for fname, sample_ids, offset in jobs]
+        for future in futures:
+            future.result()
+
+    velocities = _open_result(out_paths[0])
+    accelerations = _open_result(out_paths[1])
+    try:
+        os.rmdir(out_dir)
+    except OSError:
+        pass
+    return velocities, accelerations
+
+
+def _accumulate_file(filename, kind, max_frames, fps, first_sample_only):
+    """
+    子进程：把一个文件中所有样本的速度与加速度累加到按标签分组的 LabelStats 中，
+    返回 (vel_stats, acc_stats, 短样本数)，累加器的大小与样本数无关。
+    帧数不足 max_frames 的样本超出部分为 NaN，不计入统计，因此只更新它覆盖到的帧。
+    """
+    vel, acc, meta = load_file_features(filename, kind, max_frames, fps)
+    item_shape = (33,) if kind == "joints" else ()
+    vel_stats, acc_stats = LabelStats(item_shape), LabelStats(item_shape)
+    labels = meta["labels"][:1] if first_sample_only else meta["labels"]
+    for label in dict.fromkeys(labels):
+        sample_ids = [s for s, l in enumerate(labels) if l == label]
+        vel_stats.add_batch(label, vel[sample_ids])
+        acc_stats.add_batch(label, acc[sample_ids])
+    counts = meta["frame_counts"][:len(labels)]
+    short = sum(n < max_frames for n in counts) if max_frames else 0
+    return vel_stats, acc_stats, short
+
+
+def accumulate_features_parallel(file_list, kind="joints", max_frames=None, fps=fps,
+                                 first_sample_only=False, max_workers=None):
+    """
+    使用进程池流式统计多个文件的速度与加速度，返回 (vel_stats, acc_stats) 两个 LabelStats：
+    每个标签、每个帧序号（及每个关键点）的样本数、均值、方差、最小值和最大值。
+    与 extract_features_parallel 不同，结果不保存每个样本，内存与数据集大小无关；
+    短样本（与原来的 load_samples 一样）会给出警告但不会被跳过，只计入它覆盖到的帧。
+    max_frames 为统计的最大帧数（None 表示不限）。
+    """
+    item_shape = (33,) if kind == "joints" else ()
+    vel_stats, acc_stats = LabelStats(item_shape), LabelStats(item_shape)
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(_accumulate_file, fname, kind, max_frames, fps, first_sample_only)
+                   for fname in file_list]
+        for fname, future in zip(file_list, futures):
+            vel_part, acc_part, short = future.result()
+            for _ in range(short):
+                print(f"Warning: In file {fname}, one sample has less than {max_frames} frames.")
+            vel_stats.merge(vel_part)
+            acc_stats.merge(acc_part)
+    return vel_stats, acc_stats
+
+
+def process_files_parallel(file_list, expected_frames=600, fps=fps, first_sample_only=True,
+                           max_workers=None):
+    """
+    process_files 的并行版本：返回 33 个关键点的平均速度和平均加速度，
+    格式与原函数相同 ({关键点: 数组}, {关键点: 数组})。
+    """
+    vel_stats, acc_stats = accumulate_features_parallel(
+        file_list, kind="joints", max_frames=expected_frames, fps=fps,
+        first_sample_only=first_sample_only, max_workers=max_workers)
+    mean_vel = vel_stats.total().mean
+    mean_acc = acc_stats.total().mean
+    avg_vel = {i: mean_vel[:, i] for i in range(33)}
+    avg_acc = {i: mean_acc[:, i] for i in range(33)}
+    return avg_vel, avg_acc
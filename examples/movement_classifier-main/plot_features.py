@@ -173,13 +173,15 @@
 # plt.show()
 
 
-import json
 import numpy as np
 import matplotlib.pyplot as plt
-import math
 from matplotlib.widgets import Slider
 import matplotlib.ticker as ticker
 
+from pose_kinematics import to_pose_array, representative_points
+from parallel_features import accumulate_features_parallel, load_representative_points
+from lod_pyramid import LODPyramid, plot_window
+
 # 参数设置
 fps = 30                      # 帧率
 expected_frames = 600         # 每个样本期望的帧数
@@ -187,49 +189,33 @@ dt = 1 / fps                  # 每帧的时间间隔
 total_time = (expected_frames - 1) * dt  # 总时长（对应速度数组）
 window_size = 20               # 初始显示的时间窗口（秒）
 
-def compute_representative_points(frames):
+def compute_representative_points(frames, weights=None):
     """
-    给定一组帧数据，每帧数据为字典，包含 "x0", "y0", ..., "x32", "y32"，
-    计算每帧的代表点（所有关节 x 坐标和 y 坐标的平均值）。
-    返回一个列表，每个元素为字典 {"x": avg_x, "y": avg_y}。
+    给定一组帧数据（帧字典列表或 (frames, 33, 2) 数组），向量化计算每帧的代表点
+    （所有有效关节 x 坐标和 y 坐标的平均值，可选 33 个关节的权重）。
+    缺失的关节以及 (0, 0) 占位关节不参与平均；没有有效关节的帧被跳过。
+    返回 (有效帧数, 2) 数组，每行为 (avg_x, avg_y)。
     """
-    rep_points = []
-    for frame in frames:
-        xs = []
-        ys = []
-        # 假设每帧有33个关节，编号0到32
-        for i in range(33):
-            key_x = f"x{i}"
-            key_y = f"y{i}"
-            if key_x in frame and key_y in frame:
-                xs.append(frame[key_x])
-                ys.append(frame[key_y])
-        if xs and ys:
-            rep_points.append({"x": np.mean(xs), "y": np.mean(ys)})
-    return rep_points
+    rep_points = representative_points(to_pose_array(frames), weights=weights)
+    return rep_points[~np.isnan(rep_points).any(axis=1)]
 
 def compute_features(rep_points):
     """
-    给定代表点列表，计算速度和加速度：
+    给定代表点数组 (frames, 2)，计算速度和加速度：
       - 速度：连续帧之间代表点距离除以 dt
       - 加速度：相邻速度之差除以 dt
     """
     if len(rep_points) < 2:
         return None, None
-    velocities = [
-        math.sqrt((rep_points[i+1]["x"] - rep_points[i]["x"])**2 +
-                  (rep_points[i+1]["y"] - rep_points[i]["y"])**2) / dt
-        for i in range(len(rep_points) - 1)
-    ]
-    if len(velocities) < 2:
-        accelerations = []
-    else:
-        accelerations = [(velocities[i+1] - velocities[i]) / dt for i in range(len(velocities) - 1)]
+    step = np.diff(rep_points, axis=0)
+    velocities = np.hypot(step[:, 0], step[:, 1]) / dt
+    accelerations = np.diff(velocities) / dt
     return velocities, accelerations
 
 def load_samples(filename):
     """
-    加载指定 JSON 文件中的所有样本，并返回每个样本的代表点列表（取前 expected_frames 帧）。
+    加载指定 JSON 文件中的所有样本，并返回每个样本的代表点数组（取前 expected_frames 帧）。
+    结果保存在特征缓存中（以文件内容哈希与 expected_frames 为键），文件不变时直接读取。
     JSON 文件格式示例：
     {
       "data": [
@@ -246,119 +232,112 @@ def load_samples(filename):
     }
     """
     samples_points = []
-    with open(filename, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    for sample in data.get("data", []):
-        frames = sample.get("xs", [])
-        rep_points = compute_representative_points(frames)
+    for rep_points in load_representative_points(filename, expected_frames):
         if len(rep_points) < expected_frames:
             print(f"Warning: In file {filename}, one sample has less than {expected_frames} frames.")
-        samples_points.append(rep_points[:expected_frames])
+        samples_points.append(rep_points)
     return samples_points
 
 def process_files(file_list):
     """
-    处理一组文件，计算每个样本的速度和加速度，
-    并返回所有样本的速度和加速度列表。
+    处理一组文件，计算每个样本代表点的速度和加速度，
+    返回 (速度统计, 加速度统计) 两个 RunningStats（每帧的样本数、均值、标准差等）。
+    文件在进程池中并行加载和累加，不保存每个样本的曲线；短样本只计入它覆盖到的帧。
     """
-    all_velocities = []
-    all_accelerations = []
-    for fname in file_list:
-        samples = load_samples(fname)
-        for rep_points in samples:
-            vel, acc = compute_features(rep_points)
-            if vel is not None and acc is not None:
-                all_velocities.append(np.array(vel))
-                all_accelerations.append(np.array(acc))
-    return all_velocities, all_accelerations
-
-# 指定文件名列表（确保 JSON 文件与此脚本在同一工作目录下）
-fileNames_A = [
-    
-    # ///label a///
-    'test4_A600frame_glideComR_10set5.json',
-    'test4_A600frame_glideComR_10set4.json',
-    'test4_A600frame_glideComR_10set3.json',
-    'test4_A600frame_glideComR_10set2.json',
-    'test4_A600frame_glideComR_10set1.json',
-
-    
-]
-
-fileNames_B = [
-    # ///label b///
-    'test5_B600frame_glideComR_QuickStrong_20set2.json',
-    'test5_B600frame_glideComR_QuickStrong_10set3.json',
-    'test5_B600frame_glideComR_QuickStrong_10set4.json',
-    'test5_B600frame_glideComR_QuickStrong_10set5.json'
-]
-
-# 分别处理标签 A 和标签 B 的文件
-velocities_A, accelerations_A = process_files(fileNames_A)
-velocities_B, accelerations_B = process_files(fileNames_B)
-
-if not velocities_A or not velocities_B:
-    print("没有足够的有效样本来计算平均速度。")
-    exit(1)
-
-# 计算各标签样本的平均速度与加速度曲线
-avg_velocity_A = np.mean(velocities_A, axis=0)
-avg_velocity_B = np.mean(velocities_B, axis=0)
-avg_acceleration_A = np.mean(accelerations_A, axis=0)
-avg_acceleration_B = np.mean(accelerations_B, axis=0)
-
-# 生成时间轴（以秒为单位）
-time_velocity = np.linspace(0, (expected_frames - 1) * dt, expected_frames - 1)
-time_acceleration = np.linspace(0, (expected_frames - 2) * dt, expected_frames - 2)
-
-# --- 子采样：将数据从每 0.0333 秒一个点（30fps）改为每 1 秒一个点 ---
-step = int(1 / dt)  # 对于30fps, step = 30
-time_velocity_sub = time_velocity[::step]
-avg_velocity_A_sub = avg_velocity_A[::step]
-avg_velocity_B_sub = avg_velocity_B[::step]
-
-time_acceleration_sub = time_acceleration[::step]
-avg_acceleration_A_sub = avg_acceleration_A[::step]
-avg_acceleration_B_sub = avg_acceleration_B[::step]
-
-# 绘图及添加滑动条
-fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10))
-plt.subplots_adjust(bottom=0.15)
-
-# 绘制速度曲线（使用子采样后的数据）
-lineA_v, = ax1.plot(time_velocity_sub, avg_velocity_A_sub, label="Label A", color="blue")
-lineB_v, = ax1.plot(time_velocity_sub, avg_velocity_B_sub, label="Label B", color="green")
-ax1.set_title("Average Velocity Curve")
-ax1.set_xlabel("Time (s)")
-ax1.set_ylabel("Velocity (units/s)")
-ax1.legend()
-ax1.set_xlim(0, window_size)
-
-# 绘制加速度曲线（使用子采样后的数据）
-lineA_a, = ax2.plot(time_acceleration_sub, avg_acceleration_A_sub, label="Label A", color="blue")
-lineB_a, = ax2.plot(time_acceleration_sub, avg_acceleration_B_sub, label="Label B", color="green")
-ax2.set_title("Average Acceleration Curve")
-ax2.set_xlabel("Time (s)")
-ax2.set_ylabel("Acceleration (units/s²)")
-ax2.legend()
-ax2.set_xlim(0, window_size)
-
-# 添加滑动条（滑动范围根据子采样后的时间轴计算）
-slider_ax = fig.add_axes([0.15, 0.02, 0.7, 0.03])
-scroll_slider = Slider(
-    ax=slider_ax,
-    label='Scroll',
-    valmin=0,
-    valmax=time_velocity_sub[-1] - window_size,
-    valinit=0,
-    valstep=0.1
-)
-
-def update(val):
-    start = scroll_slider.val
-    ax1.set_xlim(start, start + window_size)
-    ax2.set_xlim(start, start + window_size)
-    fig.canvas.draw_idle()
-
-scroll_slider.on_changed(update)
-plt.show()
+    vel_stats, acc_stats = accumulate_features_parallel(file_list, kind="centroid",
+                                                        max_frames=expected_frames, fps=fps)
+    return vel_stats.total(), acc_stats.total()
+
+# 进程池子进程会重新导入本脚本，因此数据处理与绘图部分只在直接运行时执行
+if __name__ == "__main__":
+    # 指定文件名列表（确保 JSON 文件与此脚本在同一工作目录下）
+    fileNames_A = [
+
+        # ///label a///
+        'test4_A600frame_glideComR_10set5.json',
+        'test4_A600frame_glideComR_10set4.json',
+        'test4_A600frame_glideComR_10set3.json',
+        'test4_A600frame_glideComR_10set2.json',
+        'test4_A600frame_glideComR_10set1.json',
+
+
+    ]
+
+    fileNames_B = [
+        # ///label b///
+        'test5_B600frame_glideComR_QuickStrong_20set2.json',
+        'test5_B600frame_glideComR_QuickStrong_10set3.json',
+        'test5_B600frame_glideComR_QuickStrong_10set4.json',
+        'test5_B600frame_glideComR_QuickStrong_10set5.json'
+    ]
+
+    # 分别处理标签 A 和标签 B 的文件
+    vel_stats_A, acc_stats_A = process_files(fileNames_A)
+    vel_stats_B, acc_stats_B = process_files(fileNames_B)
+
+    if vel_stats_A.frames == 0 or vel_stats_B.frames == 0:
+        print("没有足够的有效样本来计算平均速度。")
+        exit(1)
+
+    # 各标签样本的平均速度与加速度曲线，以及 ±1 标准差的置信带
+    # 每条曲线预先建立最小/最大/均值金字塔，滑动时按可见窗口选择级别，
+    # 绘制的点数与录制长度无关，且不会像 [::step] 那样丢掉两个采样点之间的尖峰
+    curves = {}
+    for name, stats in (("velocity_A", vel_stats_A), ("velocity_B", vel_stats_B),
+                        ("acceleration_A", acc_stats_A), ("acceleration_B", acc_stats_B)):
+        # 只有一个样本的帧没有标准差，置信带退化为均值曲线
+        mean, std = stats.mean, np.nan_to_num(stats.std())
+        curves[name] = (LODPyramid(mean), (LODPyramid(mean - std), LODPyramid(mean + std)))
+    duration = max(vel_stats_A.frames, vel_stats_B.frames) * dt
+
+    # 绘图及添加滑动条
+    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10))
+    plt.subplots_adjust(bottom=0.15)
+    axes_curves = [(ax1, "velocity_A", "Label A", "blue"), (ax1, "velocity_B", "Label B", "green"),
+                   (ax2, "acceleration_A", "Label A", "blue"), (ax2, "acceleration_B", "Label B", "green")]
+    artists = []
+
+    def draw(start):
+        """绘制 [start, start + window_size) 秒内的曲线、最小/最大值包络与置信带。"""
+        for artist in artists:
+            artist.remove()
+        artists.clear()
+        for ax, name, label, color in axes_curves:
+            pyramid, band = curves[name]
+            artists.extend(plot_window(ax, pyramid, start, start + window_size, dt, band=band,
+                                       label=label, color=color))
+        for ax in (ax1, ax2):
+            ax.set_xlim(start, start + window_size)
+
+    for ax, kind in ((ax1, "velocity"), (ax2, "acceleration")):
+        # y 轴范围固定为整条曲线（含置信带）的范围，滑动时不跳动
+        lows, highs = zip(*[curves[f"{kind}_{s}"][1][i].extent() for s in "AB" for i in (0, 1)])
+        ax.set_ylim(min(lows), max(highs))
+
+    draw(0)
+    ax1.set_title("Average Velocity Curve")
+    ax1.set_xlabel("Time (s)")
+    ax1.set_ylabel("Velocity (units/s)")
+    ax1.legend()
+    ax2.set_title("Average Acceleration Curve")
+    ax2.set_xlabel("Time (s)")
+    ax2.set_ylabel("Acceleration (units/s²)")
+    ax2.legend()
+
+    # 添加滑动条（滑动范围为整段录制时长）
+    slider_ax = fig.add_axes([0.15, 0.02, 0.7, 0.03])
+    scroll_slider = Slider(
+        ax=slider_ax,
+        label='Scroll',
+        valmin=0,
+        valmax=max(duration - window_size, 0.1),
+        valinit=0,
+        valstep=0.1
+    )
+
+    def update(val):
+        draw(scroll_slider.val)
+        fig.canvas.draw_idle()
+
+    scroll_slider.on_changed(update)
+    plt.show()
@@ -0,0 +1,211 @@
+import os
+import re
+import sys
+import json
+import hashlib
+import numpy as np
+
+from pose_stream import NUM_JOINTS, JOINT_KEYS, iter_samples
+
+# ------------------- 参数设置 -------------------
+CACHE_DIRNAME = ".pose_cache" # 缓存目录（与 JSON 文件位于同一文件夹）
+CACHE_VERSION = 2             # 缓存格式版本，格式变化时递增以强制重建
+
+
+def file_sha1(filename, chunk_size=1 << 20):
+    """
+    按块计算文件内容的 SHA-1，用于判断源 JSON 是否真的发生了变化。
+    """
+    h = hashlib.sha1()
+    with open(filename, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def frames_to_array(frames, out=None):
+    """
+    将一组帧字典（"x0", "y0", ..., "x32", "y32"）转换为 (frames, 33, 2) 的 float32 数组。
+    缺失的关键点记为 NaN（"x32":0,"y32":0 这样的占位值保持原样）。
+    """
+    if out is None:
+        out = np.full((len(frames), NUM_JOINTS, 2), np.nan, dtype=np.float32)
+    for f, frame in enumerate(frames):
+        row = out[f]
+        for i, (key_x, key_y) in enumerate(JOINT_KEYS):
+            if key_x in frame and key_y in frame:
+                row[i, 0] = frame[key_x]
+                row[i, 1] = frame[key_y]
+    return out
+
+
+def cache_paths(filename, source_sha1=None):
+    """
+    返回 JSON 文件对应的缓存文件路径 (数据文件, 元数据文件)。
+    数据文件名包含源文件哈希（source_sha1 为 None 时返回不带哈希的前缀），
+    不同版本的数据写入不同的文件，读取旧元数据的进程不会打开新数据。
+    """
+    folder, base = os.path.split(os.path.abspath(filename))
+    cache_dir = os.path.join(folder, CACHE_DIRNAME)
+    stem = os.path.splitext(base)[0]
+    suffix = f".{source_sha1[:16]}.f32" if source_sha1 else ""
+    return (os.path.join(cache_dir, stem + suffix),
+            os.path.join(cache_dir, stem + ".meta.json"))
+
+
+def _data_path(filename, meta):
+    return os.path.join(os.path.dirname(cache_paths(filename)[1]), meta["data_file"])
+
+
+def _data_valid(data_path, meta):
+    """数据文件存在且大小与元数据中的形状一致。"""
+    try:
+        size = os.path.getsize(data_path)
+    except OSError:
+        return False
+    return size == int(np.prod(meta["shape"])) * np.dtype(meta["dtype"]).itemsize
+
+
+def convert_json(filename):
+    """
+    一次性把 JSON 数据集转换为连续的 float32 (samples, frames, 33, 2) 数组，
+    并写入同目录下 .pose_cache/ 中的二进制文件与元数据文件。
+    帧数不足的样本用 NaN 补齐，真实帧数记录在元数据的 "frame_counts" 中。
+    返回元数据字典。
+    """
+    # 流式逐样本读取，内存中只保留 float32 数组而不是整份 JSON 字典
+    arrays, labels, frame_counts = [], [], []
+    for frames, label, _ in iter_samples(filename):
+        arrays.append(frames.copy())
+        labels.append(label)
+        frame_counts.append(len(frames))
+    max_frames = max(frame_counts) if frame_counts else 0
+
+    array = np.full((len(arrays), max_frames, NUM_JOINTS, 2), np.nan, dtype=np.float32)
+    for s, frames in enumerate(arrays):
+        array[s, :len(frames)] = frames
+    del arrays
+
+    stat = os.stat(filename)
+    source_sha1 = file_sha1(filename)
+    data_path, meta_path = cache_paths(filename, source_sha1)
+    meta = {
+        "version": CACHE_VERSION,
+        "source": os.path.basename(filename),
+        "source_mtime": stat.st_mtime,
+        "source_size": stat.st_size,
+        "source_sha1": source_sha1,
+        "data_file": os.path.basename(data_path),
+        "shape": list(array.shape),
+        "dtype": "float32",
+        "frame_counts": frame_counts,
+        "labels": labels,
+    }
+
+    os.makedirs(os.path.dirname(data_path), exist_ok=True)
+    # 先写临时文件再原子替换，避免其他进程读到写了一半的缓存；
+    # 数据文件名带有内容哈希，最后才发布元数据，读到元数据的进程总能找到与之匹配的数据
+    tmp_data = data_path + f".tmp{os.getpid()}"
+    tmp_meta = meta_path + f".tmp{os.getpid()}"
+    array.tofile(tmp_data)
+    with open(tmp_meta, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+    os.replace(tmp_data, data_path)
+    os.replace(tmp_meta, meta_path)
+    _remove_stale(filename, meta["data_file"])
+    return meta
+
+
+def _remove_stale(filename, keep):
+    """
+    删除同一源文件旧版本的数据文件（已经打开的 memmap 在 POSIX 下不受影响）。
+    只删除完全符合 "<stem>.<16 位哈希>.f32" 的文件：按前缀匹配会误删其他录制文件的缓存
+    （例如 a.json 的前缀 "a." 也能匹配 a.b.json 的 "a.b.<哈希>.f32"）。
+    """
+    stem_path, meta_path = cache_paths(filename)
+    cache_dir = os.path.dirname(meta_path)
+    pattern = re.compile(re.escape(os.path.basename(stem_path)) + r"\.[0-9a-f]{16}\.f32")
+    for name in os.listdir(cache_dir):
+        if pattern.fullmatch(name) and name != keep:
+            try:
+                os.remove(os.path.join(cache_dir, name))
+            except OSError:
+                pass
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def ensure_cache(filename, verify_hash=False):
+    """
+    确保 JSON 文件的缓存存在且最新，返回元数据字典。
+    - 源文件的 mtime 与大小未变：直接复用缓存（verify_hash=True 时仍会校验哈希）；
+    - mtime 变了但内容哈希相同：只刷新元数据中的 mtime；
+    - 否则重新转换。
+    """
+    _, meta_path = cache_paths(filename)
+    meta = _read_meta(meta_path)
+    if meta is None or meta.get("version") != CACHE_VERSION or not _data_valid(_data_path(filename, meta), meta):
+        return convert_json(filename)
+
+    stat = os.stat(filename)
+    unchanged = (meta["source_mtime"] == stat.st_mtime and meta["source_size"] == stat.st_size)
+    if unchanged and not verify_hash:
+        return meta
+    if file_sha1(filename) != meta["source_sha1"]:
+        return convert_json(filename)
+    if not unchanged:
+        meta["source_mtime"] = stat.st_mtime
+        meta["source_size"] = stat.st_size
+        tmp_meta = meta_path + f".tmp{os.getpid()}"
+        with open(tmp_meta, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp_meta, meta_path)
+    return meta
+
+
+def load_pose_array(filename, verify_hash=False):
+    """
+    以 np.memmap 方式打开 JSON 文件对应的缓存（必要时自动重建），
+    返回 (array, meta)：
+      - array: 只读的 float32 memmap，形状 (samples, frames, 33, 2)，缺失关键点为 NaN；
+      - meta:  元数据字典，包含 "labels"、"frame_counts"、"source_sha1" 等。
+    """
+    meta = ensure_cache(filename, verify_hash=verify_hash)
+    shape = tuple(meta["shape"])
+    if 0 in shape:
+        return np.empty(shape, dtype=np.float32), meta
+    try:
+        array = np.memmap(_data_path(filename, meta), dtype=np.float32, mode="r", shape=shape)
+    except (OSError, ValueError):
+        # 读取元数据之后另一个进程发布了新版本并删除了旧数据：重新读取一次
+        meta = ensure_cache(filename)
+        array = np.memmap(_data_path(filename, meta), dtype=np.float32, mode="r", shape=tuple(meta["shape"]))
+    return array, meta
+
+
+def convert_folder(folder):
+    """
+    转换（或刷新）文件夹中所有 .json 数据文件的缓存，跳过 *_index.json 索引文件。
+    """
+    for name in sorted(os.listdir(folder)):
+        if not name.lower().endswith(".json") or name.endswith("index.json"):
+            continue
+        path = os.path.join(folder, name)
+        meta = ensure_cache(path)
+        print(f"{name}: {meta['shape']}")
+
+
+if __name__ == "__main__":
+    # 用法：python pose_cache.py data/data_test9_velocity [data/data_test9_acceleration ...]
+    for target in sys.argv[1:] or ["data"]:
+        if os.path.isdir(target):
+            convert_folder(target)
+        else:
+            meta = ensure_cache(target)
+            print(f"{target}: {meta['shape']}")
@@ -0,0 +1,125 @@
+import numpy as np
+
+from pose_stream import NUM_JOINTS, JOINT_KEYS
+
+# ------------------- 参数设置 -------------------
+fps = 30                      # 默认帧率
+dt = 1 / fps                  # 默认每帧时间间隔
+
+
+def to_pose_array(frames, missing_zero=False):
+    """
+    将帧数据统一转换为 (..., frames, 33, 2) 的浮点数组：
+      - 已经是数组（例如 pose_cache 的 memmap）时直接使用；
+      - 是帧字典列表（"x0", "y0", ..., "x32", "y32"）时逐帧填充，缺失的关键点记为 NaN。
+    missing_zero=True 时把 (0, 0) 占位关键点也视为缺失。
+    """
+    if isinstance(frames, np.ndarray):
+        points = frames
+    else:
+        points = np.full((len(frames), NUM_JOINTS, 2), np.nan)
+        for f, frame in enumerate(frames):
+            row = points[f]
+            for i, (key_x, key_y) in enumerate(JOINT_KEYS):
+                if key_x in frame and key_y in frame:
+                    row[i, 0] = frame[key_x]
+                    row[i, 1] = frame[key_y]
+    if missing_zero:
+        points = np.where((points == 0).all(axis=-1, keepdims=True), np.nan, points)
+    return points
+
+
+def joint_velocities(points, dt=dt):
+    """
+    一次计算所有关键点的速度：相邻帧之间的欧氏距离 / dt。
+    points 形状为 (frames, 33, 2) 或批量的 (samples, frames, 33, 2)，
+    返回 (frames-1, 33) 或 (samples, frames-1, 33)；任一端缺失（NaN）时结果为 NaN。
+    """
+    points = np.asarray(points, dtype=np.float64)
+    step = np.diff(points, axis=-3)
+    return np.hypot(step[..., 0], step[..., 1]) / dt
+
+
+def joint_accelerations(velocities, dt=dt, axis=-2):
+    """
+    由速度计算加速度的绝对值：|相邻帧速度之差| / dt。
+    velocities 形状为 (frames-1, 33) 或 (samples, frames-1, 33)，帧维度由 axis 指定。
+    """
+    return np.abs(np.diff(velocities, axis=axis)) / dt
+
+
+def joint_kinematics(points, dt=dt):
+    """
+    一次调用返回 (速度, 绝对加速度)，形状分别为 (..., frames-1, 33) 与 (..., frames-2, 33)。
+    """
+    vel = joint_velocities(points, dt)
+    return vel, joint_accelerations(vel, dt)
+
+
+def keypoint_array(frames):
+    """
+    所有关键点的轨迹，返回 (frames, 33, 2) 数组：points[:, i] 为关键点 i 的 (x, y) 序列，缺失为 NaN。
+    （compute_keypoint_trajectories 的数组形式，可以直接传给 compute_velocity 一次计算所有关键点。）
+    """
+    return to_pose_array(frames)
+
+
+# ------------------- 与原脚本函数兼容的接口 -------------------
+def compute_keypoint_trajectories(frames):
+    """
+    计算33个关键点的轨迹，每个关键点保存一个 (x, y) 序列，与原脚本相同按关键点编号索引：
+    返回字典 { 0: (frames, 2) 数组, 1: ..., ..., 32: ... }，缺失的关键点为 (nan, nan)。
+    需要数组形式时使用 keypoint_array。
+    """
+    points = keypoint_array(frames)
+    return {i: points[:, i] for i in range(NUM_JOINTS)}
+
+
+def compute_velocity(trajectory, dt=dt):
+    """
+    计算连续帧之间的速度（单位：位置/秒）。
+    trajectory 可以是单个关键点的 (frames, 2)，也可以是 (frames, 33, 2) 或 (samples, frames, 33, 2)。
+    """
+    trajectory = np.asarray(trajectory, dtype=np.float64)
+    if trajectory.ndim == 2:
+        step = np.diff(trajectory, axis=0)
+        return np.hypot(step[:, 0], step[:, 1]) / dt
+    return joint_velocities(trajectory, dt)
+
+
+def compute_acceleration(velocities, dt=dt):
+    """
+    给定速度序列，计算连续帧之间的加速度（单位：速度变化/秒²），并取绝对值。
+    velocities 为 (frames-1,)、(frames-1, 33) 或 (samples, frames-1, 33)。
+    """
+    velocities = np.asarray(velocities)
+    axis = 0 if velocities.ndim <= 2 else 1
+    if velocities.shape[axis] < 2:
+        # 不足两帧时没有加速度：帧维度为 0，其余维度不变，例如 (1, 33) -> (0, 33)
+        shape = list(velocities.shape)
+        shape[axis] = 0
+        return np.empty(shape)
+    return joint_accelerations(velocities, dt, axis=axis)
+
+
+def representative_points(points, weights=None, missing_zero=True):
+    """
+    向量化计算每帧的代表点（关节坐标的加权平均），points 形状为 (..., frames, 33, 2)，
+    返回 (..., frames, 2)。
+      - 缺失的关键点（NaN）不参与平均；
+      - missing_zero=True 时 (0, 0) 占位关键点（例如 "x32":0,"y32":0）同样视为缺失，
+        避免把代表点拉向原点；
+      - weights 为可选的 33 个关节权重；
+      - 没有任何有效关节的帧结果为 NaN。
+    """
+    points = np.asarray(points, dtype=np.float64)
+    valid = ~np.isnan(points).any(axis=-1)
+    if missing_zero:
+        valid &= ~(points == 0).all(axis=-1)
+    w = valid.astype(np.float64)
+    if weights is not None:
+        w = w * np.asarray(weights, dtype=np.float64)
+    total = w.sum(axis=-1)
+    summed = np.einsum("...j,...jc->...c", w, np.where(valid[..., None], points, 0.0))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return summed / total[..., None]
@@ -0,0 +1,197 @@
+import json
+import numpy as np
+
+# ------------------- 参数设置 -------------------
+NUM_JOINTS = 33               # BlazePose 关键点数量
+CHUNK_SIZE = 1 << 16          # 每次从文件读取的字符数
+
+# 预先生成 "x0", "y0", ..., "x32", "y32" 键名，避免每帧重复格式化字符串
+JOINT_KEYS = [(f"x{i}", f"y{i}") for i in range(NUM_JOINTS)]
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\r\n"
+
+
+class _JsonStream:
+    """
+    极简的增量 JSON 读取器：只在内存中保留尚未消费的一小段文本，
+    每次解析一个值（例如一帧），因此内存占用与文件大小无关。
+    """
+
+    def __init__(self, f, chunk_size=CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        """读取下一块数据，并丢弃已经消费的部分。"""
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """跳过空白与逗号，返回下一个有意义的字符（文件结束时返回空字符串）。"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE + ",":
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, ch):
+        if self.peek() != ch:
+            raise ValueError(f"JSON 格式错误：期望 {ch!r}，实际为 {self.buf[self.pos:self.pos + 20]!r}")
+        self.pos += 1
+
+    def value(self):
+        """解析并返回下一个完整的 JSON 值。"""
+        self.peek()
+        while True:
+            try:
+                obj, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # 数字可能恰好在缓冲区末尾被截断，需要读入更多数据后重新解析
+            if end == len(self.buf) and not self.eof and self._fill():
+                continue
+            self.pos = end
+            return obj
+
+    def key(self):
+        """解析对象中的键名以及其后的冒号。"""
+        k = self.value()
+        self.expect(":")
+        return k
+
+    def skip_flat_object(self):
+        """
+        跳过一个不含嵌套结构的对象（例如一帧关键点），
+        只查找右花括号而不构建字典。
+        """
+        self.expect("{")
+        while True:
+            end = self.buf.find("}", self.pos)
+            if end >= 0:
+                self.pos = end + 1
+                return
+            self.pos = len(self.buf)
+            if not self._fill():
+                raise ValueError("JSON 格式错误：对象未闭合")
+
+    def items(self):
+        """依次产出当前对象的键名，调用方负责消费对应的值。"""
+        self.expect("{")
+        while self.peek() != "}":
+            yield self.key()
+        self.pos += 1
+
+    def elements(self):
+        """依次停在当前数组的每个元素之前，调用方负责消费该元素。"""
+        self.expect("[")
+        while self.peek() != "]":
+            yield
+        self.pos += 1
+
+
+def _fill_row(frame, row):
+    for i, (key_x, key_y) in enumerate(JOINT_KEYS):
+        if key_x in frame and key_y in frame:
+            row[i, 0] = frame[key_x]
+            row[i, 1] = frame[key_y]
+        else:
+            row[i] = np.nan
+
+
+def iter_samples(filename, expected_frames=None, max_samples=None, out=None, dtype=np.float32):
+    """
+    逐个样本流式读取 JSON 数据集，每次产出 (frames, label, frame_count)：
+      - frames: 预分配缓冲区的视图，形状 (n, 33, 2)，缺失关键点为 NaN；
+      - label:  样本的 ys.label（若 ys 位于 xs 之后，同样可以正确取得）；
+      - frame_count: 样本在文件中的真实帧数（可能大于 expected_frames）。
+    expected_frames 给定时，超出的帧只被跳过而不解析；
+    max_samples 给定时，读取到足够样本后立即停止读取文件。
+    dtype 为缓冲区类型，需要与浏览器端（双精度）逐位一致时可传入 np.float64。
+    注意：缓冲区在样本之间复用，需要保留数据时请调用 frames.copy()。
+    """
+    if out is None and expected_frames is not None:
+        out = np.empty((expected_frames, NUM_JOINTS, 2), dtype=dtype)
+    with open(filename, "r", encoding="utf-8") as f:
+        stream = _JsonStream(f)
+        count = 0
+        for root_key in stream.items():
+            if root_key != "data":
+                stream.value()
+                continue
+            for _ in stream.elements():
+                if max_samples is not None and count >= max_samples:
+                    return
+                label = None
+                n = 0
+                total = 0
+                for key in stream.items():
+                    if key == "ys":
+                        label = (stream.value() or {}).get("label")
+                    elif key == "xs":
+                        for _ in stream.elements():
+                            total += 1
+                            if expected_frames is not None and n >= expected_frames:
+                                stream.skip_flat_object()
+                                continue
+                            if out is None or n >= len(out):
+                                # 未指定 expected_frames 时按需倍增缓冲区
+                                grown = np.empty((max(64, 2 * n), NUM_JOINTS, 2), dtype=dtype)
+                                if out is not None:
+                                    grown[:n] = out[:n]
+                                out = grown
+                            _fill_row(stream.value(), out[n])
+                            n += 1
+                    else:
+                        stream.value()
+                count += 1
+                yield out[:n], label, total
+
+
+def iter_frames(filename, expected_frames=None):
+    """
+    逐帧流式读取，产出 (sample_index, frame_index, row)，row 为 (33, 2) 的缓冲区视图。
+    """
+    row = np.empty((NUM_JOINTS, 2), dtype=np.float32)
+    with open(filename, "r", encoding="utf-8") as f:
+        stream = _JsonStream(f)
+        for root_key in stream.items():
+            if root_key != "data":
+                stream.value()
+                continue
+            for s, _ in enumerate(stream.elements()):
+                for key in stream.items():
+                    if key != "xs":
+                        stream.value()
+                        continue
+                    for i, _ in enumerate(stream.elements()):
+                        if expected_frames is not None and i >= expected_frames:
+                            stream.skip_flat_object()
+                            continue
+                        _fill_row(stream.value(), row)
+                        yield s, i, row
+
+
+def read_first_sample(filename, expected_frames, dtype=np.float32):
+    """
+    只读取第一个样本的前 expected_frames 帧，返回 (frames, 33, 2) 数组与标签。
+    读取到所需帧数后即停止解析文件的剩余部分。
+    """
+    for frames, label, _ in iter_samples(filename, expected_frames=expected_frames,
+                                         max_samples=1, dtype=dtype):
+        return frames.copy(), label
+    return np.empty((0, NUM_JOINTS, 2), dtype=dtype), None
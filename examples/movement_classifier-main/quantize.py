@@ -0,0 +1,208 @@
+import os
+import sys
+import time
+import numpy as np
+
+from tfjs_runtime import TfjsModel, conv1d, _activation, _first
+
+# 离线工具：评估 int8 量化对准确率与模型大小的影响（python quantize.py ...），不用于服务器推理。
+# NumPy 没有 int8 矩阵乘法内核，QuantizedModel 用 float32 BLAS 模拟整数运算，比 float32 推理约慢 1.4～1.5 倍，
+# 因此 ModelRegistry / server.py 只使用 float32 模型。
+
+# ------------------- 参数设置 -------------------
+QUANT_FILE = "model.int8.npz" # 量化参数文件（与 model.json 位于同一文件夹）
+CALIBRATION_WINDOWS = 256     # 用于标定激活范围的窗口数
+CALIBRATION_PERCENTILE = 100.0  # 激活范围取校准数据绝对值的该百分位（100 即最大值）
+FLOAT32_EXACT = 1 << 24       # float32 能精确表示的整数范围
+
+QUANTIZED_LAYERS = ("Conv1D", "Dense")
+
+
+def quantize_weights(kernel):
+    """
+    按输出通道（最后一维）做对称 int8 量化：scale[c] = max|W[..., c]| / 127，
+    返回 (int8 权重, float32 scale)。
+    """
+    kernel = np.asarray(kernel, dtype=np.float32)
+    axes = tuple(range(kernel.ndim - 1))
+    scale = np.abs(kernel).max(axis=axes) / 127
+    scale = np.where(scale > 0, scale, np.float32(1)).astype(np.float32)
+    q = np.clip(np.rint(kernel / scale), -127, 127).astype(np.int8)
+    return q, scale
+
+
+def activation_range(values, percentile=CALIBRATION_PERCENTILE):
+    """
+    由校准数据确定某一层输入的量化方式：全为非负（例如 ReLU 输出、归一化后的特征）时
+    使用 [0, 255]，否则使用 [-127, 127]。返回 (scale, qmin, qmax)。
+    """
+    values = np.asarray(values, dtype=np.float32)
+    unsigned = values.min() >= 0
+    bound = float(np.percentile(np.abs(values), percentile)) if values.size else 1.0
+    qmax = 255 if unsigned else 127
+    scale = bound / qmax if bound > 0 else 1.0
+    return np.float32(scale), (0 if unsigned else -127), qmax
+
+
+class QuantizedModel(TfjsModel):
+    """
+    TfjsModel 的 int8 推理版本：Conv1D / Dense 层的权重按输出通道量化为 int8，
+    层输入按校准得到的 scale 量化为 8 位整数，乘加在整数上进行（int32 累加），
+    再乘以 scale_in * scale_w[c] 还原并加上 float32 偏置。池化、Flatten 等层不变。
+
+    NumPy 没有 int8 矩阵乘法内核，这里把整数值放在 float32 中交给 BLAS 计算：
+    只要单个输出的累加上界 K * 127 * qmax 小于 2^24，float32 的结果与 int32 累加完全相同；
+    超出时改用 int64 矩阵乘法（较慢，但结果仍然精确）。
+    因为多了输入量化这一步，在这里推理比 float32 约慢 1.4 倍，只用于离线评估：
+    int8 权重小 4 倍，且结果与真正的 int8 后端一致，可以在导出到这类后端之前估计准确率的损失。
+    """
+
+    def __init__(self, model, params):
+        self.__dict__.update(model.__dict__)
+        self.params = params
+        layers = []
+        for i, ((cls, cfg), layer) in enumerate(zip(model.layer_configs, model.layers)):
+            if cls in QUANTIZED_LAYERS:
+                layers.append(self._build(cls, cfg, params[i]))
+            else:
+                layers.append(layer)
+        self.layers = layers
+
+    def _build(self, cls, cfg, p):
+        weight_q, w_scale = p["weight"], p["w_scale"]
+        in_scale, qmin, qmax = p["in_scale"], p["qmin"], p["qmax"]
+        bias = p.get("bias")
+        act = _activation(cfg.get("activation"))
+        fan_in = int(np.prod(weight_q.shape[:-1]))
+        exact = fan_in * 127 * max(abs(qmin), qmax) < FLOAT32_EXACT
+        weight = weight_q.astype(np.float32 if exact else np.int64)
+        out_scale = (in_scale * w_scale).astype(np.float32)
+
+        def quantize_input(x):
+            q = np.clip(np.rint(x / in_scale), qmin, qmax)
+            return q.astype(np.float32 if exact else np.int64)
+
+        if cls == "Conv1D":
+            stride = _first(cfg.get("strides", 1))
+            dilation = _first(cfg.get("dilation_rate", 1))
+            padding = cfg.get("padding", "valid")
+
+            def layer(x):
+                acc = conv1d(quantize_input(x), weight, None, stride, dilation, padding)
+                y = acc.astype(np.float32) * out_scale
+                return act(y + bias if bias is not None else y)
+        else:
+            def layer(x):
+                acc = quantize_input(x) @ weight
+                y = acc.astype(np.float32) * out_scale
+                return act(y + bias if bias is not None else y)
+        return layer
+
+    def nbytes(self):
+        """(float32 权重的字节数, int8 量化后的字节数)：未量化的层与偏置按 float32 计。"""
+        quantized = {cfg["name"] + "/kernel" for i, (_, cfg) in enumerate(self.layer_configs) if i in self.params}
+        float_bytes = sum(np.asarray(w).nbytes for w in self.weights.values())
+        int8_bytes = sum(np.asarray(w).size if name in quantized else np.asarray(w).nbytes
+                         for name, w in self.weights.items())
+        int8_bytes += sum(p["w_scale"].nbytes for p in self.params.values())
+        return float_bytes, int8_bytes
+
+    def save(self, path):
+        """把量化参数写入 .npz（权重为 int8）。"""
+        arrays = {}
+        for i, p in self.params.items():
+            for key, value in p.items():
+                arrays[f"{i}_{key}"] = np.asarray(value)
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, model_dir, path=None):
+        """读取 model.json 与量化参数文件（默认为模型文件夹中的 model.int8.npz）。"""
+        model = TfjsModel.load(model_dir)
+        params = {}
+        with np.load(path or os.path.join(model_dir, QUANT_FILE)) as z:
+            for name in z.files:
+                i, key = name.split("_", 1)
+                value = z[name]
+                params.setdefault(int(i), {})[key] = value if value.ndim else value[()]
+        return cls(model, params)
+
+
+def calibrate(model, windows, percentile=CALIBRATION_PERCENTILE):
+    """
+    用一批录制数据的特征窗口 (N, frames, 33) 运行 float32 模型，记录每个 Conv1D / Dense 层的输入范围，
+    并量化这些层的权重。返回 QuantizedModel。
+    """
+    x = model.normalize(windows)
+    params = {}
+    for i, ((cls, cfg), layer) in enumerate(zip(model.layer_configs, model.layers)):
+        if cls in QUANTIZED_LAYERS:
+            in_scale, qmin, qmax = activation_range(x, percentile)
+            weight, w_scale = quantize_weights(model.weights[cfg["name"] + "/kernel"])
+            params[i] = {"weight": weight, "w_scale": w_scale, "in_scale": in_scale,
+                         "qmin": qmin, "qmax": qmax}
+            bias = model.weights.get(cfg["name"] + "/bias") if cfg.get("use_bias", True) else None
+            if bias is not None:
+                params[i]["bias"] = np.asarray(bias, dtype=np.float32)
+        x = layer(x)
+    return QuantizedModel(model, params)
+
+
+def compare(model, quantized, windows, labels):
+    """比较 float32 与 int8 的准确率、预测一致率、概率最大差值与推理时间。"""
+    def timed(m):
+        start = time.perf_counter()
+        probs = m.predict_proba(windows)
+        return probs, time.perf_counter() - start
+
+    float_probs, float_time = timed(model)
+    int8_probs, int8_time = timed(quantized)
+    truth = np.array([str(l).lower() for l in labels])
+    float_pred = np.array([model.labels[i].lower() for i in float_probs.argmax(axis=1)])
+    int8_pred = np.array([model.labels[i].lower() for i in int8_probs.argmax(axis=1)])
+    return {
+        "windows": len(windows),
+        "float32_accuracy": float(np.mean(float_pred == truth)) if len(truth) else 0.0,
+        "int8_accuracy": float(np.mean(int8_pred == truth)) if len(truth) else 0.0,
+        "agreement": float(np.mean(float_pred == int8_pred)) if len(truth) else 0.0,
+        "max_prob_diff": float(np.max(np.abs(float_probs - int8_probs))) if len(truth) else 0.0,
+        "float32_ms": float_time * 1000,
+        "int8_ms": int8_time * 1000,
+    }
+
+
+def _calibration_split(count, size=CALIBRATION_WINDOWS, seed=0):
+    """随机选取标定用的窗口下标。"""
+    rng = np.random.default_rng(seed)
+    return np.sort(rng.choice(count, size=min(size, count), replace=False))
+
+
+if __name__ == "__main__":
+    # 用法：python quantize.py <模型文件夹> <数据文件夹> [--save]
+    #   不带参数时对 data_test9 的两个模型给出 float32 与 int8 的对比
+    #   --save 把量化参数写入模型文件夹的 model.int8.npz（供离线比较或导出，服务器不会加载）
+    from js_features import build_feature_tensor
+
+    pairs = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if not pairs:
+        pairs = [os.path.join("model", "Model_Acceleration_test9"), os.path.join("data", "data_test9_acceleration"),
+                 os.path.join("model", "Model_velocity_test9"), os.path.join("data", "data_test9_velocity")]
+    for model_dir, folder in zip(pairs[::2], pairs[1::2]):
+        model = TfjsModel.load(model_dir)
+        names = sorted(n for n in os.listdir(folder)
+                       if n.lower().endswith(".json") and not n.endswith("index.json"))
+        windows, index = build_feature_tensor([os.path.join(folder, n) for n in names],
+                                              model.feature_kind, window=model.window)
+        quantized = calibrate(model, windows[_calibration_split(len(windows))])
+        report = compare(model, quantized, windows, [item["label"] for item in index])
+        print(f"{model.name}（{folder}，{report['windows']} 个窗口）：")
+        print(f"  准确率 float32 {report['float32_accuracy']:.3f} / int8 {report['int8_accuracy']:.3f}"
+              f"（差 {report['int8_accuracy'] - report['float32_accuracy']:+.3f}），"
+              f"预测一致率 {report['agreement']:.3f}，概率最大差 {report['max_prob_diff']:.4f}")
+        float_bytes, int8_bytes = quantized.nbytes()
+        print(f"  权重大小 float32 {float_bytes / 1024:.1f} KB / int8 {int8_bytes / 1024:.1f} KB，"
+              f"推理用时 float32 {report['float32_ms']:.1f} ms / int8 {report['int8_ms']:.1f} ms")
+        if "--save" in sys.argv:
+            path = os.path.join(model_dir, QUANT_FILE)
+            quantized.save(path)
+            print(f"  已写入 {path}")
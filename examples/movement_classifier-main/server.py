@@ -1,27 +1,110 @@
-from flask import Flask
+from flask import Flask, request
 from flask_socketio import SocketIO, emit
 # from send_midi_fast_slow import process_midi_data
-from send_midi import process_midi_data
+from tempo_control import init_midi, process_midi_data
+from model_registry import ModelRegistry
+from stream_features import StreamingFeatureExtractor
+from inference_batcher import InferenceBatcher
+from client_buffers import ClientBuffers
+from latency_metrics import metrics as latency_metrics
+
+# 服务器端分类默认使用的模型（浏览器端也可以继续自己分类并发送 midiData）；
+# 每个客户端可以通过 selectModel 事件切换到 model/ 下的其他模型
+DEFAULT_MODEL = "Model_velocity_test9"
+MIDI_BATCH_SIZE = 10          # 每个客户端累计多少条结果计算一次 tempo
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'secret!'
 socketio = SocketIO(app, cors_allowed_origins="*")
 
-# 全局列表，用于累计最近接收到的 midiData 数据
-received_data_list = []
+# 每个客户端（sid）单独累计最近接收到的 midiData 数据；
+# 浏览器端的 midiData 与服务器端的分类结果（推理线程）都会写入对应 sid 的缓冲区
+client_buffers = ClientBuffers()
+
+def collect_midi_data(sid, data, create=True):
+    # create=False：该客户端的缓冲区已被删除（已断开）时丢弃数据，不重新创建
+    if not client_buffers.append(sid, data, create=create):
+        return
+    # 当该客户端累计到 MIDI_BATCH_SIZE 条数据后进行处理（取出并清空，只有一个线程会取到）
+    batch = client_buffers.drain(sid, min_items=MIDI_BATCH_SIZE)
+    if batch is not None:
+        process_midi_data(batch)
 
 @socketio.on('midiData')
 def handle_data(data):
-    print("收到 midiData 事件, 数据:", data)
-    global received_data_list
-    received_data_list.append(data)
-    # 当累计到10条数据后进行处理
-    if len(received_data_list) >= 10:
-        last_ten = received_data_list[-10:]
-        process_midi_data(last_ten)
-        # 清空列表（或采用滑动窗口处理）
-        received_data_list = []
+    latency_metrics.on_receive(data)
+    collect_midi_data(request.sid, data)
     emit('response', {"status": "success", "received_data": data})
 
+# ------------------- 服务器端分类 -------------------
+# 客户端发送 poseFrame 事件（每帧的 ml5 keypoints 列表或 "x0".."y32" 字典），
+# 服务器为每个 sid 维护一个流式特征提取器，每 30 帧取一次 60 帧窗口（与浏览器端相同），
+# 所有客户端的窗口由 InferenceBatcher 合并成批次推理，结果通过 classification 事件发回对应的 sid。
+# 模型由 ModelRegistry 按需加载，模型文件更新后自动重新加载，无需重启服务器。
+registry = ModelRegistry()
+registry.preload([DEFAULT_MODEL])
+sessions = {}   # sid -> {"model": 模型名, "extractor": StreamingFeatureExtractor}
+
+def send_result(sid, result, model):
+    best = result[0]
+    data = {
+        "type": model.feature_kind,
+        "model": model.name,
+        "label": f"{best['label'].upper()} ({best['confidence']:.2f})",
+        "displayConfidence": best["confidence"],
+    }
+    socketio.emit('classification', data, to=sid)
+    # 推理结果可能在客户端断开之后才返回，此时不再为它创建缓冲区（缓冲区在连接时创建，断开时删除）
+    collect_midi_data(sid, data, create=False)
+
+def send_error(sid, error, model):
+    """推理失败时通过 classificationError 事件通知对应的客户端（不写入 MIDI 缓冲区）。"""
+    socketio.emit('classificationError', {"type": model.feature_kind, "model": model.name,
+                                     "error": f"推理失败：{error}"}, to=sid)
+
+batcher = InferenceBatcher(None, callback=send_result, error_callback=send_error)
+
+@socketio.on('selectModel')
+def handle_select_model(data):
+    """切换当前客户端使用的模型：data 为 {"model": "Model_Acceleration_test9"}。"""
+    name = data.get("model") if isinstance(data, dict) else data
+    try:
+        name = registry.resolve(name)
+    except KeyError:
+        emit('response', {"status": "error", "message": f"找不到模型 {name}",
+                          "models": registry.names()})
+        return
+    sessions[request.sid] = {"model": name, "extractor": None}
+    registry.preload([name])
+    emit('response', {"status": "success", "model": name})
+
+@socketio.on('poseFrame')
+def handle_pose_frame(data):
+    sid = request.sid
+    session = sessions.get(sid)
+    if session is None:
+        session = sessions[sid] = {"model": DEFAULT_MODEL, "extractor": None}
+    model = registry.get(session["model"])
+    extractor = session["extractor"]
+    if extractor is None or extractor.window != model.window:
+        extractor = session["extractor"] = StreamingFeatureExtractor(window=model.window)
+    frame = data.get("keypoints", data) if isinstance(data, dict) else data
+    if extractor.push(frame):
+        batcher.submit(sid, extractor.window_features(model.feature_kind), context=model, model=model)
+
+@socketio.on('connect')
+def handle_connect():
+    client_buffers.buffer(request.sid)
+
+@socketio.on('disconnect')
+def handle_disconnect():
+    sessions.pop(request.sid, None)
+    client_buffers.remove(request.sid)
+
 if __name__ == '__main__':
+    # 打开 MIDI 输出并启动输出线程（端口打不开时在这里报错退出）
+    init_midi()
+    batcher.start()
+    # 从浏览器采集到 MIDI 发出的各阶段延迟：GET /metrics 返回 JSON，并定期输出到日志
+    latency_metrics.register(app).start_reporter()
     socketio.run(app, host="0.0.0.0", port=5000)
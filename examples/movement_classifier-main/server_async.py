@@ -0,0 +1,226 @@
+import os
+import asyncio
+from collections import deque
+
+import socketio
+from aiohttp import web
+import tempo_control
+from tempo_control import init_midi, close_midi, compute_new_tempo, adjust_tempo
+from latency_metrics import metrics as latency_metrics
+
+# ------------------- 参数设置 -------------------
+QUEUE_SIZE = 32               # 每个客户端待处理 midiData 的最大条数
+OVERLOAD_POLICY = os.environ.get("OVERLOAD_POLICY", "drop_oldest")  # drop_oldest / coalesce / reject
+MIDI_BATCH_SIZE = 10          # 每个客户端累计多少条数据计算一次 tempo（与 server.py 相同）
+LAG_INTERVAL = 0.1            # 事件循环延迟的采样间隔（秒）
+REPORT_INTERVAL = 10.0        # 输出统计信息的间隔（秒）
+PORT = 5000
+
+POLICIES = ("drop_oldest", "coalesce", "reject")
+
+
+class ClientQueue:
+    """
+    单个客户端的有界输入队列（只在事件循环线程中使用，不需要加锁）。
+    队列已满时按 policy 处理新数据：
+      - drop_oldest: 丢掉最旧的一条，再加入新数据；
+      - coalesce:    用新数据替换队列中类型（data["type"]）相同的最后一条，没有相同类型时丢掉最旧的一条；
+      - reject:      拒绝新数据（put 返回 False，由调用方通知客户端）。
+    """
+
+    def __init__(self, maxsize=QUEUE_SIZE, policy=OVERLOAD_POLICY):
+        if policy not in POLICIES:
+            raise ValueError(f"不支持的过载策略：{policy}（可选 {', '.join(POLICIES)}）")
+        self.maxsize = maxsize
+        self.policy = policy
+        self._items = deque()
+        self._ready = asyncio.Event()
+        # 统计信息
+        self.received = 0
+        self.processed = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self.max_depth = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def put(self, item):
+        """加入一条数据；被拒绝时返回 False。"""
+        self.received += 1
+        if len(self._items) >= self.maxsize:
+            if self.policy == "reject":
+                self.rejected += 1
+                return False
+            if self.policy == "coalesce" and self._coalesce(item):
+                return True
+            self._items.popleft()
+            self.dropped += 1
+        self._items.append(item)
+        self.max_depth = max(self.max_depth, len(self._items))
+        self._ready.set()
+        return True
+
+    def _coalesce(self, item):
+        key = item.get("type") if isinstance(item, dict) else None
+        for i in range(len(self._items) - 1, -1, -1):
+            queued = self._items[i]
+            if isinstance(queued, dict) and queued.get("type") == key:
+                self._items[i] = item
+                self.coalesced += 1
+                return True
+        return False
+
+    async def get(self):
+        while not self._items:
+            self._ready.clear()
+            await self._ready.wait()
+        self.processed += 1
+        return self._items.popleft()
+
+    def stats(self):
+        return {"depth": len(self._items), "max_depth": self.max_depth, "received": self.received,
+                "processed": self.processed, "dropped": self.dropped, "coalesced": self.coalesced,
+                "rejected": self.rejected}
+
+
+class LoopLagMonitor:
+    """
+    事件循环延迟：每 interval 秒 sleep 一次，实际醒来时间与预期时间之差即为这段时间内
+    事件循环被阻塞（或排队）的时长。记录最近一次、最大值与平均值。
+    """
+
+    def __init__(self, interval=LAG_INTERVAL):
+        self.interval = interval
+        self.last = 0.0
+        self.max = 0.0
+        self.total = 0.0
+        self.samples = 0
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(loop.time() - expected, 0.0)
+            self.last = lag
+            self.max = max(self.max, lag)
+            self.total += lag
+            self.samples += 1
+
+    def stats(self):
+        return {"last_ms": self.last * 1000, "max_ms": self.max * 1000,
+                "mean_ms": self.total / self.samples * 1000 if self.samples else 0.0}
+
+
+sio = socketio.AsyncServer(async_mode="aiohttp", cors_allowed_origins="*")
+app = web.Application()
+sio.attach(app)
+
+clients = {}            # sid -> (ClientQueue, 处理任务)
+lag_monitor = LoopLagMonitor()
+
+
+async def consume(sid, queue):
+    """
+    每个客户端一个处理任务：按 MIDI_BATCH_SIZE 条一组计算 tempo。
+    adjust_tempo 只把 CC 放进 MIDI 输出线程（tempo_control.midi_scheduler）的队列，不会阻塞，直接在事件循环中调用。
+    """
+    batch = []
+    while True:
+        batch.append(await queue.get())
+        if len(batch) < MIDI_BATCH_SIZE:
+            continue
+        new_tempo, tempo_cc = compute_new_tempo(batch)
+        # 先记录 aggregate 时间（MIDI 输出线程可能在 adjust_tempo 返回前就发出消息）
+        latency_metrics.on_aggregate(batch, control=tempo_cc if new_tempo is not None else None)
+        batch = []
+        if new_tempo is not None:
+            adjust_tempo(new_tempo, tempo_cc)
+
+
+def client_queue(sid):
+    entry = clients.get(sid)
+    if entry is None:
+        queue = ClientQueue()
+        entry = clients[sid] = (queue, asyncio.create_task(consume(sid, queue)))
+    return entry[0]
+
+
+@sio.event
+async def connect(sid, environ):
+    client_queue(sid)
+
+
+@sio.on('midiData')
+async def handle_data(sid, data):
+    latency_metrics.on_receive(data)
+    if client_queue(sid).put(data):
+        await sio.emit('response', {"status": "success", "received_data": data}, to=sid)
+    else:
+        await sio.emit('response', {"status": "rejected", "reason": "queue full"}, to=sid)
+
+
+@sio.event
+async def disconnect(sid):
+    entry = clients.pop(sid, None)
+    if entry is not None:
+        entry[1].cancel()
+
+
+def status():
+    return {"policy": OVERLOAD_POLICY, "loop_lag": lag_monitor.stats(),
+            "clients": {sid: queue.stats() for sid, (queue, _) in clients.items()}}
+
+
+async def handle_status(request):
+    return web.json_response(status())
+
+
+async def handle_metrics(request):
+    """各阶段的延迟统计（与 server.py 的 /metrics 相同）。"""
+    return web.json_response(latency_metrics.summary())
+
+
+async def report():
+    """
+    定期输出事件循环延迟、各客户端队列、MIDI 输出与延迟的统计信息
+    （只在这里 print；处理函数与 tempo_control 中每批数据只有 logging.debug）。
+    """
+    while True:
+        await asyncio.sleep(REPORT_INTERVAL)
+        lag = lag_monitor.stats()
+        dropped = sum(q.dropped + q.coalesced + q.rejected for q, _ in clients.values())
+        print(f"事件循环延迟 {lag['last_ms']:.1f} ms（最大 {lag['max_ms']:.1f} ms，平均 {lag['mean_ms']:.2f} ms），"
+              f"{len(clients)} 个客户端，累计丢弃/合并/拒绝 {dropped} 条")
+        if tempo_control.midi_scheduler is not None:
+            midi = tempo_control.midi_scheduler.stats()
+            print(f"MIDI：提交 {midi['submitted']} 条，发送 {midi['sent']} 条，合并 {midi['coalesced']} 条，"
+                  f"重复 {midi['suppressed']} 条，失败 {midi['errors']} 条")
+        if any(h.count for h in latency_metrics.histograms.values()):
+            print(latency_metrics.format_summary())
+
+
+async def start_background(app):
+    app["background"] = [asyncio.create_task(lag_monitor.run()), asyncio.create_task(report())]
+
+
+async def stop_background(app):
+    for task in app["background"]:
+        task.cancel()
+    close_midi()
+
+
+app.router.add_get("/status", handle_status)
+app.router.add_get("/metrics", handle_metrics)
+app.on_startup.append(start_background)
+app.on_cleanup.append(stop_background)
+
+if __name__ == '__main__':
+    # 打开 MIDI 输出并启动输出线程（端口打不开时在这里报错退出）
+    init_midi()
+    # 用法：OVERLOAD_POLICY=coalesce python server_async.py
+    #   与 server.py 使用相同的端口与 midiData 事件；/status 返回队列与事件循环延迟的统计信息，
+    #   /metrics 返回从浏览器采集到 MIDI 发出的各阶段延迟
+    web.run_app(app, host="0.0.0.0", port=PORT)
@@ -36,6 +36,7 @@ let accelerationModelDetails = {
 // 用于连续预测的滑动窗口
 let sequence = [];    // 每个元素为一帧的对象
 let frameCount = 0;
+let lastCaptureTime = 0;  // 最新一帧的采集时间（毫秒，Date.now()），用于服务器端统计延迟
 
 // 参数设置
 const FPS = 30;
@@ -251,6 +252,7 @@ function predictPose() {
       rawFrameObj["x" + i] = pose.keypoints[i].x;
       rawFrameObj["y" + i] = pose.keypoints[i].y;
     }
+    lastCaptureTime = Date.now();
     
     // 维护固定长度的滑动窗口
     if (sequence.length < CAPTURE_FRAMES) {
@@ -278,15 +280,18 @@ function predictPose() {
       let velocitySeq = computeJointVelocityFeatures(sequence);
       let accelerationSeq = computeJointAccelerationFeatures(sequence);
       
+      // 时间戳随 midiData 一起发送：capture = 窗口最新一帧的采集时间，predict = 开始预测的时间
+      let timestamps = { capture: lastCaptureTime, predict: Date.now() };
+
       // 分别调用两个模型进行预测
-      classifierVelocity.predict(velocitySeq, gotResultsVelocity);
-      classifierAcceleration.predict(accelerationSeq, gotResultsAcceleration);
+      classifierVelocity.predict(velocitySeq, (results) => gotResultsVelocity(results, timestamps));
+      classifierAcceleration.predict(accelerationSeq, (results) => gotResultsAcceleration(results, timestamps));
     }
   }
   setTimeout(predictPose, 1000 / FPS);
 }
 
-function gotResultsVelocity(results) {
+function gotResultsVelocity(results, timestamps) {
   if (!results || results.length === 0) return;
 
   const { label: rawLabel, value } = results[0];
@@ -313,11 +318,12 @@ function gotResultsVelocity(results) {
   socket.emit("midiData", {
     type: "velocity",
     label: poseLabelVelocity,
-    displayConfidence: displayConfidence
+    displayConfidence: displayConfidence,
+    timestamps: { ...timestamps, emit: Date.now() }
   });
 }
 
-function gotResultsAcceleration(results) {
+function gotResultsAcceleration(results, timestamps) {
   if (!results || results.length === 0) return;
 
   const { label: rawLabel, value } = results[0];
@@ -343,7 +349,8 @@ function gotResultsAcceleration(results) {
   // socket.emit("midiData", {
   //   type: "acceleration",
   //   label: poseLabelAcceleration,
-  //   displayConfidence: displayConfidence
+  //   displayConfidence: displayConfidence,
+  //   timestamps: { ...timestamps, emit: Date.now() }
   // });
 }
 
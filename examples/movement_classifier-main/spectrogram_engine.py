@@ -0,0 +1,112 @@
+import os
+import sys
+import time
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from pose_cache import ensure_cache
+from feature_cache import cache_key, default_cache
+from parallel_features import load_file_features, EXTRACTOR_VERSION
+
+# ------------------- 参数设置 -------------------
+fps = 30                      # 帧率（采样率），Nyquist 上限 15Hz
+n_fft = 32                    # 窗口大小（帧数）
+hop_length = 4                # 每次移动的帧数
+AMIN = 1e-5                   # 转换 dB 时的最小幅值（与 librosa.amplitude_to_db 默认值相同）
+TOP_DB = 80.0                 # 动态范围上限（dB）
+
+
+def hann_window(n_fft=n_fft):
+    """周期 Hann 窗（与 librosa / scipy.signal.get_window("hann", n_fft) 相同）。"""
+    n = np.arange(n_fft)
+    return 0.5 - 0.5 * np.cos(2 * np.pi * n / n_fft)
+
+
+def stft(signals, n_fft=n_fft, hop_length=hop_length, center=True, pad_mode="constant"):
+    """
+    批量短时傅里叶变换，信号位于最后一维：signals 形状为 (..., frames)，
+    返回复数数组 (..., 1 + n_fft // 2, 窗口数)，与 librosa.stft 的默认参数一致
+    （Hann 窗、center=True 时两端各补 n_fft // 2 个 0）。
+    所有样本与关键点的窗口通过 sliding_window_view 一次取出（不拷贝），再一次调用 np.fft.rfft。
+    NaN（缺失帧）按 0 处理。
+    """
+    x = np.nan_to_num(np.asarray(signals, dtype=np.float64))
+    if center:
+        pad = [(0, 0)] * (x.ndim - 1) + [(n_fft // 2, n_fft // 2)]
+        x = np.pad(x, pad, mode=pad_mode)
+    if x.shape[-1] < n_fft:
+        raise ValueError(f"信号长度 {x.shape[-1]} 小于 n_fft={n_fft}")
+    frames = sliding_window_view(x, n_fft, axis=-1)[..., ::hop_length, :]
+    spec = np.fft.rfft(frames * hann_window(n_fft), axis=-1)
+    return np.swapaxes(spec, -1, -2)
+
+
+def amplitude_to_db(magnitude, amin=AMIN, top_db=TOP_DB):
+    """
+    幅值转换为 dB，参考值为每张谱图自身的最大值（相当于 librosa.amplitude_to_db(S, ref=np.max)）。
+    magnitude 形状为 (..., 频率, 时间)，每张谱图（最后两维）独立计算。
+    """
+    magnitude = np.abs(magnitude)
+    ref = np.max(magnitude, axis=(-2, -1), keepdims=True)
+    db = 20.0 * np.log10(np.maximum(amin, magnitude)) - 20.0 * np.log10(np.maximum(amin, ref))
+    if top_db is not None:
+        db = np.maximum(db, db.max(axis=(-2, -1), keepdims=True) - top_db)
+    return db
+
+
+def spectrogram_db(signals, n_fft=n_fft, hop_length=hop_length, top_db=TOP_DB):
+    """signals (..., frames) -> dB 谱图 (..., 频率, 时间)。"""
+    return amplitude_to_db(stft(signals, n_fft, hop_length), top_db=top_db)
+
+
+def frequencies(n_fft=n_fft, fps=fps):
+    """谱图每一行对应的频率（Hz）。"""
+    return np.fft.rfftfreq(n_fft, d=1 / fps)
+
+
+def times(n_windows, hop_length=hop_length, fps=fps):
+    """谱图每一列对应的时间（秒，center=True 时为窗口中心）。"""
+    return np.arange(n_windows) * hop_length / fps
+
+
+def file_spectrograms(filename, feature="acceleration", kind="joints", max_frames=None,
+                      n_fft=n_fft, hop_length=hop_length, fps=fps):
+    """
+    计算（或从特征缓存读取）一个文件中所有样本、所有关键点的 dB 谱图：
+      - kind="joints":   返回 (samples, 33, 频率, 时间)；
+      - kind="centroid": 代表点的谱图 (samples, 频率, 时间)。
+    feature 为 "velocity" 或 "acceleration"。样本帧数不足的部分按 0 处理。
+    """
+    meta = ensure_cache(filename)
+    key = cache_key(meta["source_sha1"], kind="spectrogram", signal=kind, feature=feature,
+                    expected_frames=max_frames, fps=fps, n_fft=n_fft, hop_length=hop_length,
+                    version=EXTRACTOR_VERSION)
+
+    def compute():
+        vel, acc, _ = load_file_features(filename, kind, max_frames, fps)
+        signals = vel if feature == "velocity" else acc
+        if kind == "joints":
+            signals = np.swapaxes(signals, 1, 2)    # (samples, 33, frames)
+        return {"db": spectrogram_db(signals, n_fft, hop_length).astype(np.float32)}
+
+    return default_cache().get_or_compute(key, compute)["db"]
+
+
+def corpus_spectrograms(file_list, feature="acceleration", kind="joints", max_frames=None,
+                        n_fft=n_fft, hop_length=hop_length, fps=fps):
+    """对一组文件计算谱图，返回 {文件名: 谱图数组}。"""
+    return {fname: file_spectrograms(fname, feature, kind, max_frames, n_fft, hop_length, fps)
+            for fname in file_list}
+
+
+if __name__ == "__main__":
+    # 用法：python spectrogram_engine.py data/data_test9_acceleration [velocity|acceleration]
+    folder = sys.argv[1] if len(sys.argv) > 1 else os.path.join("data", "data_test9_acceleration")
+    feature = sys.argv[2] if len(sys.argv) > 2 else "acceleration"
+    names = sorted(n for n in os.listdir(folder)
+                   if n.lower().endswith(".json") and not n.endswith("index.json"))
+    start = time.perf_counter()
+    result = corpus_spectrograms([os.path.join(folder, n) for n in names], feature)
+    elapsed = time.perf_counter() - start
+    count = sum(s.shape[0] * s.shape[1] for s in result.values())
+    print(f"{len(result)} 个文件，{count} 张谱图（样本 × 关键点），用时 {elapsed:.2f} 秒")
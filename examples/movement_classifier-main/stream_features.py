@@ -0,0 +1,113 @@
+import numpy as np
+
+from pose_stream import NUM_JOINTS, JOINT_KEYS
+from js_features import FPS, CAPTURE_FRAMES, FEATURE_FUNCS, pad_to_window, dt
+
+
+def as_keypoints(frame):
+    """
+    把一帧关键点统一转换为 (33, 2) 数组，支持：
+      - (33, 2) 数组或嵌套列表；
+      - ml5 bodyPose 的 keypoints 列表 [{"x":..., "y":...}, ...]；
+      - 录制数据中的帧字典 {"x0":..., "y0":..., ..., "x32":..., "y32":...}。
+    缺失的关键点记为 NaN。
+    """
+    if isinstance(frame, dict):
+        row = np.full((NUM_JOINTS, 2), np.nan)
+        for i, (key_x, key_y) in enumerate(JOINT_KEYS):
+            if key_x in frame and key_y in frame:
+                row[i] = (frame[key_x], frame[key_y])
+        return row
+    if len(frame) and isinstance(frame[0], dict):
+        return np.array([(kp.get("x", np.nan), kp.get("y", np.nan)) for kp in frame], dtype=np.float64)
+    return np.asarray(frame, dtype=np.float64)
+
+
+class StreamingFeatureExtractor:
+    """
+    实时预测用的流式特征提取器，输出与浏览器端 computeJoint*Features 在同一窗口上的结果相同。
+
+    内部为 (2 * window) 行的“镜像”环形缓冲区：第 k 帧同时写入 k % window 与 k % window + window 两行，
+    因此任意时刻最近 window 帧都是缓冲区中连续的一段，可以直接返回视图而无需拷贝。
+    每到一帧只更新两行速度和三行加速度（末尾“复制最后一帧”的行先按临时值写入，下一帧到达时覆盖），
+    每帧的计算量与窗口长度无关。
+
+    smoother 为可选的逐帧平滑器（例如 kalman.KalmanFilter），关键点先经过 smoother.filter() 再计算特征。
+    """
+
+    def __init__(self, window=CAPTURE_FRAMES, hop=FPS, dt=dt, smoother=None):
+        self.window = window
+        self.hop = hop
+        self.dt = dt
+        self.smoother = smoother
+        self._points = np.full((2 * window, NUM_JOINTS, 2), np.nan)
+        self._vel = np.zeros((2 * window, NUM_JOINTS))
+        self._acc = np.zeros((2 * window, NUM_JOINTS))
+        self.count = 0
+
+    def reset(self):
+        self._points.fill(np.nan)
+        self._vel.fill(0)
+        self._acc.fill(0)
+        self.count = 0
+        if self.smoother is not None:
+            self.smoother.reset()
+
+    def _write(self, buf, k, value):
+        p = k % self.window
+        buf[p] = value
+        buf[p + self.window] = value
+
+    def push(self, frame):
+        """
+        加入一帧关键点，返回是否到了输出窗口的时刻（每 hop 帧一次，与浏览器端 frameCount % FPS 相同）。
+        """
+        k = self.count
+        keypoints = as_keypoints(frame)
+        if self.smoother is not None:
+            keypoints = self.smoother.filter(keypoints)
+        self._write(self._points, k, keypoints)
+        if k >= 1:
+            prev = self._points[(k - 1) % self.window]
+            dx = keypoints[:, 0] - prev[:, 0]
+            dy = keypoints[:, 1] - prev[:, 1]
+            with np.errstate(invalid="ignore"):
+                v = np.sqrt(dx * dx + dy * dy) / self.dt
+            v[np.isnan(v)] = 0.0
+            self._write(self._vel, k - 1, v)
+            self._write(self._vel, k, v)            # 临时值：窗口末尾复制最后一帧速度
+            if k >= 2:
+                v_prev = self._vel[(k - 2) % self.window]
+                self._write(self._acc, k - 2, np.abs(v - v_prev) / self.dt)
+            self._write(self._acc, k - 1, 0.0)      # 临时值：|复制的速度 - 最后速度| / dt = 0
+            self._write(self._acc, k, 0.0)          # 临时值：复制最后一帧加速度
+        self.count = k + 1
+        return self.count % self.hop == 0
+
+    @property
+    def ready(self):
+        """缓冲区中是否已经有完整的一个窗口。"""
+        return self.count >= self.window
+
+    def _view(self, buf):
+        start = (self.count - self.window) % self.window
+        return buf[start:start + self.window]
+
+    def points_window(self):
+        """最近 window 帧的原始关键点 (window, 33, 2)，为缓冲区视图。"""
+        return self._view(self._points)
+
+    def window_features(self, kind):
+        """
+        返回当前窗口的特征 (window, 33)，kind 为 "velocity" 或 "acceleration"。
+        窗口已满时返回缓冲区的只读视图（下一次 push 后内容会改变，需要保留时请拷贝）；
+        帧数不足时与浏览器端一样用最后一帧补齐后计算（会产生拷贝）。
+        """
+        if self.count == 0:
+            return np.zeros((0, NUM_JOINTS))
+        if not self.ready:
+            points = pad_to_window(self._points[:self.count], self.window)
+            return FEATURE_FUNCS[kind](points, self.dt)
+        view = self._view(self._vel if kind == "velocity" else self._acc)
+        view.flags.writeable = False
+        return view
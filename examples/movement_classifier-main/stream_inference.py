@@ -0,0 +1,190 @@
+import os
+import sys
+import time
+import numpy as np
+
+from stream_features import StreamingFeatureExtractor
+from tfjs_runtime import _first
+
+# ------------------- 参数设置 -------------------
+HOP = 4                       # 默认每 4 帧预测一次（两层 MaxPooling1D(2) 的累计步长）
+# 窗口不少于这么多帧时才复用卷积结果：小窗口的推理时间主要是调用开销，增量计算反而更慢
+# （hop=4 实测：60 帧 134 / 117 µs，150 帧 124 / 123 µs，600 帧 135 / 171 µs，增量 / 整窗），
+# 因此 test6～test9 的 60 / 150 帧模型默认整窗重新计算，只有 600 帧的 test5 使用增量推理
+MIN_WINDOW = 300
+
+# 窗口末尾还不是最终值的特征行数：速度复制了最后一帧，加速度的最后两行依赖复制的速度
+TAIL_ROWS = {"velocity": 1, "acceleration": 2}
+
+_PASS_THROUGH = ("InputLayer", "Dropout", "Activation")
+
+
+def _geometry(cls, cfg):
+    """时间维上的 (感受野, 步长)；无法增量计算的层（非 valid 的补零、Flatten 等）返回 None。"""
+    if cls in _PASS_THROUGH:
+        return 1, 1
+    if cfg.get("padding", "valid") != "valid":
+        return None
+    if cls == "Conv1D":
+        size = _first(cfg["kernel_size"])
+        dilation = _first(cfg.get("dilation_rate", 1))
+        return dilation * (size - 1) + 1, _first(cfg.get("strides", 1))
+    if cls in ("MaxPooling1D", "AveragePooling1D"):
+        size = _first(cfg.get("pool_size", 2))
+        return size, _first(cfg.get("strides") or size)
+    return None
+
+
+class IncrementalClassifier:
+    """
+    滑动窗口的增量推理：窗口每次前移 shift 帧时，前一个窗口中仍然有效的卷积 / 池化结果直接平移复用，
+    只对新进入窗口的帧（以及末尾还未定值的特征行）重新计算，结果与对整个窗口重新计算完全相同。
+
+    对于 valid 补零的层，输出第 o 行只依赖输入的 [o * stride, o * stride + 感受野) 行，与窗口起点无关，
+    因此只要 shift 能被该层之前的累计步长整除，输入中“干净”的前若干行对应的输出就可以从上一个窗口平移得到。
+    shift 不能整除某一层的累计步长时，从该层开始改为完整计算（例如 hop=1 时只有第一层卷积被复用）。
+    Flatten 之后的全连接层每次都完整计算（计算量很小）。
+    模型窗口少于 min_window 帧时不复用（incremental 为 False），每次都完整计算。
+    """
+
+    def __init__(self, model, min_window=MIN_WINDOW):
+        self.model = model
+        self.incremental = model.window >= min_window
+        self.tail = TAIL_ROWS.get(model.feature_kind, model.window)
+        self.temporal = []    # [(层函数, 感受野, 步长)]
+        self.head = []        # Flatten 及之后的层
+        for (cls, cfg), layer in zip(model.layer_configs, model.layers):
+            geometry = _geometry(cls, cfg) if not self.head else None
+            if geometry is None:
+                self.head.append(layer)
+            else:
+                self.temporal.append((layer, *geometry))
+        self._outputs = None
+        # 统计信息：复用的行数与重新计算的行数（所有时间层合计）
+        self.reused_rows = 0
+        self.computed_rows = 0
+
+    def reset(self):
+        self._outputs = None
+
+    def predict_proba(self, features, shift=None):
+        """
+        features: 当前窗口的原始特征 (window, 33)；shift: 窗口相对上一次调用前移的帧数，
+        None 表示与上一次无关（第一次调用、窗口未满时补齐的窗口等），此时完整计算。
+        返回 (类别数,) 的概率。
+        """
+        x = np.asarray(features, dtype=np.float32)[None]
+        if not self.incremental:
+            shift = None
+        previous = self._outputs
+        clean = x.shape[1] - shift - self.tail if previous is not None and shift is not None else 0
+        outputs = []
+        for i, (layer, span, stride) in enumerate(self.temporal):
+            if shift is not None and shift % stride == 0 and clean >= span:
+                keep = (clean - span) // stride + 1
+                shift //= stride
+                # 第一层之前只需要对参与计算的输入行做归一化
+                part = x[:, keep * stride:]
+                y = np.concatenate([previous[i][:, shift:shift + keep],
+                                    layer(self.model.normalize(part) if i == 0 else part)], axis=1)
+                clean = keep
+                self.reused_rows += keep
+                self.computed_rows += y.shape[1] - keep
+            else:
+                y = layer(self.model.normalize(x) if i == 0 else x)
+                shift = None
+                self.computed_rows += y.shape[1]
+            outputs.append(y)
+            x = y
+        self._outputs = outputs
+        for layer in self.head:
+            x = layer(x)
+        return x[0]
+
+    def classify(self, features, shift=None):
+        """与 TfjsModel.classify 相同格式的单个窗口结果：按置信度排列的 [{"label", "confidence"}]。"""
+        probs = self.predict_proba(features, shift)
+        order = np.argsort(-probs, kind="stable")
+        return [{"label": self.model.labels[i], "confidence": float(probs[i])} for i in order]
+
+
+class StreamingClassifier:
+    """
+    逐帧输入关键点、每 hop 帧输出一次分类结果的实时分类器：
+    StreamingFeatureExtractor 维护特征窗口，IncrementalClassifier 复用相邻窗口的卷积结果
+    （只对不少于 min_window 帧的窗口，见 MIN_WINDOW）。窗口未满时（浏览器端用最后一帧补齐的窗口）完整计算。
+    """
+
+    def __init__(self, model, hop=HOP, smoother=None, min_window=MIN_WINDOW):
+        self.extractor = StreamingFeatureExtractor(window=model.window, hop=hop, smoother=smoother)
+        self.classifier = IncrementalClassifier(model, min_window)
+        self.kind = model.feature_kind
+        self._last = None     # 上一次完整窗口预测时的帧数
+
+    def reset(self):
+        self.extractor.reset()
+        self.classifier.reset()
+        self._last = None
+
+    def step(self, frame):
+        """
+        加入一帧，到了输出时刻时返回 (特征窗口, shift)，否则返回 None。
+        shift 为窗口相对上一次预测前移的帧数（上一次窗口未满时为 None），可直接传给 IncrementalClassifier。
+        """
+        if not self.extractor.push(frame):
+            return None
+        count = self.extractor.count
+        shift = count - self._last if self._last is not None else None
+        self._last = count if self.extractor.ready else None
+        return self.extractor.window_features(self.kind), shift
+
+    def push(self, frame):
+        """加入一帧，到了输出时刻时返回 classify 结果，否则返回 None。"""
+        step = self.step(frame)
+        if step is None:
+            return None
+        return self.classifier.classify(*step)
+
+
+if __name__ == "__main__":
+    # 用法：python stream_inference.py <模型文件夹> <数据文件夹> [hop] [min_window]
+    #   逐帧回放数据文件夹中的样本，比较增量推理与整窗重新计算的结果和每次预测的用时
+    #   （min_window=0 时对任意窗口都使用增量推理，用于测量）
+    from pose_stream import iter_samples
+    from tfjs_runtime import TfjsModel
+
+    model = TfjsModel.load(sys.argv[1] if len(sys.argv) > 1 else os.path.join("model", "Model_velocity_test9"))
+    folder = sys.argv[2] if len(sys.argv) > 2 else os.path.join("data", "data_test9_velocity")
+    hop = int(sys.argv[3]) if len(sys.argv) > 3 else HOP
+    min_window = int(sys.argv[4]) if len(sys.argv) > 4 else MIN_WINDOW
+    names = sorted(n for n in os.listdir(folder)
+                   if n.lower().endswith(".json") and not n.endswith("index.json"))
+
+    predictions = mismatches = 0
+    incremental_time = full_time = 0.0
+    stream = StreamingClassifier(model, hop, min_window=min_window)
+    for name in names:
+        # 同一文件的所有样本首尾相接作为一段连续的输入
+        samples = [points for points, _, _ in iter_samples(os.path.join(folder, name), dtype=np.float64)]
+        if not samples:
+            continue
+        stream.reset()
+        for frame in np.concatenate(samples):
+            step = stream.step(frame)
+            if step is None:
+                continue
+            features, shift = step
+            start = time.perf_counter()
+            probs = stream.classifier.predict_proba(features, shift)
+            incremental_time += time.perf_counter() - start
+            start = time.perf_counter()
+            expected = model.predict_proba(features)
+            full_time += time.perf_counter() - start
+            predictions += 1
+            mismatches += not np.array_equal(probs, expected)
+    reused, computed = stream.classifier.reused_rows, stream.classifier.computed_rows
+    mode = "增量推理" if stream.classifier.incremental else f"窗口少于 {min_window} 帧，整窗计算"
+    print(f"{model.name}，hop={hop}（{mode}）：{predictions} 次预测，与整窗计算不一致 {mismatches} 次")
+    print(f"  每次预测的推理用时：增量 {incremental_time / max(predictions, 1) * 1e6:.0f} µs，"
+          f"整窗 {full_time / max(predictions, 1) * 1e6:.0f} µs；"
+          f"时间层复用 {reused / max(reused + computed, 1):.0%} 的行")
@@ -0,0 +1,116 @@
+import logging
+
+from midi_scheduler import MidiScheduler
+from midi_backend import open_backend
+from latency_metrics import metrics as latency_metrics
+
+# 由置信度计算 tempo 并发送 MIDI 的部分，不依赖 Flask：
+# send_midi.py / send_midi_fast_slow.py（Flask）、server.py 与 server_async.py（aiohttp）都从这里导入，
+# 导入时不会创建 Flask app，同一进程中也只有一个 MIDI 输出与输出线程。
+# 这些函数会在 Socket.IO 处理函数与事件循环中被调用，每批数据只用 logging.debug 记录，
+# 发送情况由 midi_scheduler.stats() 与延迟统计的定期报告给出。
+
+logger = logging.getLogger(__name__)
+
+# MIDI 输出由环境变量 MIDI_BACKEND / MIDI_PORT 选择（默认用 mido 打开 "IAC Driver Bus 1"，打不开时启动失败；
+# 没有 MIDI 设备时用 MIDI_BACKEND=null，或设置 MIDI_FALLBACK=null 在打不开时改为不发送）；
+# 消息由单独的输出线程发送（合并同一 CC 的更新、去掉重复值并限速），处理函数不会被 MIDI 驱动阻塞。
+# 导入本模块不会打开端口或启动线程：各服务器在 __main__ 中调用 init_midi()。
+midi_backend = None
+midi_scheduler = None
+
+def init_midi(name=None, port_name=None):
+    """
+    打开 MIDI 输出并启动输出线程（重复调用时直接返回已有的调度器）。
+    调度器使用默认的 time.monotonic 作为时钟（限速与等待不受系统时间调整影响），
+    端到端延迟所需的 Unix 时间由 latency_metrics.on_midi_send 在发送时自己读取。
+    """
+    global midi_backend, midi_scheduler
+    if midi_scheduler is None:
+        midi_backend = open_backend(name, port_name)
+        midi_scheduler = MidiScheduler(midi_backend.control_change, on_send=latency_metrics.on_midi_send).start()
+    return midi_scheduler
+
+def close_midi():
+    """停止输出线程（先发出已到时间的更新）并关闭 MIDI 输出。"""
+    global midi_backend, midi_scheduler
+    if midi_scheduler is not None:
+        midi_scheduler.stop()
+        midi_backend.close()
+        midi_backend = midi_scheduler = None
+
+def map_range(value, left_min, left_max, right_min, right_max):
+    if value < left_min:
+        value = left_min
+    if value > left_max:
+        value = left_max
+    left_span = left_max - left_min
+    right_span = right_max - right_min
+    if left_span == 0:
+        return right_min
+    value_scaled = float(value - left_min) / float(left_span)
+    return right_min + (value_scaled * right_span)
+
+def adjust_tempo(new_tempo_value, tempo_cc):
+    """
+    发送 MIDI 控制消息（交给 MIDI 输出线程，立即返回），使用指定的控制号 tempo_cc
+    new_tempo_value 会先限制在 0～127 范围内。
+    """
+    if midi_scheduler is None:
+        raise RuntimeError("MIDI 输出尚未初始化，请先调用 tempo_control.init_midi()")
+    cc_value = max(0, min(127, new_tempo_value))
+    midi_scheduler.submit(tempo_cc, cc_value)
+    logger.debug("Adjusted tempo: queued MIDI CC %s with value %s", tempo_cc, cc_value)
+
+def compute_new_tempo(data_list):
+    """
+    data_list 为最近接收到的一组数据，每个数据格式示例：
+      {
+        "type": "velocity" 或 "acceleration",
+        "label": "Fast (1.00)" 或 "Slow (0.98)",
+        "displayConfidence": 数值 (0~1)
+      }
+
+    仅检测 fast 与 slow 标签：
+      - 如果检测到 fast 数据，则将其平均信心值映射到 [130, 160]，使用 MIDI CC1；
+      - 如果没有 fast 数据但检测到 slow 数据，则映射到 [60, 90]，使用 MIDI CC2；
+      - 如果两者都没有，则返回 (None, None)（即不发送 MIDI）。
+    """
+    fast_confidences = []
+    slow_confidences = []
+
+    for data in data_list:
+        label_str = data.get("label", "")
+        label_key = label_str.split(" ")[0].lower()
+        if label_key == "fast":
+            fast_confidences.append(data.get("displayConfidence", 0))
+        elif label_key == "slow":
+            slow_confidences.append(data.get("displayConfidence", 0))
+
+    if fast_confidences:
+        avg_conf = sum(fast_confidences) / len(fast_confidences)
+        new_tempo = int(map_range(avg_conf, 0, 1, 130, 160))
+        tempo_cc = 1   # fast 使用 MIDI CC1
+    elif slow_confidences:
+        avg_conf = sum(slow_confidences) / len(slow_confidences)
+        new_tempo = int(map_range(avg_conf, 0, 1, 60, 90))
+        tempo_cc = 2   # slow 使用 MIDI CC2
+    else:
+        new_tempo = None
+        tempo_cc = None
+
+    return new_tempo, tempo_cc
+
+def process_midi_data(data_list):
+    """
+    处理接收到的数据，计算新的 tempo 并发送 MIDI 控制消息，
+    仅在检测到 fast 或 slow 数据时发送消息。
+    """
+    new_tempo, tempo_cc = compute_new_tempo(data_list)
+    # 先记录这批数据的 aggregate 时间（MIDI 输出线程可能在 adjust_tempo 返回前就发出消息）
+    latency_metrics.on_aggregate(data_list, control=tempo_cc if new_tempo is not None else None)
+    if new_tempo is not None and tempo_cc is not None:
+        adjust_tempo(new_tempo, tempo_cc)
+        logger.debug("Computed new tempo: %s (using CC%s)", new_tempo, tempo_cc)
+    else:
+        logger.debug("No fast or slow data detected, no MIDI sent.")
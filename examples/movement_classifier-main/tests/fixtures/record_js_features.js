@@ -0,0 +1,32 @@
+// 用浏览器端 sketch 中的 computeJointVelocityFeatures / computeJointAccelerationFeatures
+// 计算固定输入的特征并保存，作为 Python 实现（js_features.py）一致性测试的参考输出。
+// 用法（在 movement_classifier-main 目录下）：node tests/fixtures/record_js_features.js
+const fs = require("fs");
+const path = require("path");
+
+const SKETCH = "sketch_classify_COUNTINUED_uploadVIDEO_BOTH_60frame_toPython_noCentralized_camera.js";
+const SOURCE = "data/data_test9_velocity/test9_60frame_fast_dancer01_8set.json";
+const OUT_DIR = path.join("tests", "fixtures");
+
+// 从 sketch 中取出两个特征函数（与浏览器端运行的代码完全相同）
+const sketch = fs.readFileSync(SKETCH, "utf8");
+function extract(name) {
+  const start = sketch.indexOf("function " + name);
+  const end = sketch.indexOf("\n}\n", start) + 2;
+  return sketch.slice(start, end);
+}
+const FPS = 30;
+const dt = 1 / FPS;
+eval(extract("computeJointVelocityFeatures") + "\n" + extract("computeJointAccelerationFeatures"));
+
+// 输入：数据文件第一个样本的 60 帧；删除几个关键点以覆盖“缺少关键点时速度为 0”的分支
+const frames = JSON.parse(fs.readFileSync(SOURCE, "utf8")).data[0].xs.slice(0, 2 * FPS);
+delete frames[10].x5;
+delete frames[10].y5;
+delete frames[30].y12;
+delete frames[59].x0;
+
+fs.writeFileSync(path.join(OUT_DIR, "js_raw_frames.json"), JSON.stringify(frames));
+fs.writeFileSync(path.join(OUT_DIR, "js_velocity.json"), JSON.stringify(computeJointVelocityFeatures(frames)));
+fs.writeFileSync(path.join(OUT_DIR, "js_acceleration.json"), JSON.stringify(computeJointAccelerationFeatures(frames)));
+console.log(`recorded ${frames.length} frames from ${SOURCE}`);
@@ -0,0 +1,72 @@
+import threading
+
+from client_buffers import ClientBuffers, RingBuffer
+
+
+def test_ring_buffer_wraps_and_keeps_newest():
+    buf = RingBuffer(4)
+    for i in range(6):
+        buf.append(i)
+    assert len(buf) == 4 and buf.dropped == 2
+    assert buf.snapshot() == [2, 3, 4, 5]
+    assert buf.drain() == [2, 3, 4, 5]
+    assert len(buf) == 0 and buf.snapshot() == []
+    # 清空之后再次绕回
+    for i in range(5):
+        buf.append(10 + i)
+    assert buf.snapshot() == [11, 12, 13, 14]
+
+
+def test_drain_min_items():
+    buf = RingBuffer(8)
+    for i in range(3):
+        assert buf.append(i) == i + 1
+    assert buf.drain(min_items=4) is None
+    assert buf.snapshot() == [0, 1, 2]     # 不足时不取出
+    buf.append(3)
+    assert buf.drain(min_items=4) == [0, 1, 2, 3]
+    assert buf.drain(min_items=1) is None
+
+
+def test_concurrent_drain_hands_out_each_item_once():
+    buf = RingBuffer(10000)
+    for i in range(1000):
+        buf.append(i)
+    results = []
+
+    def worker():
+        while True:
+            items = buf.drain(min_items=1)
+            if items is None:
+                return
+            results.extend(items)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(results) == list(range(1000))
+
+
+def test_client_buffers_are_separate_per_sid():
+    buffers = ClientBuffers(capacity=4)
+    buffers.append("a", 1)
+    buffers.append("b", 2)
+    buffers.append("a", 3)
+    assert buffers.snapshot("a") == [1, 3] and buffers.snapshot("b") == [2]
+    assert buffers.drain_all(min_items=2) == {"a": [1, 3]}
+    assert buffers.drain("b") == [2]
+    assert buffers.drain("missing") is None and "missing" not in buffers.sids()
+
+
+def test_append_without_create_after_remove():
+    buffers = ClientBuffers()
+    assert buffers.append("a", 1, create=False) == 0
+    assert buffers.sids() == []
+    buffers.buffer("a")
+    assert buffers.append("a", 1, create=False) == 1
+    assert buffers.remove("a") == [1]
+    # 客户端断开之后才到达的结果：丢弃，不重新创建缓冲区
+    assert buffers.append("a", 2, create=False) == 0
+    assert buffers.sids() == [] and buffers.drain("a") is None
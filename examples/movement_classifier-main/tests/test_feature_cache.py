@@ -0,0 +1,36 @@
+import os
+
+import numpy as np
+
+from feature_cache import FeatureCache, cache_key
+
+
+def test_round_trip(tmp_path):
+    cache = FeatureCache(str(tmp_path))
+    key = cache_key("0" * 40, kind="velocity")
+    arrays = {"velocity": np.arange(12, dtype=np.float32).reshape(3, 4)}
+    cache.put(key, arrays)
+    np.testing.assert_array_equal(cache.get(key)["velocity"], arrays["velocity"])
+
+
+def test_corrupt_entry_is_a_miss_and_removed(tmp_path):
+    cache = FeatureCache(str(tmp_path))
+    key = cache_key("1" * 40, kind="velocity")
+    cache.put(key, {"velocity": np.ones((100, 33), dtype=np.float32)})
+    path = cache.path(key)
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) // 2)
+
+    assert cache.get(key) is None
+    assert not os.path.exists(path)
+    arrays = cache.get_or_compute(key, lambda: {"velocity": np.zeros(3, dtype=np.float32)})
+    np.testing.assert_array_equal(cache.get(key)["velocity"], arrays["velocity"])
+
+
+def test_garbage_entry_is_a_miss(tmp_path):
+    cache = FeatureCache(str(tmp_path))
+    key = cache_key("2" * 40, kind="acceleration")
+    os.makedirs(os.path.dirname(cache.path(key)))
+    with open(cache.path(key), "wb") as f:
+        f.write(b"PK\x03\x04 not really a zip")
+    assert cache.get(key) is None
@@ -0,0 +1,70 @@
+import numpy as np
+
+from feature_stats import LabelStats, RunningStats
+
+
+def _reference(samples, frames):
+    """把不等长样本补 NaN 后用 np.nanmean / np.nanvar 逐帧计算的参考值。"""
+    padded = np.full((len(samples), frames) + samples[0].shape[1:], np.nan)
+    for i, sample in enumerate(samples):
+        padded[i, :len(sample)] = sample
+    return padded
+
+
+def _samples(rng, count, shapes=(40, 55, 60)):
+    samples = [rng.normal(100, 30, size=(shapes[i % len(shapes)], 33)) for i in range(count)]
+    samples[1][5, 3] = np.nan       # 缺失关键点不计入
+    return samples
+
+
+def test_merge_matches_numpy():
+    rng = np.random.default_rng(0)
+    samples = _samples(rng, 12)
+    parts = [RunningStats((33,)) for _ in range(3)]
+    for i, sample in enumerate(samples):
+        parts[i % 3].add(sample)
+    merged = parts[0].merge(parts[1]).merge(parts[2])
+
+    padded = _reference(samples, 60)
+    np.testing.assert_allclose(merged.mean, np.nanmean(padded, axis=0), rtol=1e-12)
+    np.testing.assert_allclose(merged.variance(), np.nanvar(padded, axis=0, ddof=1), rtol=1e-10)
+    np.testing.assert_allclose(merged.variance(ddof=0), np.nanvar(padded, axis=0), rtol=1e-10)
+    np.testing.assert_array_equal(merged.min, np.nanmin(padded, axis=0))
+    np.testing.assert_array_equal(merged.max, np.nanmax(padded, axis=0))
+    np.testing.assert_array_equal(merged.count, (~np.isnan(padded)).sum(axis=0))
+
+
+def test_merge_equals_sequential_add_and_batches():
+    rng = np.random.default_rng(1)
+    samples = _samples(rng, 8, shapes=(60,))
+    sequential = RunningStats((33,))
+    for sample in samples:
+        sequential.add(sample)
+    batched = RunningStats((33,))
+    batched.add_batch(samples[:5])
+    rest = RunningStats((33,))
+    rest.add_batch(samples[5:])
+    batched.merge(rest)
+    np.testing.assert_allclose(batched.mean, sequential.mean, rtol=1e-12)
+    np.testing.assert_allclose(batched.variance(), sequential.variance(), rtol=1e-10)
+
+
+def test_merge_into_empty_and_single_sample_variance():
+    stats = RunningStats((33,))
+    one = RunningStats((33,))
+    one.add(np.ones((10, 33)))
+    stats.merge(one)
+    np.testing.assert_array_equal(stats.mean, np.ones((10, 33)))
+    assert np.isnan(stats.variance()).all()      # 只有一个样本时样本方差无定义
+
+
+def test_label_stats_merge():
+    rng = np.random.default_rng(2)
+    a, b = LabelStats((33,)), LabelStats((33,))
+    fast = [rng.normal(size=(60, 33)) for _ in range(4)]
+    a.add_batch("fast", fast[:2])
+    b.add_batch("fast", fast[2:])
+    b.add("slow", np.zeros((60, 33)))
+    a.merge(b)
+    assert sorted(a.labels()) == ["fast", "slow"]
+    np.testing.assert_allclose(a["fast"].variance(), np.var(np.stack(fast), axis=0, ddof=1), rtol=1e-10)
@@ -0,0 +1,54 @@
+import threading
+
+import numpy as np
+
+from inference_batcher import InferenceBatcher
+
+
+class _Model:
+    def __init__(self, fail=False):
+        self.fail = fail
+
+    def classify(self, windows):
+        if self.fail:
+            raise RuntimeError("boom")
+        return [[{"label": "fast", "confidence": float(w.sum())}] for w in windows]
+
+
+def _run(batcher, requests):
+    done = threading.Semaphore(0)
+    results, errors = {}, {}
+
+    def on_result(key, result, context):
+        results[key] = result
+        done.release()
+
+    def on_error(key, error, context):
+        errors[key] = (error, context)
+        done.release()
+
+    batcher.callback, batcher.error_callback = on_result, on_error
+    batcher.start()
+    try:
+        for key, window, model in requests:
+            batcher.submit(key, window, context=key, model=model)
+        for _ in requests:
+            assert done.acquire(timeout=2)
+    finally:
+        batcher.stop()
+    return results, errors
+
+
+def test_results_are_routed_per_key():
+    model = _Model()
+    results, errors = _run(InferenceBatcher(model), [("a", np.ones((4, 33)), None), ("b", np.zeros((4, 33)), None)])
+    assert not errors
+    assert results["a"][0]["confidence"] == 132.0 and results["b"][0]["confidence"] == 0.0
+
+
+def test_failed_batch_reports_error_to_every_key():
+    good, bad = _Model(), _Model(fail=True)
+    results, errors = _run(InferenceBatcher(good), [("a", np.ones((4, 33)), bad), ("b", np.ones((4, 33)), bad),
+                                                    ("c", np.ones((4, 33)), good)])
+    assert sorted(errors) == ["a", "b"] and list(results) == ["c"]
+    assert isinstance(errors["a"][0], RuntimeError) and errors["b"][1] == "b"
@@ -0,0 +1,41 @@
+import os
+import json
+
+import numpy as np
+import pytest
+
+from js_features import check_parity, frames_to_features
+from stream_features import StreamingFeatureExtractor
+
+# fixtures/ 中的参考输出由 fixtures/record_js_features.js 用浏览器端 sketch 的特征函数生成
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+ATOL = 1e-6
+
+
+def _load(name):
+    with open(os.path.join(FIXTURES, name), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.mark.parametrize("kind, fixture", [("velocity", "js_velocity.json"),
+                                           ("acceleration", "js_acceleration.json")])
+def test_parity_with_recorded_js(kind, fixture):
+    raw, js = _load("js_raw_frames.json"), _load(fixture)
+    assert check_parity(raw, js, kind, atol=ATOL) <= ATOL
+
+
+@pytest.mark.parametrize("kind, fixture", [("velocity", "js_velocity.json"),
+                                           ("acceleration", "js_acceleration.json")])
+def test_streaming_extractor_matches_recorded_js(kind, fixture):
+    raw, js = _load("js_raw_frames.json"), _load(fixture)
+    extractor = StreamingFeatureExtractor(window=len(raw))
+    for frame in raw:
+        extractor.push(frame)
+    np.testing.assert_allclose(extractor.window_features(kind), frames_to_features(js, kind), rtol=0, atol=ATOL)
+
+
+def test_parity_detects_mismatch():
+    raw, js = _load("js_raw_frames.json"), _load("js_velocity.json")
+    js[5]["V3"] += 1.0
+    with pytest.raises(AssertionError):
+        check_parity(raw, js, "velocity", atol=ATOL)
@@ -0,0 +1,115 @@
+import threading
+
+from midi_scheduler import MidiScheduler
+
+
+class FakeClock:
+    def __init__(self, now=100.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _scheduler(**kwargs):
+    clock, sent, events = FakeClock(), [], []
+    scheduler = MidiScheduler(lambda channel, control, value: sent.append((clock.now, channel, control, value)),
+                              clock=clock, on_send=lambda *args: events.append(args), **kwargs)
+    return scheduler, clock, sent, events
+
+
+def test_burst_is_coalesced_to_latest_value():
+    scheduler, clock, sent, events = _scheduler()
+    for value in range(100):
+        scheduler.submit(1, value)
+    assert scheduler.poll() is None
+    assert sent == [(100.0, 0, 1, 99)]
+    assert scheduler.coalesced == 99 and scheduler.sent == 1
+    # on_send 的 submitted 为最早一次未发出更新的提交时间
+    assert events == [(0, 1, 99, 100.0, 100.0)]
+
+
+def test_rate_limit_per_controller():
+    scheduler, clock, sent, _ = _scheduler(min_interval=0.02)
+    scheduler.submit(1, 10)
+    scheduler.poll()
+    clock.now += 0.005
+    for value in range(11, 20):
+        scheduler.submit(1, value)
+    scheduler.submit(2, 5)                  # 其他控制器不受 CC1 限速影响
+    wake_at = scheduler.poll()
+    assert sent == [(100.0, 0, 1, 10), (100.005, 0, 2, 5)]
+    assert wake_at == 100.0 + 0.02
+    clock.now = wake_at
+    assert scheduler.poll() is None
+    assert sent[-1] == (100.02, 0, 1, 19)
+    assert scheduler.pending() == 0
+
+
+def test_duplicates_are_suppressed():
+    scheduler, clock, sent, _ = _scheduler()
+    scheduler.submit(1, 64)
+    scheduler.poll()
+    clock.now += 1
+    scheduler.submit(1, 64)
+    scheduler.poll()
+    assert len(sent) == 1 and scheduler.suppressed == 1
+    scheduler.submit(1, 65)
+    scheduler.poll()
+    assert sent[-1][3] == 65
+
+
+def test_duplicates_sent_when_suppression_disabled():
+    scheduler, clock, sent, _ = _scheduler(suppress_duplicates=False)
+    for _ in range(2):
+        scheduler.submit(1, 64)
+        scheduler.poll()
+        clock.now += 1
+    assert [value for *_, value in sent] == [64, 64]
+
+
+def test_scheduled_at():
+    scheduler, clock, sent, _ = _scheduler()
+    scheduler.submit(1, 10, at=100.5)
+    assert scheduler.poll() == 100.5 and sent == []
+    clock.now = 100.4
+    scheduler.poll()
+    assert sent == []
+    clock.now = 100.5
+    scheduler.poll()
+    assert sent == [(100.5, 0, 1, 10)]
+
+
+def test_values_clamped_and_channels_separate():
+    scheduler, _, sent, _ = _scheduler()
+    scheduler.submit(1, 300)
+    scheduler.submit(1, -5, channel=3)
+    scheduler.poll()
+    assert sorted(sent) == [(100.0, 0, 1, 127), (100.0, 3, 1, 0)]
+
+
+def test_send_error_is_counted_and_thread_keeps_running():
+    delivered = threading.Event()
+    calls = []
+
+    def send(channel, control, value):
+        calls.append(value)
+        if value == 1:
+            raise IOError("port closed")
+        delivered.set()
+
+    scheduler = MidiScheduler(send).start()
+    try:
+        scheduler.submit(1, 1)
+        scheduler.submit(2, 2)
+        assert delivered.wait(1.0)
+    finally:
+        scheduler.stop()
+    assert scheduler.errors == 1 and 2 in calls
+
+
+def test_stop_flushes_pending():
+    scheduler, clock, sent, _ = _scheduler()
+    scheduler.submit(1, 10, at=200.0)
+    scheduler.stop(flush=True)
+    assert sent == [(100.0, 0, 1, 10)]
@@ -0,0 +1,29 @@
+import os
+import json
+
+import numpy as np
+
+from pose_cache import CACHE_DIRNAME, load_pose_array
+
+
+def _write_recording(path, samples, frames=3):
+    data = [{"xs": [{f"{axis}{i}": float(s + f + i) for i in range(33) for axis in "xy"}
+                    for f in range(frames)], "ys": {"label": "slow"}} for s in range(samples)]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"data": data}, f)
+
+
+def test_rebuild_keeps_cache_of_dotted_neighbour(tmp_path):
+    # a.json 的缓存为 a.<哈希>.f32，a.b.json 的缓存为 a.b.<哈希>.f32；重建 a 时不能删除 a.b 的数据
+    _write_recording(tmp_path / "a.b.json", 2)
+    _write_recording(tmp_path / "a.json", 1)
+    load_pose_array(str(tmp_path / "a.b.json"))
+    load_pose_array(str(tmp_path / "a.json"))
+    _write_recording(tmp_path / "a.json", 3)
+    array, meta = load_pose_array(str(tmp_path / "a.json"))
+    assert array.shape[0] == 3
+
+    cached = sorted(n for n in os.listdir(tmp_path / CACHE_DIRNAME) if n.endswith(".f32"))
+    assert len(cached) == 2 and meta["data_file"] in cached
+    neighbour, _ = load_pose_array(str(tmp_path / "a.b.json"))
+    np.testing.assert_array_equal(neighbour[1, 0, 0], [1.0, 1.0])
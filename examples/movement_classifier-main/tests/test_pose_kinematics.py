@@ -0,0 +1,30 @@
+import numpy as np
+
+import pose_kinematics as kinematics
+
+
+def _frames(count):
+    return [{f"{axis}{i}": float(f * (i + 1)) for i in range(33) for axis in "xy"} for f in range(count)]
+
+
+def test_trajectories_are_indexed_by_joint():
+    # 与原脚本相同：trajectories[i] 是关键点 i 的 (x, y) 序列，而不是第 i 帧
+    frames = _frames(5)
+    trajectories = kinematics.compute_keypoint_trajectories(frames)
+    assert sorted(trajectories) == list(range(33))
+    np.testing.assert_array_equal(trajectories[3], [(frame["x3"], frame["y3"]) for frame in frames])
+    np.testing.assert_array_equal(kinematics.keypoint_array(frames)[:, 3], trajectories[3])
+
+
+def test_vectorized_velocity_matches_per_joint():
+    frames = _frames(6)
+    trajectories = kinematics.compute_keypoint_trajectories(frames)
+    vel_all = kinematics.compute_velocity(kinematics.keypoint_array(frames))
+    for i in range(33):
+        np.testing.assert_allclose(vel_all[:, i], kinematics.compute_velocity(trajectories[i]))
+
+
+def test_acceleration_of_short_input_keeps_joint_axis():
+    assert kinematics.compute_acceleration(np.zeros(1)).shape == (0,)
+    assert kinematics.compute_acceleration(np.zeros((1, 33))).shape == (0, 33)
+    assert kinematics.compute_acceleration(np.zeros((4, 1, 33))).shape == (4, 0, 33)
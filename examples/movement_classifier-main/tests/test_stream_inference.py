@@ -0,0 +1,73 @@
+import os
+
+import numpy as np
+import pytest
+
+from pose_stream import iter_samples
+from stream_inference import MIN_WINDOW, StreamingClassifier
+from tfjs_runtime import TfjsModel
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _frames(relpath, limit):
+    samples = [points for points, _, _ in iter_samples(os.path.join(ROOT, relpath), dtype=np.float64)]
+    return np.concatenate(samples)[:limit]
+
+
+def _replay(model, frames, hop, **kwargs):
+    """逐帧回放，返回每次预测的 (StreamingClassifier 的 classify 结果, TfjsModel.classify 结果) 与分类器。"""
+    stream = StreamingClassifier(model, hop, **kwargs)
+    pairs = []
+    for frame in frames:
+        step = stream.step(frame)
+        if step is None:
+            continue
+        features, shift = step
+        # IncrementalClassifier 有状态，每个窗口只能调用一次
+        pairs.append((stream.classifier.classify(features, shift), model.classify(features)[0]))
+    return pairs, stream
+
+
+def _assert_identical(pairs):
+    # 置信度按 float 比较，与整窗重新计算的结果必须完全相同
+    assert pairs
+    for result, expected in pairs:
+        assert result == expected
+
+
+@pytest.fixture(scope="module")
+def velocity_model():
+    return TfjsModel.load(os.path.join(ROOT, "model", "Model_velocity_test9"))
+
+
+def test_small_window_bypasses_reuse(velocity_model):
+    assert velocity_model.window < MIN_WINDOW
+    frames = _frames("data/data_test9_velocity/test9_60frame_fast_dancer01_8set.json", 300)
+    pairs, stream = _replay(velocity_model, frames, 4)
+    assert not stream.classifier.incremental and stream.classifier.reused_rows == 0
+    _assert_identical(pairs)
+
+
+@pytest.mark.parametrize("hop", [1, 3, 4, 8])
+def test_incremental_matches_full_recompute(velocity_model, hop):
+    frames = _frames("data/data_test9_velocity/test9_60frame_fast_dancer01_8set.json", 300)
+    pairs, stream = _replay(velocity_model, frames, hop, min_window=0)
+    assert stream.classifier.incremental and stream.classifier.reused_rows > 0
+    _assert_identical(pairs)
+
+
+def test_acceleration_incremental_matches_full_recompute():
+    model = TfjsModel.load(os.path.join(ROOT, "model", "Model_Acceleration_test9"))
+    frames = _frames("data/data_test9_acceleration/test9_60frame_sudden_dancer01_22set.json", 240)
+    pairs, stream = _replay(model, frames, 4, min_window=0)
+    assert stream.classifier.reused_rows > 0
+    _assert_identical(pairs)
+
+
+def test_large_window_uses_reuse_by_default():
+    model = TfjsModel.load(os.path.join(ROOT, "model", "Model_Acceleration_test5"))
+    assert model.window >= MIN_WINDOW
+    pairs, stream = _replay(model, _frames("data/data_test7/test7_150frame_sustained_finger_15set.json", 800), 4)
+    assert stream.classifier.incremental and stream.classifier.reused_rows > 0
+    _assert_identical(pairs)
@@ -0,0 +1,48 @@
+import threading
+
+import pytest
+
+import midi_backend as backends
+import tempo_control
+
+
+def test_import_opens_no_port_and_starts_no_thread():
+    assert tempo_control.midi_backend is None and tempo_control.midi_scheduler is None
+    assert "midi-scheduler" not in [t.name for t in threading.enumerate()]
+    with pytest.raises(RuntimeError):
+        tempo_control.adjust_tempo(90, 2)
+
+
+def test_compute_new_tempo():
+    assert tempo_control.compute_new_tempo([{"label": "Fast (1.00)", "displayConfidence": 1.0},
+                                            {"label": "Slow (0.90)", "displayConfidence": 0.9}]) == (160, 1)
+    assert tempo_control.compute_new_tempo([{"label": "Slow (0.50)", "displayConfidence": 0.5}]) == (75, 2)
+    assert tempo_control.compute_new_tempo([{"label": "Other (1.00)", "displayConfidence": 1.0}]) == (None, None)
+
+
+def test_init_midi_sends_and_close_flushes():
+    scheduler = tempo_control.init_midi("recording")
+    try:
+        assert tempo_control.init_midi() is scheduler      # 重复调用不会再打开端口
+        backend = tempo_control.midi_backend
+        tempo_control.process_midi_data([{"label": "Slow (1.00)", "displayConfidence": 1.0}])
+    finally:
+        tempo_control.close_midi()
+    assert [message[1:] for message in backend.messages()] == [(0, 2, 90)]
+    assert tempo_control.midi_scheduler is None
+
+
+def test_unavailable_port_fails_without_fallback(monkeypatch):
+    def unavailable(*args):
+        raise IOError("no such port")
+    monkeypatch.delenv("MIDI_FALLBACK", raising=False)
+    monkeypatch.setitem(backends.BACKENDS, "mido", unavailable)
+    with pytest.raises(IOError):
+        tempo_control.init_midi("mido")
+    assert tempo_control.midi_scheduler is None
+    monkeypatch.setenv("MIDI_FALLBACK", "null")
+    try:
+        assert tempo_control.init_midi("mido") is not None
+        assert tempo_control.midi_backend.name == "null"
+    finally:
+        tempo_control.close_midi()
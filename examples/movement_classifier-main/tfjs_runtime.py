@@ -0,0 +1,345 @@
+import os
+import sys
+import json
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from js_features import FEATURE_PREFIX
+
+# ------------------- 参数设置 -------------------
+MODEL_FILE = "model.json"
+META_FILE = "model_meta.json"
+
+_DTYPES = {"float32": np.float32, "int32": np.int32, "bool": np.bool_,
+           "uint8": np.uint8, "uint16": np.uint16}
+
+
+# ------------------- 权重 -------------------
+def load_weights(model_dir, manifest, copy=False):
+    """
+    按 weightsManifest 读取权重，返回 {名称: 数组}。
+    每个权重组的分片文件用 np.memmap 映射，float32 权重直接是映射上的视图（不拷贝）；
+    量化存储（"quantization": uint8/uint16 + scale/min）的权重会反量化为 float32。
+    copy=True 时每个权重都拷贝到内存中，之后与文件无关：长期运行的服务要用这种方式，
+    否则文件被原地改写时正在使用的模型会读到新数据，文件被截断时访问映射会触发 SIGBUS。
+    """
+    weights = {}
+    for group in manifest:
+        paths = [os.path.join(model_dir, p) for p in group["paths"]]
+        if len(paths) == 1:
+            buf = np.memmap(paths[0], dtype=np.uint8, mode="r")
+        else:
+            buf = np.concatenate([np.memmap(p, dtype=np.uint8, mode="r") for p in paths])
+        offset = 0
+        for spec in group["weights"]:
+            shape = tuple(spec["shape"])
+            size = int(np.prod(shape, dtype=np.int64))
+            quant = spec.get("quantization")
+            dtype = _DTYPES[quant["dtype"] if quant else spec["dtype"]]
+            nbytes = size * np.dtype(dtype).itemsize
+            values = buf[offset:offset + nbytes].view(dtype).reshape(shape)
+            if quant:
+                values = (values.astype(np.float32) * np.float32(quant["scale"])
+                          + np.float32(quant["min"]))
+            elif copy:
+                values = np.array(values)
+            weights[spec["name"]] = values
+            offset += nbytes
+    return weights
+
+
+# ------------------- 激活函数 -------------------
+def _softmax(x):
+    e = np.exp(x - x.max(axis=-1, keepdims=True))
+    return e / e.sum(axis=-1, keepdims=True)
+
+
+ACTIVATIONS = {
+    None: lambda x: x,
+    "linear": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0),
+    "sigmoid": lambda x: 1 / (1 + np.exp(-x)),
+    "tanh": np.tanh,
+    "softmax": _softmax,
+}
+
+
+def _activation(name):
+    if name not in ACTIVATIONS:
+        raise ValueError(f"不支持的激活函数：{name}")
+    return ACTIVATIONS[name]
+
+
+# ------------------- 层 -------------------
+def _pad_1d(x, size, stride, dilation, padding):
+    """按 tfjs 的规则对时间维 (N, T, C) 补零，返回补齐后的输入。"""
+    if padding == "valid":
+        return x
+    span = dilation * (size - 1) + 1
+    if padding == "causal":
+        left, right = span - 1, 0
+    elif padding == "same":
+        length = x.shape[1]
+        out = -(-length // stride)
+        total = max((out - 1) * stride + span - length, 0)
+        left, right = total // 2, total - total // 2
+    else:
+        raise ValueError(f"不支持的 padding：{padding}")
+    return np.pad(x, ((0, 0), (left, right), (0, 0)))
+
+
+def conv1d(x, kernel, bias=None, stride=1, dilation=1, padding="valid"):
+    """
+    一维卷积（通道在最后）：x (N, T, C_in)，kernel (K, C_in, C_out)，返回 (N, T_out, C_out)。
+    都化为一次连续的大矩阵乘法，按中间结果较小的方式选择：
+      - C_in <= C_out：把 K 个错开的输入切片拼成 (N * T_out, K * C_in) 后乘以展开的卷积核（im2col）；
+      - C_in >  C_out：把 K 个位置的卷积核拼成 (C_in, K * C_out)，对所有时间点相乘后
+        再把第 k 个位置的结果错开 k * dilation 帧累加。
+    """
+    K, c_in, c_out = kernel.shape
+    x = _pad_1d(x, K, stride, dilation, padding)
+    n, length = x.shape[:2]
+    out_len = (length - dilation * (K - 1) - 1) // stride + 1
+    if out_len <= 0:
+        raise ValueError(f"输入长度 {length} 不足以做大小为 {K} 的卷积")
+    last = stride * (out_len - 1) + 1
+    if c_in <= c_out:
+        cols = np.concatenate([x[:, k * dilation:k * dilation + last:stride] for k in range(K)], axis=2)
+        y = (cols.reshape(n * out_len, K * c_in) @ kernel.reshape(K * c_in, c_out)).reshape(n, out_len, c_out)
+    else:
+        merged = np.ascontiguousarray(kernel.transpose(1, 0, 2)).reshape(c_in, K * c_out)
+        z = (np.ascontiguousarray(x).reshape(n * length, c_in) @ merged).reshape(n, length, K, c_out)
+        y = z[:, 0:last:stride, 0].copy()
+        for k in range(1, K):
+            start = k * dilation
+            y += z[:, start:start + last:stride, k]
+    if bias is not None:
+        y += bias
+    return y
+
+
+def pool1d(x, size, stride, padding="valid", mode="max"):
+    """一维最大/平均池化：x (N, T, C)，返回 (N, T_out, C)。"""
+    if padding == "same":
+        out = -(-x.shape[1] // stride)
+        total = max((out - 1) * stride + size - x.shape[1], 0)
+        fill = -np.inf if mode == "max" else np.nan
+        x = np.pad(x, ((0, 0), (total // 2, total - total // 2), (0, 0)), constant_values=fill)
+    if mode == "max":
+        # 池化窗口内的 size 个位置逐个取最大值，每次都是整块的步长切片
+        last = stride * ((x.shape[1] - size) // stride) + 1
+        y = x[:, 0:last:stride].copy()
+        for i in range(1, size):
+            np.maximum(y, x[:, i:i + last:stride], out=y)
+        return y
+    windows = sliding_window_view(x, size, axis=1)[:, ::stride]    # (N, T_out, C, size)
+    return np.nanmean(windows, axis=-1)
+
+
+def _first(value):
+    return value[0] if isinstance(value, (list, tuple)) else value
+
+
+def _build_conv1d(config, weights):
+    kernel = weights[config["name"] + "/kernel"]
+    bias = weights.get(config["name"] + "/bias") if config.get("use_bias", True) else None
+    act = _activation(config.get("activation"))
+    stride = _first(config.get("strides", 1))
+    dilation = _first(config.get("dilation_rate", 1))
+    padding = config.get("padding", "valid")
+    return lambda x: act(conv1d(x, kernel, bias, stride, dilation, padding))
+
+
+def _build_pool(mode):
+    def build(config, weights):
+        size = _first(config.get("pool_size", 2))
+        stride = _first(config.get("strides") or size)
+        padding = config.get("padding", "valid")
+        return lambda x: pool1d(x, size, stride, padding, mode)
+    return build
+
+
+def _build_dense(config, weights):
+    kernel = weights[config["name"] + "/kernel"]
+    bias = weights.get(config["name"] + "/bias") if config.get("use_bias", True) else None
+    act = _activation(config.get("activation"))
+
+    def dense(x):
+        y = x @ kernel
+        return act(y + bias if bias is not None else y)
+    return dense
+
+
+def _build_flatten(config, weights):
+    return lambda x: x.reshape(x.shape[0], int(np.prod(x.shape[1:])))
+
+
+def _build_identity(config, weights):
+    return lambda x: x
+
+
+def _build_activation(config, weights):
+    return _activation(config.get("activation"))
+
+
+LAYER_BUILDERS = {
+    "Conv1D": _build_conv1d,
+    "MaxPooling1D": _build_pool("max"),
+    "AveragePooling1D": _build_pool("avg"),
+    "Dense": _build_dense,
+    "Flatten": _build_flatten,
+    "Dropout": _build_identity,          # 推理时 Dropout 不起作用
+    "InputLayer": _build_identity,
+    "Activation": _build_activation,
+}
+
+
+# ------------------- 模型 -------------------
+class TfjsModel:
+    """
+    导出的 tfjs Layers 顺序模型（model.json + model.weights.bin + model_meta.json）的 NumPy 推理实现。
+
+      - 输入为 (windows, frames, 33) 的原始特征（与浏览器端 computeJoint*Features 的输出相同），
+        先按 model_meta.json 的每个输入的 min/max 做 ml5 的归一化 (x - min) / (max - min)；
+      - 整批窗口一次前向计算（float32），输出每个类别的概率；
+      - 类别顺序按 outputs.label.legend 的 one-hot 编码确定。
+    """
+
+    def __init__(self, topology, weights, meta=None, name=None):
+        self.name = name
+        self.meta = meta
+        config = topology["config"]
+        layers = config["layers"] if isinstance(config, dict) else config
+        self.weights = weights
+        self.layer_names = []
+        self.layer_configs = []
+        self.layers = []
+        self.input_shape = None
+        for layer in layers:
+            cls, cfg = layer["class_name"], layer["config"]
+            if cls not in LAYER_BUILDERS:
+                raise ValueError(f"不支持的层类型：{cls}")
+            if self.input_shape is None and "batch_input_shape" in cfg:
+                self.input_shape = tuple(cfg["batch_input_shape"][1:])
+            self.layer_names.append(cfg.get("name", cls))
+            self.layer_configs.append((cls, cfg))
+            self.layers.append(LAYER_BUILDERS[cls](cfg, weights))
+
+        self.input_names = list(meta["inputs"]) if meta else None
+        if meta and meta.get("isNormalized", True):
+            self.input_min = np.array([meta["inputs"][n]["min"] for n in self.input_names], dtype=np.float32)
+            self.input_max = np.array([meta["inputs"][n]["max"] for n in self.input_names], dtype=np.float32)
+        else:
+            self.input_min = self.input_max = None
+        self.labels = _output_labels(meta) if meta else None
+
+    @classmethod
+    def load(cls, model_dir, copy=False):
+        """
+        从模型文件夹读取 model.json、权重与（可选的）model_meta.json。
+        copy=False 时权重是 .bin 文件的内存映射（离线评分等一次性使用）；copy=True 时权重拷贝到内存中。
+        """
+        with open(os.path.join(model_dir, MODEL_FILE), "r", encoding="utf-8") as f:
+            model_json = json.load(f)
+        weights = load_weights(model_dir, model_json["weightsManifest"], copy=copy)
+        meta = None
+        meta_path = os.path.join(model_dir, META_FILE)
+        if os.path.exists(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        return cls(model_json["modelTopology"], weights, meta,
+                   name=os.path.basename(os.path.normpath(model_dir)))
+
+    @property
+    def window(self):
+        """输入窗口的帧数（seriesShape[0]）。"""
+        return self.input_shape[0] if self.input_shape else None
+
+    @property
+    def feature_kind(self):
+        """由输入名推断模型使用的特征："velocity"（V0..）或 "acceleration"（Acc0..）。"""
+        if not self.input_names:
+            return None
+        prefix = self.input_names[0].rstrip("0123456789")
+        return next((k for k, p in FEATURE_PREFIX.items() if p == prefix), None)
+
+    def normalize(self, features):
+        """ml5 的 min/max 归一化；某个输入 max == min 时该输入记为 0。"""
+        x = np.asarray(features, dtype=np.float32)
+        if self.input_min is None:
+            return x
+        span = self.input_max - self.input_min
+        out = np.subtract(x, self.input_min)
+        np.divide(out, np.where(span > 0, span, np.float32(1)), out=out)
+        if not (span > 0).all():
+            out[..., span <= 0] = 0
+        return out
+
+    def forward(self, x):
+        """对已经归一化的输入 (N, frames, 33) 做前向计算，返回最后一层的输出。"""
+        for layer in self.layers:
+            x = layer(x)
+        return x
+
+    def predict_proba(self, features, normalize=True):
+        """
+        features: (windows, frames, 33) 或单个窗口 (frames, 33)，返回 (windows, 类别数) 的概率。
+        """
+        x = np.asarray(features, dtype=np.float32)
+        single = x.ndim == 2
+        if single:
+            x = x[None]
+        if self.input_shape and x.shape[1:] != self.input_shape:
+            raise ValueError(f"输入形状 {x.shape[1:]} 与模型的 {self.input_shape} 不一致")
+        probs = self.forward(self.normalize(x) if normalize else x)
+        return probs[0] if single else probs
+
+    def predict(self, features, normalize=True):
+        """返回每个窗口概率最大的标签。"""
+        probs = np.atleast_2d(self.predict_proba(features, normalize))
+        return [self.labels[i] for i in probs.argmax(axis=1)]
+
+    def classify(self, features, normalize=True):
+        """与 ml5 classify() 的结果格式相同：每个窗口一个按置信度从高到低排列的 [{"label", "confidence"}]。"""
+        probs = np.atleast_2d(self.predict_proba(features, normalize))
+        results = []
+        for row in probs:
+            order = np.argsort(-row, kind="stable")
+            results.append([{"label": self.labels[i], "confidence": float(row[i])} for i in order])
+        return results
+
+
+def _output_labels(meta):
+    """按 legend 的 one-hot 位置排列类别名；没有 legend 时按 uniqueValues 的顺序。"""
+    label = next(iter(meta["outputs"].values()))
+    legend = label.get("legend")
+    if legend:
+        labels = [None] * len(legend)
+        for name, onehot in legend.items():
+            labels[int(np.argmax(onehot))] = name
+        return labels
+    return list(label["uniqueValues"])
+
+
+def load_model(model_dir):
+    return TfjsModel.load(model_dir)
+
+
+if __name__ == "__main__":
+    # 用法：python tfjs_runtime.py model/Model_Acceleration_test9 data/data_test9_acceleration
+    #   用模型对数据文件夹中的所有样本（训练时的特征与窗口）做预测并输出准确率
+    from js_features import build_feature_tensor
+    import time
+
+    model = load_model(sys.argv[1])
+    kind = model.feature_kind
+    folder = sys.argv[2]
+    names = sorted(n for n in os.listdir(folder)
+                   if n.lower().endswith(".json") and not n.endswith("index.json"))
+    tensor, index = build_feature_tensor([os.path.join(folder, n) for n in names], kind, window=model.window)
+    start = time.perf_counter()
+    predicted = model.predict(tensor)
+    elapsed = time.perf_counter() - start
+    correct = sum(p.lower() == str(item["label"]).lower() for p, item in zip(predicted, index))
+    print(f"{model.name}: {len(index)} 个窗口，准确率 {correct / max(len(index), 1):.3f}，"
+          f"推理用时 {elapsed * 1000:.1f} ms")